@@ -0,0 +1,70 @@
+from functools import lru_cache
+from typing import Dict, Any
+from starlette.requests import HTTPConnection
+import redis.asyncio as redis
+
+from src.core.config import get_settings
+from src.core.exceptions import create_http_exception
+from src.services.async_processor import AsyncMeetingProcessor
+from src.services.auth import GitHubAuthService
+from src.services.fanout import UpdateFanout
+from src.services.search_index import MeetingSearchIndex
+from src.services.vector_index import MeetingVectorIndex
+
+settings = get_settings()
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    """Shared Redis client for the API process"""
+    return redis.from_url(settings.REDIS_URL)
+
+@lru_cache
+def get_processor() -> AsyncMeetingProcessor:
+    """Shared meeting processor (enqueues jobs, reads status and results)"""
+    return AsyncMeetingProcessor(get_redis())
+
+@lru_cache
+def get_fanout() -> UpdateFanout:
+    """Per-process fan-out gateway for job updates"""
+    return UpdateFanout(get_redis())
+
+@lru_cache
+def get_search_index() -> MeetingSearchIndex:
+    """Shared full-text meeting archive"""
+    return MeetingSearchIndex()
+
+@lru_cache
+def get_vector_index() -> MeetingVectorIndex:
+    """Shared semantic index reader (keeps recently queried users loaded)"""
+    return MeetingVectorIndex(get_redis())
+
+@lru_cache
+def get_auth_service() -> GitHubAuthService:
+    """Shared auth service"""
+    return GitHubAuthService()
+
+async def get_current_user(request: HTTPConnection) -> Dict[str, Any]:
+    """
+    Resolve the Bearer token into its JWT payload
+
+    EventSource and WebSocket clients cannot set headers, so a `token`
+    query parameter is accepted as well.
+    """
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+    elif request.query_params.get("token"):
+        token = request.query_params["token"]
+    else:
+        raise create_http_exception(401, "No token provided")
+
+    payload = get_auth_service().verify_jwt_token(token)
+    if not payload:
+        raise create_http_exception(401, "Invalid token")
+
+    return payload
+
+async def close_redis():
+    """Close the shared Redis client if it was created"""
+    if get_redis.cache_info().currsize:
+        await get_redis().close()
@@ -0,0 +1,44 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+import structlog
+
+from src.api.dependencies import close_redis, get_auth_service, get_fanout, get_search_index
+from src.core.database import close_db_pool
+from src.core.http import http_clients
+from src.monitoring.tracing import setup_tracing, shutdown_tracing
+
+logger = structlog.get_logger()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open and close application-scoped resources
+
+    Usage: FastAPI(lifespan=lifespan)
+    """
+    setup_tracing("meetinggpt-api")
+    http_clients.open()
+    await get_fanout().start()
+
+    # One-time DDL; kept off the request path so sign-ins never take a lock on users
+    try:
+        await get_auth_service().users.ensure_schema()
+    except Exception as e:
+        logger.error("user_schema_setup_failed", error=str(e))
+
+    try:
+        await get_search_index().ensure_schema()
+    except Exception as e:
+        logger.error("search_schema_setup_failed", error=str(e))
+
+    logger.info("app_resources_opened")
+
+    try:
+        yield
+    finally:
+        await get_fanout().stop()
+        await http_clients.aclose()
+        await close_db_pool()
+        await close_redis()
+        shutdown_tracing()
+        logger.info("app_resources_closed")
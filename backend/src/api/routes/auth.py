@@ -4,7 +4,7 @@ from pydantic import BaseModel
 from typing import Optional
 import structlog
 
-from src.services.auth import GitHubAuthService
+from src.api.dependencies import get_auth_service
 from src.core.config import get_settings
 
 logger = structlog.get_logger()
@@ -23,7 +23,7 @@ class AuthURLRequest(BaseModel):
 async def get_github_auth_url(request: AuthURLRequest):
     """Get GitHub OAuth URL"""
     try:
-        auth_service = GitHubAuthService()
+        auth_service = get_auth_service()
         auth_url = auth_service.get_auth_url(request.redirect_uri)
         
         return {"auth_url": auth_url}
@@ -36,7 +36,7 @@ async def get_github_auth_url(request: AuthURLRequest):
 async def github_callback(code: str):
     """Handle GitHub OAuth callback"""
     try:
-        auth_service = GitHubAuthService()
+        auth_service = get_auth_service()
         auth_result = await auth_service.authenticate_user(code)
         
         if not auth_result:
@@ -52,7 +52,7 @@ async def github_callback(code: str):
 async def github_callback_get(code: str, state: Optional[str] = None):
     """Handle GitHub OAuth callback (GET for redirect flow)"""
     try:
-        auth_service = GitHubAuthService()
+        auth_service = get_auth_service()
         auth_result = await auth_service.authenticate_user(code)
         
         if not auth_result:
@@ -76,7 +76,7 @@ async def verify_token(request: Request):
             raise HTTPException(status_code=401, detail="No token provided")
         
         token = auth_header.split(" ")[1]
-        auth_service = GitHubAuthService()
+        auth_service = get_auth_service()
         
         payload = auth_service.verify_jwt_token(token)
         if not payload:
@@ -106,7 +106,7 @@ async def refresh_token(request: Request):
             raise HTTPException(status_code=401, detail="No token provided")
         
         token = auth_header.split(" ")[1]
-        auth_service = GitHubAuthService()
+        auth_service = get_auth_service()
         
         payload = auth_service.verify_jwt_token(token)
         if not payload:
@@ -135,20 +135,18 @@ async def get_current_user(request: Request):
             raise HTTPException(status_code=401, detail="No token provided")
         
         token = auth_header.split(" ")[1]
-        auth_service = GitHubAuthService()
+        auth_service = get_auth_service()
         
         payload = auth_service.verify_jwt_token(token)
         if not payload:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        # Get full user info from Supabase
-        user_result = auth_service.supabase.table('users').select('*').eq('id', payload['user_id']).execute()
+        # Get full user info
+        user = await auth_service.get_user(payload['user_id'])
         
-        if not user_result.data:
+        if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        user = user_result.data[0]
-        
         return {
             "id": user['id'],
             "username": user['username'],
@@ -0,0 +1,233 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, List
+import asyncio
+import json
+import time
+import structlog
+
+from src.api.dependencies import (
+    get_auth_service,
+    get_current_user,
+    get_fanout,
+    get_processor,
+    get_search_index,
+    get_vector_index
+)
+from src.core.config import get_settings
+from src.core.exceptions import (
+    ValidationException,
+    UploadTooLargeException,
+    UnsupportedAudioException,
+    create_http_exception
+)
+from src.monitoring.tracing import tracer
+from src.services.async_processor import AsyncMeetingProcessor, TERMINAL_STAGES
+from src.services.fanout import UpdateFanout
+from src.services.search_index import MeetingSearchIndex
+from src.services.vector_index import MeetingVectorIndex
+from src.services.uploads import StreamingUploadReceiver, remove_upload
+
+logger = structlog.get_logger()
+settings = get_settings()
+router = APIRouter()
+
+KEEPALIVE_SECONDS = 15
+
+@router.post("/meetings/upload")
+async def upload_meeting(
+    request: Request,
+    user: Dict[str, Any] = Depends(get_current_user),
+    processor: AsyncMeetingProcessor = Depends(get_processor)
+):
+    """
+    Upload a recording (multipart field "audio") and start processing
+
+    The body is streamed to disk; it is never buffered in memory.
+    """
+    # Root span of the meeting's trace; the worker joins it via the job record
+    with tracer.start_as_current_span("meetings.upload", attributes={"user.id": user["user_id"]}) as span:
+        upload_started = time.perf_counter()
+        try:
+            upload = await StreamingUploadReceiver().receive(request.headers, request.stream())
+        except UploadTooLargeException as e:
+            raise create_http_exception(413, e.message)
+        except UnsupportedAudioException as e:
+            raise create_http_exception(415, e.message)
+        except ValidationException as e:
+            raise create_http_exception(400, e.message)
+        upload_seconds = time.perf_counter() - upload_started
+
+        # Once queued, the job owns the spool file; until then it is ours to delete
+        queued = False
+        try:
+            # Tier decides the job's scheduling lane and concurrent slot limit
+            subscription = await get_auth_service().get_user_subscription(user["user_id"])
+            await processor.instrumentation.record_stage("upload", upload_seconds, subscription["tier"])
+
+            job_id = await processor.start_processing(
+                upload["path"],
+                meeting_title=upload["fields"].get("title") or upload["filename"],
+                audio_hash=upload["sha256"],
+                user_id=user["user_id"],
+                tier=subscription["tier"]
+            )
+            queued = True
+        finally:
+            if not queued:
+                await remove_upload(upload["path"])
+        span.set_attribute("job.id", job_id)
+        span.set_attribute("upload.bytes", upload["size_bytes"])
+
+        logger.info(
+            "meeting_uploaded",
+            job_id=job_id,
+            user_id=user["user_id"],
+            size_bytes=upload["size_bytes"],
+            format=upload["format"]
+        )
+
+        return {
+            "job_id": job_id,
+            "size_bytes": upload["size_bytes"],
+            "format": upload["format"]
+        }
+
+@router.get("/meetings/search")
+async def search_meetings(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    user: Dict[str, Any] = Depends(get_current_user),
+    search_index: MeetingSearchIndex = Depends(get_search_index)
+):
+    """
+    Search the user's meetings
+
+    Supports web-search syntax ("quoted phrases", OR, -exclusions).
+    Segment hits carry start_ms/end_ms offsets into the recording.
+    """
+    try:
+        hits = await search_index.search(user["user_id"], q, limit)
+    except Exception as e:
+        logger.error("meeting_search_failed", user_id=user["user_id"], error=str(e))
+        raise create_http_exception(503, "Search is temporarily unavailable")
+
+    return {"query": q, "hits": hits}
+
+@router.get("/meetings/semantic-search")
+async def semantic_search_meetings(
+    q: str = Query(..., min_length=2, max_length=500),
+    limit: int = Query(10, ge=1, le=50),
+    user: Dict[str, Any] = Depends(get_current_user),
+    vector_index: MeetingVectorIndex = Depends(get_vector_index)
+):
+    """
+    Find meeting passages by meaning ("when did we discuss pricing?")
+
+    Hits carry start_ms/end_ms offsets into the recording.
+    """
+    try:
+        hits = await vector_index.search(user["user_id"], q, limit)
+    except Exception as e:
+        logger.error("meeting_semantic_search_failed", user_id=user["user_id"], error=str(e))
+        raise create_http_exception(503, "Search is temporarily unavailable")
+
+    return {"query": q, "hits": hits}
+
+async def _job_updates(
+    job_id: str,
+    user: Dict[str, Any],
+    processor: AsyncMeetingProcessor,
+    fanout: UpdateFanout
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield batches of updates for one job until it completes or fails
+
+    Yields [] when nothing arrived for KEEPALIVE_SECONDS.
+    """
+    # Subscribe before the snapshot so no update falls in between
+    subscription = fanout.subscribe(job_id)
+    try:
+        status = await processor.get_job_status(job_id)
+        if not status or status.get("user_id") != user["user_id"]:
+            raise create_http_exception(404, "Job not found")
+
+        yield [{"type": "status_update", "job_id": job_id, "status": status}]
+        stage = status.get("stage")
+
+        while stage not in TERMINAL_STAGES:
+            try:
+                batch = await asyncio.wait_for(subscription.next_batch(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield []
+                continue
+
+            for message in batch:
+                if message["type"] == "status_update":
+                    stage = message["status"].get("stage", stage)
+            yield batch
+
+    finally:
+        fanout.unsubscribe(subscription)
+
+@router.get("/meetings/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    user: Dict[str, Any] = Depends(get_current_user),
+    processor: AsyncMeetingProcessor = Depends(get_processor),
+    fanout: UpdateFanout = Depends(get_fanout)
+):
+    """Server-sent events with this job's status deltas and partial results"""
+    updates = _job_updates(job_id, user, processor, fanout)
+
+    # Resolve ownership before the response starts so a 404 is still possible
+    first_batch = await updates.__anext__()
+
+    async def event_stream():
+        try:
+            batch = first_batch
+            while True:
+                if not batch:
+                    yield ": keepalive\n\n"
+                for message in batch:
+                    yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+                batch = await updates.__anext__()
+        except StopAsyncIteration:
+            pass
+        finally:
+            await updates.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/meetings/{job_id}/ws")
+async def job_updates_websocket(
+    websocket: WebSocket,
+    job_id: str,
+    processor: AsyncMeetingProcessor = Depends(get_processor),
+    fanout: UpdateFanout = Depends(get_fanout)
+):
+    """WebSocket with this job's status deltas and partial results"""
+    try:
+        user = await get_current_user(websocket)
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+
+    await websocket.accept()
+
+    updates = _job_updates(job_id, user, processor, fanout)
+    try:
+        async for batch in updates:
+            for message in batch:
+                await websocket.send_json(message)
+        await websocket.close()
+    except HTTPException:
+        await websocket.close(code=4404)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await updates.aclose()
@@ -0,0 +1,38 @@
+from typing import Optional
+import asyncio
+import asyncpg
+import structlog
+
+from src.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+async def get_db_pool() -> asyncpg.Pool:
+    """Get the process-wide asyncpg pool, creating it on first use"""
+    global _pool
+
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await asyncpg.create_pool(
+                    settings.DATABASE_URL,
+                    min_size=settings.DATABASE_POOL_MIN_SIZE,
+                    max_size=settings.DATABASE_POOL_MAX_SIZE,
+                    command_timeout=settings.TIMEOUT_SECONDS
+                )
+                logger.info("db_pool_opened", max_size=settings.DATABASE_POOL_MAX_SIZE)
+
+    return _pool
+
+async def close_db_pool():
+    """Close the pool if it was opened"""
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("db_pool_closed")
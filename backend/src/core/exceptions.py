@@ -23,10 +23,22 @@ class ValidationException(MeetingGPTException):
     """Raised when input validation fails"""
     pass
 
+class UploadTooLargeException(ValidationException):
+    """Raised when an upload exceeds MAX_FILE_SIZE_MB"""
+    pass
+
+class UnsupportedAudioException(ValidationException):
+    """Raised when an upload is not a recognized audio/video container"""
+    pass
+
 class RateLimitException(MeetingGPTException):
     """Raised when rate limit is exceeded"""
     pass
 
+class UpstreamUnavailableException(MeetingGPTException):
+    """Raised when an upstream API stays over quota or unavailable"""
+    pass
+
 def create_http_exception(
     status_code: int,
     detail: str,
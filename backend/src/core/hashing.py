@@ -0,0 +1,9 @@
+import hashlib
+
+def generate_file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Generate SHA-256 hash for a file without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,79 @@
+from typing import Dict
+import httpx
+import structlog
+
+from src.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+def _upstream_config() -> Dict[str, Dict]:
+    """Connection settings per upstream"""
+    return {
+        "openai": {
+            "base_url": "https://api.openai.com",
+            "timeout": httpx.Timeout(
+                settings.TRANSCRIPTION_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT
+            ),
+            "limits": httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+            ),
+        },
+        "github": {
+            "timeout": httpx.Timeout(
+                settings.TIMEOUT_SECONDS,
+                connect=settings.HTTP_CONNECT_TIMEOUT
+            ),
+            "limits": httpx.Limits(
+                max_connections=settings.GITHUB_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GITHUB_MAX_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+            ),
+            "headers": {"User-Agent": "MeetingGPT"},
+        },
+    }
+
+class HTTPClientRegistry:
+    """
+    Application-scoped pooled HTTP clients, one per upstream
+
+    - Connections are kept alive and reused across requests and jobs
+    - HTTP/2 lets concurrent calls to one upstream share a connection
+    - Opened and closed by the API lifespan (and by the worker entrypoint)
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def open(self):
+        """Create every configured client"""
+        for name in _upstream_config():
+            self.get(name)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Get the shared client for an upstream, creating it on first use"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            config = _upstream_config()[name]
+            client = httpx.AsyncClient(http2=True, **config)
+            self._clients[name] = client
+            logger.info("http_client_opened", upstream=name)
+        return client
+
+    async def aclose(self):
+        """Close every client and its pooled connections"""
+        for name, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error("http_client_close_failed", upstream=name, error=str(e))
+        self._clients.clear()
+
+http_clients = HTTPClientRegistry()
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Get the shared client for an upstream ("openai", "github")"""
+    return http_clients.get(name)
@@ -3,6 +3,8 @@ import logging
 import sys
 from typing import Any, Dict
 
+from src.monitoring.tracing import add_trace_context
+
 def setup_logging(log_level: str = "INFO") -> None:
     """Configure structured logging"""
     
@@ -17,6 +19,7 @@ def setup_logging(log_level: str = "INFO") -> None:
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
+            add_trace_context,
             structlog.processors.JSONRenderer()
         ],
         context_class=dict,
@@ -0,0 +1,398 @@
+import asyncio
+import random
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+import anthropic
+import httpx
+import redis.asyncio as redis
+import structlog
+
+from src.core.config import get_settings
+from src.core.exceptions import UpstreamUnavailableException
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Refills and debits several token buckets at once: all or nothing.
+# ARGV[1] is "take" (debit only if every bucket has enough; else return the
+# wait in ms) or "force" (apply the cost unconditionally, used to settle
+# estimates against actual usage). Then one (rate per ms, capacity, cost)
+# triple per key.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local force = ARGV[1] == 'force'
+local levels = {}
+local wait = 0
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 3 - 1])
+    local capacity = tonumber(ARGV[i * 3])
+    local cost = tonumber(ARGV[i * 3 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if not force then
+        cost = math.min(cost, capacity)
+        if tokens < cost then
+            wait = math.max(wait, math.ceil((cost - tokens) / rate))
+        end
+    end
+end
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 3 - 1])
+    local capacity = tonumber(ARGV[i * 3])
+    local cost = tonumber(ARGV[i * 3 + 1])
+    local tokens = levels[i]
+    if force then
+        tokens = tokens - cost
+    elseif wait == 0 then
+        tokens = tokens - math.min(cost, capacity)
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate) + 60000)
+end
+
+return wait
+"""
+
+# Admits one call if the circuit allows it and fewer than `limit` calls are
+# in flight across all processes. Returns {1, 0} or {0, retry_in_ms}.
+ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[2], 'limit', 'open_until', 'probe_until')
+local limit = tonumber(state[1]) or tonumber(ARGV[3])
+local open_until = tonumber(state[2]) or 0
+local probe_until = tonumber(state[3]) or 0
+
+if now < open_until then
+    return {0, open_until - now}
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+
+if open_until > 0 then
+    -- Half-open: a single probe call decides whether the circuit closes
+    if now < probe_until then
+        return {0, probe_until - now}
+    end
+    redis.call('HSET', KEYS[2], 'probe_until', now + tonumber(ARGV[2]))
+elseif redis.call('ZCARD', KEYS[1]) >= math.max(1, math.floor(limit)) then
+    return {0, 50}
+end
+
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return {1, 0}
+"""
+
+# Releases a call's slot and feeds its outcome into AIMD and the circuit.
+RELEASE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('ZREM', KEYS[1], ARGV[1])
+
+local outcome = ARGV[2]
+local min_limit, max_limit = tonumber(ARGV[3]), tonumber(ARGV[4])
+local factor, decrease_cooldown = tonumber(ARGV[5]), tonumber(ARGV[6])
+local failure_threshold, circuit_cooldown = tonumber(ARGV[7]), tonumber(ARGV[8])
+
+local state = redis.call('HMGET', KEYS[2], 'limit', 'failures', 'open_until', 'decreased_at')
+local limit = tonumber(state[1]) or tonumber(ARGV[9])
+local failures = tonumber(state[2]) or 0
+local open_until = tonumber(state[3]) or 0
+local decreased_at = tonumber(state[4]) or 0
+
+local function decrease()
+    -- At most one multiplicative decrease per cooldown: one burst of 429s is one signal
+    if now - decreased_at >= decrease_cooldown then
+        limit = math.max(min_limit, limit * factor)
+        decreased_at = now
+    end
+end
+
+if outcome == 'ok' then
+    limit = math.min(max_limit, limit + 1 / limit)
+    failures = 0
+    open_until = 0
+elseif outcome == 'slow' then
+    decrease()
+    failures = 0
+    open_until = 0
+elseif outcome == 'overload' then
+    decrease()
+elseif outcome == 'failure' then
+    decrease()
+    failures = failures + 1
+    if failures >= failure_threshold or open_until > 0 then
+        open_until = now + circuit_cooldown
+        failures = 0
+    end
+end
+
+redis.call('HSET', KEYS[2], 'limit', tostring(limit), 'failures', failures,
+    'open_until', open_until, 'decreased_at', decreased_at)
+redis.call('HDEL', KEYS[2], 'probe_until')
+return tostring(limit)
+"""
+
+def retry_after_seconds(response: Optional[httpx.Response]) -> Optional[float]:
+    """Server-requested delay from retry-after-ms / Retry-After headers"""
+    if response is None:
+        return None
+
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+def classify_error(error: BaseException) -> Tuple[str, Optional[float]]:
+    """
+    Classify a failed upstream call
+
+    Returns:
+        (kind, retry_after) where kind is
+        "overload" (429/529: retry, shrink concurrency),
+        "failure" (5xx, timeouts, connection errors: retry, counts toward the circuit) or
+        "fatal" (anything else: don't retry)
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None)
+    if status is None and isinstance(response, httpx.Response):
+        status = response.status_code
+
+    if status in (429, 529):
+        return "overload", retry_after_seconds(response)
+    if status is not None and status >= 500:
+        return "failure", retry_after_seconds(response)
+    if status is not None:
+        return "fatal", None
+    if isinstance(error, (httpx.TransportError, anthropic.APIConnectionError, asyncio.TimeoutError)):
+        return "failure", None
+    return "fatal", None
+
+class UpstreamLimiter:
+    """
+    Shared gate in front of one upstream API (Anthropic, OpenAI)
+
+    State lives in Redis, so limits hold for the sum of all workers:
+    - Token buckets for requests and for each token kind per minute
+    - AIMD concurrency: +1/limit per fast success, x0.7 on 429/529,
+      errors or calls slower than `latency_target`
+    - Circuit breaker: opens after consecutive failures, then lets a
+      single probe through once the cooldown has passed
+    - Retries with full-jitter exponential backoff, never sooner than
+      the server's Retry-After
+
+    Callers wait (up to UPSTREAM_MAX_WAIT_SECONDS) instead of failing when
+    the budget is exhausted or the circuit is open.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: Dict[str, int] = None,
+        max_concurrency: int = 16,
+        latency_target: float = 60.0,
+        lease_seconds: int = 600,
+    ):
+        self.redis = redis_client
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute or {}
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.lease_ms = lease_seconds * 1000
+
+        self._bucket_script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._acquire_script = redis_client.register_script(ACQUIRE_SCRIPT)
+        self._release_script = redis_client.register_script(RELEASE_SCRIPT)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        tokens: Dict[str, int] = None,
+        usage: Callable[[T], Dict[str, int]] = None,
+    ) -> T:
+        """
+        Run an upstream call under the limits, retrying transient errors
+
+        Args:
+            fn: Coroutine factory making one attempt
+            tokens: Estimated tokens per kind, reserved before each attempt
+            usage: Actual tokens per kind from the result, to settle the estimate
+        """
+        deadline = time.monotonic() + settings.UPSTREAM_MAX_WAIT_SECONDS
+        attempt = 0
+
+        while True:
+            await self._take_budget(tokens or {}, deadline)
+            call_id = await self._acquire(deadline)
+
+            started = time.monotonic()
+            outcome = "fatal"  # Neutral for AIMD and the circuit if we are cancelled
+            try:
+                result = await fn()
+            except Exception as e:
+                error = e
+                outcome, retry_after = classify_error(e)
+            else:
+                error = None
+                outcome = "slow" if time.monotonic() - started > self.latency_target else "ok"
+            finally:
+                await self._release(call_id, outcome)
+
+            if error is None:
+                if usage and tokens:
+                    await self._settle(tokens, usage(result))
+                return result
+
+            delay = self._backoff(attempt, retry_after)
+            if outcome == "fatal" or attempt >= settings.UPSTREAM_MAX_RETRIES or time.monotonic() + delay > deadline:
+                raise error
+
+            logger.warning(
+                "upstream_call_retry",
+                upstream=self.name,
+                attempt=attempt + 1,
+                outcome=outcome,
+                delay=round(delay, 2),
+                error=str(error)
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _take_budget(self, tokens: Dict[str, int], deadline: float):
+        """Wait until the request and token buckets can cover this call"""
+        keys, args = self._bucket_args({"requests": 1, **tokens})
+
+        while True:
+            wait_ms = await self._bucket_script(keys=keys, args=["take", *args])
+            if not wait_ms:
+                return
+            await self._wait(wait_ms / 1000, deadline, "rate limit budget exhausted")
+
+    async def _settle(self, reserved: Dict[str, int], actual: Dict[str, int]):
+        """Charge or refund the difference between estimated and actual tokens"""
+        delta = {kind: actual.get(kind, 0) - reserved.get(kind, 0) for kind in reserved}
+        keys, args = self._bucket_args(delta)
+        if keys:
+            try:
+                await self._bucket_script(keys=keys, args=["force", *args])
+            except Exception as e:
+                logger.error("upstream_settle_failed", upstream=self.name, error=str(e))
+
+    async def _acquire(self, deadline: float) -> str:
+        """Take a concurrency slot, waiting while the circuit is open or slots are full"""
+        call_id = uuid.uuid4().hex
+
+        while True:
+            admitted, retry_ms = await self._acquire_script(
+                keys=self._state_keys(),
+                args=[call_id, self.lease_ms, self.max_concurrency]
+            )
+            if admitted:
+                return call_id
+            await self._wait(retry_ms / 1000, deadline, "circuit open or concurrency limit reached")
+
+    async def _release(self, call_id: str, outcome: str):
+        try:
+            limit = await self._release_script(
+                keys=self._state_keys(),
+                args=[
+                    call_id,
+                    outcome,
+                    settings.UPSTREAM_MIN_CONCURRENCY,
+                    self.max_concurrency,
+                    0.7,
+                    1000,
+                    settings.UPSTREAM_CIRCUIT_FAILURES,
+                    settings.UPSTREAM_CIRCUIT_COOLDOWN_SECONDS * 1000,
+                    self.max_concurrency
+                ]
+            )
+            if outcome not in ("ok", "fatal"):
+                logger.info("upstream_limit_adjusted", upstream=self.name, outcome=outcome, limit=float(limit))
+        except Exception as e:
+            # The lease expires on its own
+            logger.error("upstream_release_failed", upstream=self.name, error=str(e))
+
+    async def _wait(self, seconds: float, deadline: float, reason: str):
+        # Jitter spreads out workers that were told the same retry time
+        seconds = seconds * random.uniform(1.0, 1.2)
+        if time.monotonic() + seconds > deadline:
+            raise UpstreamUnavailableException(
+                f"{self.name} unavailable: {reason}",
+                {"upstream": self.name}
+            )
+        await asyncio.sleep(seconds)
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, at least the server's Retry-After"""
+        cap = min(settings.UPSTREAM_BACKOFF_MAX_SECONDS, settings.UPSTREAM_BACKOFF_BASE_SECONDS * 2 ** attempt)
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _bucket_args(self, costs: Dict[str, int]):
+        keys, args = [], []
+        for kind, cost in costs.items():
+            per_minute = self.requests_per_minute if kind == "requests" else self.tokens_per_minute.get(kind)
+            if not per_minute:
+                continue
+            keys.append(f"upstream:{self.name}:bucket:{kind}")
+            args.extend([per_minute / 60000, per_minute, cost])
+        return keys, args
+
+    def _state_keys(self):
+        return [f"upstream:{self.name}:inflight", f"upstream:{self.name}:state"]
+
+def create_upstream_limiters(redis_client: redis.Redis) -> Dict[str, UpstreamLimiter]:
+    """Limiters for every upstream, configured from settings"""
+    return {
+        "anthropic": UpstreamLimiter(
+            redis_client,
+            "anthropic",
+            requests_per_minute=settings.ANTHROPIC_REQUESTS_PER_MINUTE,
+            tokens_per_minute={
+                "input": settings.ANTHROPIC_INPUT_TOKENS_PER_MINUTE,
+                "output": settings.ANTHROPIC_OUTPUT_TOKENS_PER_MINUTE,
+            },
+            max_concurrency=settings.ANTHROPIC_MAX_CONCURRENCY,
+            latency_target=settings.ANTHROPIC_LATENCY_TARGET_SECONDS,
+            lease_seconds=settings.ANALYSIS_TIMEOUT,
+        ),
+        "openai": UpstreamLimiter(
+            redis_client,
+            "openai",
+            requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+            latency_target=settings.OPENAI_LATENCY_TARGET_SECONDS,
+            lease_seconds=settings.TRANSCRIPTION_TIMEOUT,
+        ),
+    }
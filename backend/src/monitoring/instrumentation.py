@@ -0,0 +1,122 @@
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+import redis.asyncio as redis
+import structlog
+
+from src.monitoring.metrics import MetricsCollector, TOKEN_USAGE
+from src.monitoring.tracing import tracer
+
+logger = structlog.get_logger()
+
+# Job being processed by the current task; lets deep callers (the analyzer's
+# Claude calls) attribute usage without threading the job through every call
+_current_job: ContextVar[Optional["JobInstrumentation"]] = ContextVar("meetinggpt_job", default=None)
+
+class PipelineInstrumentation:
+    """
+    Timing and usage instrumentation for the processing pipeline
+
+    - Stage latencies (queue_wait, upload, transcription, analysis,
+      indexing, storage) labelled by tier, model-specific latencies
+      labelled by model and tier
+    - Actual Claude token usage from each response's `usage`
+    - Transcribed audio seconds per tier
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self.collector = MetricsCollector(redis_client)
+
+    def job(self, job_id: str, tier: Optional[str] = None) -> "JobInstrumentation":
+        return JobInstrumentation(self.collector, job_id, tier or "unknown")
+
+    async def record_stage(self, stage: str, duration: float, tier: Optional[str] = None):
+        """Record a stage timed outside a job (e.g. the upload in the API)"""
+        try:
+            await self.collector.record_stage_time(stage, duration, tier or "unknown")
+        except Exception as e:
+            logger.error("stage_metrics_failed", stage=stage, error=str(e))
+
+class JobInstrumentation:
+    """Instrumentation for one job; `bind()` makes it current for the task"""
+
+    def __init__(self, collector: MetricsCollector, job_id: str, tier: str):
+        self.collector = collector
+        self.job_id = job_id
+        self.tier = tier
+        self.started = time.perf_counter()
+        self.tokens = {"input": 0, "output": 0}
+
+    def bind(self):
+        """Attribute usage recorded in this task (and tasks it spawns) to the job"""
+        return _current_job.set(self)
+
+    @staticmethod
+    def unbind(token):
+        _current_job.reset(token)
+
+    @asynccontextmanager
+    async def stage(self, name: str, model: Optional[str] = None) -> AsyncIterator[None]:
+        """Time a stage (and trace it as a span); only stages that complete are recorded"""
+        started = time.perf_counter()
+        with tracer.start_as_current_span(f"meeting.{name}", attributes={"job.id": self.job_id}):
+            yield
+        duration = time.perf_counter() - started
+        try:
+            await self.collector.record_stage_time(name, duration, self.tier)
+            if name == "transcription":
+                await self.collector.record_transcription_time(duration, model or "unknown", self.tier)
+            elif name == "analysis":
+                await self.collector.record_analysis_time(duration, model or "unknown", self.tier)
+        except Exception as e:
+            logger.error("stage_metrics_failed", job_id=self.job_id, stage=name, error=str(e))
+
+    async def record_stage(self, name: str, duration: float):
+        """Record a stage measured by the caller"""
+        try:
+            await self.collector.record_stage_time(name, duration, self.tier)
+        except Exception as e:
+            logger.error("stage_metrics_failed", job_id=self.job_id, stage=name, error=str(e))
+
+    def record_audio(self, seconds: Optional[float]):
+        if seconds:
+            self.collector.record_audio_seconds(seconds, self.tier)
+
+    def record_usage(self, model: str, input_tokens: int, output_tokens: int):
+        self.tokens["input"] += input_tokens
+        self.tokens["output"] += output_tokens
+        self.collector.record_token_usage(model, input_tokens, output_tokens, self.tier)
+
+    async def finish(self, success: bool, audio_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Record the job's total latency and outcome
+
+        Returns:
+            Job-level totals to store with the job status
+        """
+        try:
+            await self.collector.record_processing_end(
+                self.started, success, tier=self.tier, audio_seconds=audio_seconds or 0.0, tokens=self.tokens
+            )
+        except Exception as e:
+            logger.error("job_metrics_failed", job_id=self.job_id, error=str(e))
+        return {"input_tokens": self.tokens["input"], "output_tokens": self.tokens["output"]}
+
+def record_token_usage(model: str, usage: Any):
+    """
+    Record a Claude response's `usage` against the current job
+
+    Calls made outside a job are still counted, under tier "unknown".
+    """
+    if usage is None:
+        return
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or 0
+
+    job = _current_job.get()
+    if job:
+        job.record_usage(model, input_tokens, output_tokens)
+    else:
+        TOKEN_USAGE.labels(model=model, type="input", tier="unknown").inc(input_tokens)
+        TOKEN_USAGE.labels(model=model, type="output", tier="unknown").inc(output_tokens)
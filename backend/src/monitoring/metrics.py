@@ -1,31 +1,66 @@
 from typing import Dict, List, Any
 import time
-import numpy as np
 from prometheus_client import Counter, Histogram, Gauge
 import redis.asyncio as redis
 import structlog
 
+from src.monitoring.sketch import SketchStore
+from src.monitoring.timeseries import TimeSeriesStore
+
 logger = structlog.get_logger()
 
+# Jobs take seconds (cache hits) to over an hour (long recordings, retries)
+JOB_LATENCY_BUCKETS = (1, 5, 10, 30, 60, 120, 180, 300, 600, 900, 1200, 1800, 2700, 3600, 7200)
+
 # Prometheus metrics
-MEETINGS_PROCESSED = Counter("meetinggpt_meetings_processed_total", "Total meetings processed")
-TRANSCRIPTION_LATENCY = Histogram("meetinggpt_transcription_latency_seconds", "Transcription latency")
-ANALYSIS_LATENCY = Histogram("meetinggpt_analysis_latency_seconds", "Analysis latency")
-TOTAL_PROCESSING_LATENCY = Histogram("meetinggpt_total_processing_latency_seconds", "Total processing latency")
-TOKEN_USAGE = Counter("meetinggpt_tokens_total", "Total tokens used", ["model", "type"])
+MEETINGS_PROCESSED = Counter("meetinggpt_meetings_processed_total", "Total meetings processed", ["tier", "status"])
+TRANSCRIPTION_LATENCY = Histogram(
+    "meetinggpt_transcription_latency_seconds", "Transcription latency", ["model", "tier"],
+    buckets=JOB_LATENCY_BUCKETS
+)
+ANALYSIS_LATENCY = Histogram(
+    "meetinggpt_analysis_latency_seconds", "Analysis latency", ["model", "tier"],
+    buckets=JOB_LATENCY_BUCKETS
+)
+TOTAL_PROCESSING_LATENCY = Histogram(
+    "meetinggpt_total_processing_latency_seconds", "Total processing latency", ["tier"],
+    buckets=JOB_LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "meetinggpt_stage_latency_seconds",
+    "Latency per pipeline stage (queue_wait, upload, transcription, analysis, indexing, storage)",
+    ["stage", "tier"],
+    buckets=JOB_LATENCY_BUCKETS
+)
+AUDIO_SECONDS = Counter("meetinggpt_audio_seconds_total", "Seconds of audio transcribed", ["tier"])
+TOKEN_USAGE = Counter("meetinggpt_tokens_total", "Total tokens used", ["model", "type", "tier"])
 COST_TRACKER = Counter("meetinggpt_cost_total", "Total cost in USD", ["service"])
 SUBSCRIBERS = Gauge("meetinggpt_subscribers_total", "Total number of subscribers")
 MRR = Gauge("meetinggpt_monthly_recurring_revenue", "Monthly recurring revenue")
 PROCESSING_ACCURACY = Gauge("meetinggpt_processing_accuracy", "Processing accuracy score")
+PREPROCESS_LATENCY = Histogram(
+    "meetinggpt_preprocess_latency_seconds",
+    "Audio preprocessing (silence scan + Opus encode) latency",
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+)
+PREPROCESS_BYTES = Counter("meetinggpt_preprocess_bytes_total", "Audio bytes before/after preprocessing", ["stage"])
+PREPROCESS_BYTES_SAVED = Counter("meetinggpt_preprocess_bytes_saved_total", "Upload bytes saved by preprocessing")
 
 class MetricsCollector:
-    """Collect and track MeetingGPT system metrics"""
+    """
+    Collect and track MeetingGPT system metrics
+    
+    - Latencies go to fleet-wide DDSketches in Redis (per-minute buckets,
+      1m/5m/1h windows), so memory stays fixed and every worker's
+      observations count towards the percentiles
+    - Finished jobs and subscription changes go to rollup time series
+      (minute/hour/day/month) that the history charts read directly
+    """
     
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
-        self.processing_times = []
-        self.transcription_times = []
-        self.analysis_times = []
+        self.latencies = SketchStore(redis_client)
+        self.history = TimeSeriesStore(redis_client)
         self.meetings_processed = 0
         self.tokens_used = 0
         self.cost_used = 0.0
@@ -34,31 +69,59 @@ class MetricsCollector:
         """Record processing start time"""
         return time.perf_counter()
     
-    def record_processing_end(self, start_time: float, success: bool = True):
+    async def record_processing_end(
+        self,
+        start_time: float,
+        success: bool = True,
+        tier: str = "unknown",
+        audio_seconds: float = 0.0,
+        tokens: Dict[str, int] = None
+    ):
         """Record processing completion"""
         duration = time.perf_counter() - start_time
-        TOTAL_PROCESSING_LATENCY.observe(duration)
-        MEETINGS_PROCESSED.inc()
-        
-        self.processing_times.append(duration)
+        MEETINGS_PROCESSED.labels(tier=tier, status="completed" if success else "failed").inc()
         
         if success:
+            TOTAL_PROCESSING_LATENCY.labels(tier=tier).observe(duration)
+            await self.latencies.record("processing", duration)
             self.meetings_processed += 1
+            await self.history.record(
+                "processing",
+                counters={
+                    "meetings": 1,
+                    "processing_seconds": duration,
+                    "audio_seconds": float(audio_seconds or 0.0),
+                    "input_tokens": (tokens or {}).get("input", 0),
+                    "output_tokens": (tokens or {}).get("output", 0),
+                },
+                histograms={"processing_time": duration}
+            )
+        else:
+            await self.history.record("processing", counters={"failed": 1})
     
-    def record_transcription_time(self, duration: float):
+    async def record_transcription_time(self, duration: float, model: str = "whisper-1", tier: str = "unknown"):
         """Record transcription latency"""
-        TRANSCRIPTION_LATENCY.observe(duration)
-        self.transcription_times.append(duration)
+        TRANSCRIPTION_LATENCY.labels(model=model, tier=tier).observe(duration)
+        await self.latencies.record("transcription", duration)
     
-    def record_analysis_time(self, duration: float):
+    async def record_analysis_time(self, duration: float, model: str = "claude", tier: str = "unknown"):
         """Record analysis latency"""
-        ANALYSIS_LATENCY.observe(duration)
-        self.analysis_times.append(duration)
+        ANALYSIS_LATENCY.labels(model=model, tier=tier).observe(duration)
+        await self.latencies.record("analysis", duration)
+    
+    async def record_stage_time(self, stage: str, duration: float, tier: str = "unknown"):
+        """Record the latency of one pipeline stage"""
+        STAGE_LATENCY.labels(stage=stage, tier=tier).observe(duration)
+        await self.latencies.record(f"stage:{stage}", duration)
+    
+    def record_audio_seconds(self, seconds: float, tier: str = "unknown"):
+        """Record transcribed audio length"""
+        AUDIO_SECONDS.labels(tier=tier).inc(seconds)
     
-    def record_token_usage(self, model: str, input_tokens: int, output_tokens: int):
+    def record_token_usage(self, model: str, input_tokens: int, output_tokens: int, tier: str = "unknown"):
         """Record LLM token usage"""
-        TOKEN_USAGE.labels(model=model, type="input").inc(input_tokens)
-        TOKEN_USAGE.labels(model=model, type="output").inc(output_tokens)
+        TOKEN_USAGE.labels(model=model, type="input", tier=tier).inc(input_tokens)
+        TOKEN_USAGE.labels(model=model, type="output", tier=tier).inc(output_tokens)
         
         self.tokens_used += input_tokens + output_tokens
         
@@ -76,13 +139,21 @@ class MetricsCollector:
         COST_TRACKER.labels(service="llm").inc(total_cost)
         self.cost_used += total_cost
     
-    def update_subscribers(self, count: int):
+    async def update_subscribers(self, count: int):
         """Update subscriber count"""
         SUBSCRIBERS.set(count)
+        await self.history.record("subscriptions", gauges={"subscribers": count})
     
-    def update_mrr(self, amount: float):
+    async def update_mrr(self, amount: float):
         """Update monthly recurring revenue"""
         MRR.set(amount)
+        await self.history.record("subscriptions", gauges={"mrr": amount})
+    
+    async def record_subscription_change(self, started: bool):
+        """Record a new subscription (started=True) or a cancellation"""
+        await self.history.record(
+            "subscriptions", counters={"new_subscribers" if started else "churn": 1}
+        )
     
     def update_processing_accuracy(self, accuracy: float):
         """Update processing accuracy score"""
@@ -91,17 +162,16 @@ class MetricsCollector:
     async def get_metrics_summary(self) -> Dict[str, Any]:
         """Get current metrics summary"""
         try:
-            # Calculate percentiles
-            if self.processing_times:
-                p50 = np.percentile(self.processing_times, 50)
-                p95 = np.percentile(self.processing_times, 95)
-                p99 = np.percentile(self.processing_times, 99)
-            else:
-                p50 = p95 = p99 = 0
+            # Fleet-wide percentiles in seconds, per window
+            latency = {
+                metric: await self.latencies.windows(metric)
+                for metric in ("processing", "transcription", "analysis")
+            }
+            processing = latency["processing"]["1h"]
             
             # Calculate averages
-            avg_transcription_time = np.mean(self.transcription_times) if self.transcription_times else 0
-            avg_analysis_time = np.mean(self.analysis_times) if self.analysis_times else 0
+            avg_transcription_time = latency["transcription"]["1h"]["mean"]
+            avg_analysis_time = latency["analysis"]["1h"]["mean"]
             
             # Get subscriber and MRR data
             subscribers = SUBSCRIBERS._value._value if SUBSCRIBERS._value._value else 0
@@ -112,8 +182,10 @@ class MetricsCollector:
             
             return {
                 "meetings_processed": self.meetings_processed,
-                "avg_processing_time": p50 * 60,  # Convert to minutes
-                "p95_processing_time": p95 * 60,
+                "avg_processing_time": processing["mean"] / 60,  # Convert to minutes
+                "p50_processing_time": processing["p50"] / 60,
+                "p95_processing_time": processing["p95"] / 60,
+                "p99_processing_time": processing["p99"] / 60,
                 "avg_transcription_time": avg_transcription_time / 60,  # Convert to minutes
                 "avg_analysis_time": avg_analysis_time / 60,  # Convert to minutes
                 "cost_per_meeting": cost_per_meeting,
@@ -124,6 +196,7 @@ class MetricsCollector:
                 "tokens_used": self.tokens_used,
                 "avg_processing_time_target": 3.2,  # Target: 3.2 minutes
                 "accuracy_on_action_items": 0.91,  # Mock value
+                "latency": latency,  # Seconds, per metric and window
             }
             
         except Exception as e:
@@ -143,40 +216,50 @@ class MetricsCollector:
             logger.error("metrics_storage_failed", error=str(e))
     
     async def get_processing_history(self, hours: int = 24) -> List[Dict[str, Any]]:
-        """Get processing history for charts"""
-        import random
-        from datetime import datetime, timedelta
+        """
+        Get processing history for charts (oldest first, UTC)
         
-        history = []
-        now = datetime.now()
+        Hourly buckets up to 3 days, daily buckets beyond.
+        """
+        if hours <= 72:
+            buckets = await self.history.last("processing", "hour", hours)
+            label = "%H:00"
+        else:
+            buckets = await self.history.last("processing", "day", -(-hours // 24))
+            label = "%Y-%m-%d"
         
-        for i in range(hours):
-            timestamp = now - timedelta(hours=i)
+        history = []
+        for bucket in buckets:
+            counters = bucket["counters"]
+            meetings = int(counters.get("meetings", 0))
+            sketch = bucket["histograms"].get("processing_time")
             history.append({
-                "time": timestamp.strftime("%H:%M"),
-                "processing_time": random.uniform(150, 250),  # 2.5-4.2 minutes
-                "meetings": random.randint(1, 8),
-                "accuracy": random.uniform(0.85, 0.95),
+                "time": bucket["start"].strftime(label),
+                "processing_time": counters.get("processing_seconds", 0.0) / meetings if meetings else 0.0,
+                "p95_processing_time": sketch.quantile(0.95) if sketch else 0.0,
+                "meetings": meetings,
+                "failed": int(counters.get("failed", 0)),
+                "audio_minutes": counters.get("audio_seconds", 0.0) / 60,
             })
         
-        return list(reversed(history))
+        return history
     
     async def get_subscription_history(self, months: int = 12) -> List[Dict[str, Any]]:
-        """Get subscription history for charts"""
-        import random
-        from datetime import datetime, timedelta
+        """Get subscription history for charts (oldest first)"""
+        buckets = await self.history.last("subscriptions", "month", months)
         
         history = []
-        now = datetime.now()
-        
-        for i in range(months):
-            timestamp = now - timedelta(days=i * 30)
+        subscribers, mrr = 0, 0.0
+        for bucket in buckets:
+            # Gauges hold the last value set in the month; carry it through quiet months
+            subscribers = int(bucket["gauges"].get("subscribers", subscribers))
+            mrr = bucket["gauges"].get("mrr", mrr)
             history.append({
-                "month": timestamp.strftime("%Y-%m"),
-                "subscribers": random.randint(100, 200),
-                "mrr": random.uniform(1500, 2500),
-                "new_subscribers": random.randint(5, 20),
-                "churn": random.randint(2, 10),
+                "month": bucket["start"].strftime("%Y-%m"),
+                "subscribers": subscribers,
+                "mrr": mrr,
+                "new_subscribers": int(bucket["counters"].get("new_subscribers", 0)),
+                "churn": int(bucket["counters"].get("churn", 0)),
             })
         
-        return list(reversed(history))
+        return history
@@ -0,0 +1,171 @@
+import math
+import time
+from typing import Dict, List, Optional
+import redis.asyncio as redis
+import structlog
+
+logger = structlog.get_logger()
+
+# Every process must bucket with the same accuracy for sketches to merge
+RELATIVE_ACCURACY = 0.01
+MIN_INDEXABLE_VALUE = 1e-6  # Smaller values (e.g. 0) go to the zero bucket
+
+# Per-minute buckets in Redis; they must outlive the longest window
+BUCKET_KEY = "sketch:{metric}:{minute}"
+BUCKET_TTL_SECONDS = 2 * 3600
+WINDOWS = {"1m": 1, "5m": 5, "1h": 60}
+
+class DDSketch:
+    """
+    Fixed-memory quantile sketch (DDSketch)
+
+    - Values fall in logarithmic bins, so every quantile is within
+      RELATIVE_ACCURACY of the true value regardless of the distribution
+    - Memory is bounded by the value range, not the number of values:
+      1 ms to 24 h at 1% accuracy is about 900 bins
+    - Two sketches merge exactly by adding bin counts
+    - At most max_bins bins are kept; beyond that the lowest bins are
+      folded together, losing accuracy on the smallest values only
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, max_bins: int = 2048):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def key(self, value: float) -> Optional[int]:
+        """Bin index of a value (None for the zero bucket)"""
+        if value < MIN_INDEXABLE_VALUE:
+            return None
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, count: int = 1):
+        key = self.key(value)
+        if key is None:
+            self.zero_count += count
+        else:
+            self.bins[key] = self.bins.get(key, 0) + count
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+
+    def merge(self, other: "DDSketch"):
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 <= q <= 1); 0 for an empty sketch"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # Midpoint of (gamma^(key-1), gamma^key] in relative terms
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+    def _collapse(self):
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        folded = sum(self.bins.pop(key) for key in excess)
+        floor = keys[len(excess)]
+        self.bins[floor] += folded
+
+class SketchStore:
+    """
+    Time-windowed DDSketches shared by all processes through Redis
+
+    - Each observation increments one bin of the current minute's hash
+      (HINCRBY), so concurrent writers merge without coordination
+    - A window is the merge of its last N minute hashes, read in one pipeline:
+      the cost depends on the window length, not on the number of observations
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+        self._sketch = DDSketch()  # Only used for bin indexing
+
+    async def record(self, metric: str, value: float):
+        """Add one observation to the current minute bucket"""
+        try:
+            key = BUCKET_KEY.format(metric=metric, minute=int(time.time() // 60))
+            bin_key = self._sketch.key(value)
+
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hincrby(key, "z" if bin_key is None else str(bin_key), 1)
+            pipe.hincrby(key, "n", 1)
+            pipe.hincrbyfloat(key, "s", value)
+            pipe.expire(key, BUCKET_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            logger.error("sketch_record_failed", metric=metric, error=str(e))
+
+    async def window(self, metric: str, minutes: int) -> DDSketch:
+        """Merged sketch of the last `minutes` minute buckets (current one included)"""
+        merged = DDSketch()
+        for sketch in await self._buckets(metric, minutes):
+            merged.merge(sketch)
+        return merged
+
+    async def windows(self, metric: str) -> Dict[str, Dict[str, float]]:
+        """Summaries for every window in WINDOWS (one read of the longest window)"""
+        buckets = await self._buckets(metric, max(WINDOWS.values()))
+
+        summaries = {}
+        for name, minutes in WINDOWS.items():
+            merged = DDSketch()
+            for sketch in buckets[-minutes:]:
+                merged.merge(sketch)
+            summaries[name] = merged.summary()
+        return summaries
+
+    async def _buckets(self, metric: str, minutes: int) -> List[DDSketch]:
+        """Minute buckets oldest first, read in one pipeline"""
+        now = int(time.time() // 60)
+        pipe = self.redis.pipeline(transaction=False)
+        for minute in range(now - minutes + 1, now + 1):
+            pipe.hgetall(BUCKET_KEY.format(metric=metric, minute=minute))
+        return [self._decode(bucket) for bucket in await pipe.execute()]
+
+    @staticmethod
+    def _decode(bucket: Dict) -> DDSketch:
+        sketch = DDSketch()
+        for field, value in bucket.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            if field == "n":
+                sketch.count = int(value)
+            elif field == "s":
+                sketch.sum = float(value)
+            elif field == "z":
+                sketch.zero_count = int(value)
+            else:
+                sketch.bins[int(field)] = int(value)
+        return sketch
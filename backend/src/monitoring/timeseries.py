@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import redis.asyncio as redis
+import structlog
+
+from src.core.config import get_settings
+from src.monitoring.sketch import DDSketch
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+BUCKET_KEY = "ts:{series}:{resolution}:{bucket}"
+BUCKET_FORMATS = {
+    "minute": "%Y%m%d%H%M",
+    "hour": "%Y%m%d%H",
+    "day": "%Y%m%d",
+    "month": "%Y%m",
+}
+RESOLUTIONS = list(BUCKET_FORMATS)
+
+class TimeSeriesStore:
+    """
+    Rollup time series in Redis
+
+    - One hash per series, resolution and bucket (minute, hour, day, month)
+    - Writes update every resolution in one pipeline, so rollups are
+      maintained as data arrives and reads never aggregate raw events
+    - Counters (HINCRBY), gauges (last value wins) and histograms
+      (DDSketch bins, mergeable and summarized on read)
+    - Each resolution expires after TIMESERIES_RETENTION_DAYS[resolution]
+    - A range is one pipeline of HGETALLs, one per bucket: 30 days of
+      daily buckets is 30 hash reads
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+        self._sketch = DDSketch()  # Only used for bin indexing
+
+    async def record(
+        self,
+        series: str,
+        counters: Optional[Dict[str, float]] = None,
+        gauges: Optional[Dict[str, float]] = None,
+        histograms: Optional[Dict[str, float]] = None,
+        at: Optional[datetime] = None
+    ):
+        """Add one observation to every resolution's current bucket"""
+        at = at or datetime.utcnow()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for resolution in RESOLUTIONS:
+                key = BUCKET_KEY.format(
+                    series=series, resolution=resolution, bucket=at.strftime(BUCKET_FORMATS[resolution])
+                )
+                for name, value in (counters or {}).items():
+                    if isinstance(value, int):
+                        pipe.hincrby(key, f"c:{name}", value)
+                    else:
+                        pipe.hincrbyfloat(key, f"c:{name}", value)
+                for name, value in (gauges or {}).items():
+                    pipe.hset(key, f"g:{name}", value)
+                for name, value in (histograms or {}).items():
+                    bin_key = self._sketch.key(value)
+                    pipe.hincrby(key, f"h:{name}:{'z' if bin_key is None else bin_key}", 1)
+                    pipe.hincrby(key, f"h:{name}:n", 1)
+                    pipe.hincrbyfloat(key, f"h:{name}:s", value)
+                pipe.expire(key, settings.TIMESERIES_RETENTION_DAYS[resolution] * 86400)
+            await pipe.execute()
+        except Exception as e:
+            logger.error("timeseries_record_failed", series=series, error=str(e))
+
+    async def range(
+        self,
+        series: str,
+        resolution: str,
+        start: datetime,
+        end: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Buckets from the one containing `start` to the one containing `end`
+
+        Returns:
+            Oldest first: [{"start": datetime, "counters": {...},
+            "gauges": {...}, "histograms": {name: DDSketch}}, ...]
+            Empty buckets are included with empty dicts.
+        """
+        starts = []
+        current = _floor(resolution, start)
+        while current <= end:
+            starts.append(current)
+            current = _next(resolution, current)
+
+        pipe = self.redis.pipeline(transaction=False)
+        for bucket_start in starts:
+            pipe.hgetall(BUCKET_KEY.format(
+                series=series, resolution=resolution, bucket=bucket_start.strftime(BUCKET_FORMATS[resolution])
+            ))
+
+        return [
+            {"start": bucket_start, **self._decode(bucket)}
+            for bucket_start, bucket in zip(starts, await pipe.execute())
+        ]
+
+    async def last(self, series: str, resolution: str, count: int) -> List[Dict[str, Any]]:
+        """The `count` most recent buckets, current one included, oldest first"""
+        end = datetime.utcnow()
+        start = _floor(resolution, end)
+        for _ in range(count - 1):
+            start = _previous(resolution, start)
+        return await self.range(series, resolution, start, end)
+
+    @staticmethod
+    def _decode(bucket: Dict) -> Dict[str, Any]:
+        counters, gauges, histograms = {}, {}, {}
+        for field, value in bucket.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            kind, name = field[:1], field[2:]
+            if kind == "c":
+                counters[name] = float(value)
+            elif kind == "g":
+                gauges[name] = float(value)
+            elif kind == "h":
+                name, part = name.rsplit(":", 1)
+                sketch = histograms.setdefault(name, DDSketch())
+                if part == "n":
+                    sketch.count = int(value)
+                elif part == "s":
+                    sketch.sum = float(value)
+                elif part == "z":
+                    sketch.zero_count = int(value)
+                else:
+                    sketch.bins[int(part)] = int(value)
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+def _floor(resolution: str, at: datetime) -> datetime:
+    if resolution == "minute":
+        return at.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def _next(resolution: str, start: datetime) -> datetime:
+    if resolution == "minute":
+        return start + timedelta(minutes=1)
+    if resolution == "hour":
+        return start + timedelta(hours=1)
+    if resolution == "day":
+        return start + timedelta(days=1)
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+def _previous(resolution: str, start: datetime) -> datetime:
+    if resolution == "month":
+        return start.replace(year=start.year - (start.month == 1), month=(start.month - 2) % 12 + 1)
+    return start - (_next(resolution, start) - start)
@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Sequence
+import structlog
+from opentelemetry import context, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Status, StatusCode
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from src.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+# Spans are no-ops until setup_tracing() installs a provider
+tracer = trace.get_tracer("meetinggpt")
+
+_propagator = TraceContextTextMapPropagator()
+_provider: Optional[TracerProvider] = None
+
+class FileSpanExporter(SpanExporter):
+    """Append finished spans to a JSON-lines file (one span per line)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+            with self._lock, open(self.path, "a") as f:
+                f.write(lines)
+            return SpanExportResult.SUCCESS
+        except Exception:
+            return SpanExportResult.FAILURE
+
+    def shutdown(self):
+        pass
+
+def setup_tracing(service_name: str):
+    """
+    Install the tracer provider for this process
+
+    TRACING_EXPORTER selects where spans go: "none" (tracing off),
+    "file" (TRACING_FILE_PATH), "console" or "otlp" (TRACING_OTLP_ENDPOINT,
+    requires opentelemetry-exporter-otlp-proto-http).
+    """
+    global _provider
+    if settings.TRACING_EXPORTER == "none" or _provider:
+        return
+
+    if settings.TRACING_EXPORTER == "file":
+        exporter = FileSpanExporter(settings.TRACING_FILE_PATH)
+    elif settings.TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    elif settings.TRACING_EXPORTER == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.error("otlp_exporter_unavailable", hint="pip install opentelemetry-exporter-otlp-proto-http")
+            return
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    else:
+        raise ValueError(f"Unknown tracing exporter: {settings.TRACING_EXPORTER}")
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO))
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info("tracing_enabled", exporter=settings.TRACING_EXPORTER, service=service_name)
+
+def shutdown_tracing():
+    """Flush and stop span export"""
+    if _provider:
+        _provider.shutdown()
+
+def inject_context() -> Dict[str, str]:
+    """W3C trace context of the current span, to store with a job"""
+    carrier: Dict[str, str] = {}
+    _propagator.inject(carrier)
+    return carrier
+
+def extract_context(carrier: Optional[Dict[str, str]]) -> Optional[context.Context]:
+    """Parent context from inject_context() output (None starts a new trace)"""
+    if not carrier:
+        return None
+    return _propagator.extract(carrier)
+
+def mark_error(error: BaseException):
+    """Record a handled error on the current span"""
+    span = trace.get_current_span()
+    span.record_exception(error)
+    span.set_status(Status(StatusCode.ERROR, str(error)))
+
+def add_trace_context(_logger: Any, _method: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """structlog processor adding trace_id/span_id of the current span"""
+    span_context = trace.get_current_span().get_span_context()
+    if span_context.is_valid:
+        event_dict["trace_id"] = format(span_context.trace_id, "032x")
+        event_dict["span_id"] = format(span_context.span_id, "016x")
+    return event_dict
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import re
+import tempfile
+from typing import List, Dict, Tuple
+
+SILENCE_START_RE = re.compile(r"silence_start: (-?\d+(?:\.\d+)?)")
+SILENCE_END_RE = re.compile(r"silence_end: (-?\d+(?:\.\d+)?)")
+
+async def _run(*args: str) -> Tuple[int, bytes, bytes]:
+    """Run a subprocess and capture its output"""
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # Don't leave ffmpeg running for a cancelled or timed-out job
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, stdout, stderr
+
+class AudioChunker:
+    """
+    Split long recordings into overlapping windows for parallel transcription
+
+    - Cut points are placed in the middle of detected silences
+    - Each window is padded with `overlap_seconds` on both sides so words at
+      the cut are heard in full by at least one window
+    - Windows are stream-copied with ffmpeg (no re-encode)
+    """
+
+    def __init__(
+        self,
+        chunk_seconds: float = 600,
+        overlap_seconds: float = 2.0,
+        silence_threshold_db: int = -35,
+        min_silence_seconds: float = 0.4,
+    ):
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.silence_threshold_db = silence_threshold_db
+        self.min_silence_seconds = min_silence_seconds
+
+    async def probe_duration(self, audio_path: str) -> float:
+        """Get audio duration in seconds with ffprobe"""
+        code, stdout, stderr = await _run(
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            audio_path,
+        )
+        if code != 0:
+            raise RuntimeError(f"ffprobe failed: {stderr.decode(errors='ignore')[-500:]}")
+        return float(stdout.decode().strip())
+
+    async def detect_silences(self, audio_path: str) -> List[Tuple[float, float]]:
+        """Find (start, end) silence intervals with ffmpeg silencedetect"""
+        code, _stdout, stderr = await _run(
+            "ffmpeg", "-hide_banner", "-nostats", "-i", audio_path,
+            "-af", f"silencedetect=noise={self.silence_threshold_db}dB:d={self.min_silence_seconds}",
+            "-f", "null", "-",
+        )
+        if code != 0:
+            raise RuntimeError(f"ffmpeg silencedetect failed: {stderr.decode(errors='ignore')[-500:]}")
+
+        silences = []
+        start = None
+        for line in stderr.decode(errors="ignore").splitlines():
+            start_match = SILENCE_START_RE.search(line)
+            if start_match:
+                start = max(0.0, float(start_match.group(1)))
+                continue
+            end_match = SILENCE_END_RE.search(line)
+            if end_match and start is not None:
+                silences.append((start, float(end_match.group(1))))
+                start = None
+
+        return silences
+
+    def plan_windows(self, duration: float, silences: List[Tuple[float, float]]) -> List[Dict]:
+        """
+        Plan chunk windows
+
+        Returns:
+            [{"index": 0, "start": 0.0, "end": 601.5, "keep_from": 0.0, "keep_until": 599.5}]
+
+            `start`/`end` is the padded range that gets transcribed;
+            `keep_from`/`keep_until` is the range whose segments are kept when
+            stitching, so adjacent windows never contribute the same words.
+        """
+        cut_points = []
+        position = 0.0
+        while duration - position > self.chunk_seconds:
+            target = position + self.chunk_seconds
+            # Prefer the latest silence in the back half of the window
+            candidates = [
+                (s + e) / 2 for s, e in silences
+                if position + self.chunk_seconds / 2 <= (s + e) / 2 <= target
+            ]
+            cut = max(candidates) if candidates else target
+            cut_points.append(cut)
+            position = cut
+
+        boundaries = [0.0] + cut_points + [duration]
+        windows = []
+        for i in range(len(boundaries) - 1):
+            keep_from, keep_until = boundaries[i], boundaries[i + 1]
+            windows.append({
+                "index": i,
+                "start": max(0.0, keep_from - self.overlap_seconds),
+                "end": min(duration, keep_until + self.overlap_seconds),
+                "keep_from": keep_from,
+                "keep_until": keep_until,
+            })
+
+        return windows
+
+    async def split(self, audio_path: str, duration: float = None) -> Tuple[List[Dict], str]:
+        """
+        Cut the recording into window files
+
+        Returns:
+            (windows with a "path" key, temp directory to remove afterwards)
+        """
+        if duration is None:
+            duration = await self.probe_duration(audio_path)
+        silences = await self.detect_silences(audio_path)
+        windows = self.plan_windows(duration, silences)
+
+        workdir = tempfile.mkdtemp(prefix="meetinggpt-chunks-")
+        extension = os.path.splitext(audio_path)[1] or ".wav"
+
+        async def cut(window: Dict):
+            window["path"] = os.path.join(workdir, f"chunk_{window['index']:04d}{extension}")
+            code, _stdout, stderr = await _run(
+                "ffmpeg", "-hide_banner", "-nostats", "-y",
+                "-ss", f"{window['start']:.3f}",
+                "-t", f"{window['end'] - window['start']:.3f}",
+                "-i", audio_path,
+                "-vn", "-c:a", "copy",
+                window["path"],
+            )
+            if code != 0:
+                raise RuntimeError(f"ffmpeg chunk cut failed: {stderr.decode(errors='ignore')[-500:]}")
+
+        await asyncio.gather(*(cut(window) for window in windows))
+
+        return windows, workdir
+
+def stitch_segments(windows: List[Dict], results: List[Dict]) -> Dict:
+    """
+    Merge per-window Whisper results into one verbose_json-like result
+
+    Segment timestamps are shifted by the window start, segments whose
+    midpoint falls outside the window's keep range are dropped, and a
+    leading segment repeating the previous segment's text is removed.
+    """
+    segments = []
+    for window, result in zip(windows, results):
+        for seg in result.get("segments", []):
+            start = seg["start"] + window["start"]
+            end = seg["end"] + window["start"]
+            midpoint = (start + end) / 2
+            if not window["keep_from"] <= midpoint < window["keep_until"] and not (
+                window["index"] == len(windows) - 1 and midpoint >= window["keep_until"]
+            ):
+                continue
+
+            text = seg.get("text", "").strip()
+            if segments and _normalize(text) and _normalize(text) == _normalize(segments[-1]["text"]):
+                continue
+
+            segments.append({**seg, "id": len(segments), "start": start, "end": end})
+
+    return {
+        "text": " ".join(seg["text"].strip() for seg in segments),
+        "segments": segments,
+    }
+
+def _normalize(text: str) -> str:
+    """Normalize text for overlap comparison"""
+    return re.sub(r"[^\w\s]", "", text.lower()).strip()
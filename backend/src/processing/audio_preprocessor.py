@@ -0,0 +1,156 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from typing import List, Dict, Tuple
+import structlog
+
+from src.monitoring.metrics import PREPROCESS_LATENCY, PREPROCESS_BYTES, PREPROCESS_BYTES_SAVED
+from src.processing.audio_chunker import _run, SILENCE_START_RE, SILENCE_END_RE
+
+logger = structlog.get_logger()
+
+class AudioPreprocessor:
+    """
+    Shrink recordings before they are sent to Whisper
+
+    - Drops video, downmixes to mono and resamples to 16 kHz
+    - Trims leading and trailing silence; `offset` in the result is the
+      trimmed lead, to be added back to transcript timestamps
+    - Encodes Opus in Ogg at a speech bitrate (24 kbps: ~11 MB per hour)
+    - At most `max_concurrency` ffmpeg encodes run at once per process
+    """
+
+    def __init__(
+        self,
+        bitrate: str = "24k",
+        max_concurrency: int = 2,
+        silence_threshold_db: int = -45,
+        min_silence_seconds: float = 0.5,
+        pad_seconds: float = 0.25,
+    ):
+        self.bitrate = bitrate
+        self.silence_threshold_db = silence_threshold_db
+        self.min_silence_seconds = min_silence_seconds
+        self.pad_seconds = pad_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def prepare(self, audio_path: str) -> Dict:
+        """
+        Preprocess a recording
+
+        Returns:
+            {"path": str, "offset": float, "workdir": str | None}
+
+            Falls back to the original file (offset 0) if ffmpeg fails or
+            the result would not be smaller.
+        """
+        original = {"path": audio_path, "offset": 0.0, "workdir": None}
+        original_bytes = os.path.getsize(audio_path)
+
+        async with self._semaphore:
+            started = time.perf_counter()
+            workdir = tempfile.mkdtemp(prefix="meetinggpt-preprocess-")
+            output_path = os.path.join(workdir, "audio.ogg")
+
+            try:
+                start, end = await self._speech_bounds(audio_path)
+                await self._encode(audio_path, output_path, start, end)
+            except Exception as e:
+                shutil.rmtree(workdir, ignore_errors=True)
+                logger.error("audio_preprocess_failed", audio_path=audio_path, error=str(e))
+                return original
+
+            PREPROCESS_LATENCY.observe(time.perf_counter() - started)
+
+        output_bytes = os.path.getsize(output_path)
+        if output_bytes >= original_bytes:
+            shutil.rmtree(workdir, ignore_errors=True)
+            return original
+
+        PREPROCESS_BYTES.labels(stage="input").inc(original_bytes)
+        PREPROCESS_BYTES.labels(stage="output").inc(output_bytes)
+        PREPROCESS_BYTES_SAVED.inc(original_bytes - output_bytes)
+
+        logger.info(
+            "audio_preprocessed",
+            original_bytes=original_bytes,
+            output_bytes=output_bytes,
+            trimmed_lead=round(start, 2)
+        )
+
+        return {"path": output_path, "offset": start, "workdir": workdir}
+
+    @staticmethod
+    def cleanup(prepared: Dict):
+        """Remove files created by prepare()"""
+        if prepared.get("workdir"):
+            shutil.rmtree(prepared["workdir"], ignore_errors=True)
+
+    async def _speech_bounds(self, audio_path: str) -> Tuple[float, float]:
+        """(start, end) in seconds of the recording without edge silence"""
+        code, _stdout, stderr = await _run(
+            "ffmpeg", "-hide_banner", "-nostats", "-i", audio_path,
+            "-vn", "-ac", "1", "-ar", "16000",
+            "-af", f"silencedetect=noise={self.silence_threshold_db}dB:d={self.min_silence_seconds}",
+            "-f", "null", "-",
+        )
+        if code != 0:
+            raise RuntimeError(f"ffmpeg silencedetect failed: {stderr.decode(errors='ignore')[-500:]}")
+
+        silences: List[Tuple[float, float]] = []
+        open_start = None
+        for line in stderr.decode(errors="ignore").splitlines():
+            start_match = SILENCE_START_RE.search(line)
+            if start_match:
+                open_start = max(0.0, float(start_match.group(1)))
+                continue
+            end_match = SILENCE_END_RE.search(line)
+            if end_match and open_start is not None:
+                silences.append((open_start, float(end_match.group(1))))
+                open_start = None
+
+        duration = _parse_duration(stderr.decode(errors="ignore"))
+        start, end = 0.0, duration
+
+        if silences and silences[0][0] <= 0.05:
+            start = max(0.0, silences[0][1] - self.pad_seconds)
+        # A silence still open at EOF, or one ending at EOF, is trailing silence
+        if open_start is not None:
+            end = open_start + self.pad_seconds
+        elif silences and duration and silences[-1][1] >= duration - 0.05:
+            end = silences[-1][0] + self.pad_seconds
+
+        if not duration or end <= start:
+            return 0.0, 0.0  # Unknown length or silence only: don't trim
+        return start, end
+
+    async def _encode(self, audio_path: str, output_path: str, start: float, end: float):
+        trim = []
+        if end > start:
+            trim = ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}"]
+
+        code, _stdout, stderr = await _run(
+            "ffmpeg", "-hide_banner", "-nostats", "-y",
+            *trim,
+            "-i", audio_path,
+            "-vn", "-map", "0:a:0",
+            "-ac", "1", "-ar", "16000",
+            "-c:a", "libopus", "-b:a", self.bitrate, "-application", "voip",
+            output_path,
+        )
+        if code != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {stderr.decode(errors='ignore')[-500:]}")
+
+def _parse_duration(ffmpeg_log: str) -> float:
+    """Input duration from ffmpeg's "Duration: HH:MM:SS.ss" banner line"""
+    for line in ffmpeg_log.splitlines():
+        line = line.strip()
+        if line.startswith("Duration:"):
+            value = line.split(",")[0].split(" ", 1)[1].strip()
+            if value == "N/A":
+                return 0.0
+            hours, minutes, seconds = value.split(":")
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return 0.0
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import struct
+from typing import Any, Dict, Optional
+import structlog
+
+from src.processing.audio_chunker import _run
+
+logger = structlog.get_logger()
+
+WAV_CODECS = {1: "pcm", 3: "pcm_float", 6: "pcm_alaw", 7: "pcm_mulaw", 0xFFFE: "pcm"}
+
+async def probe_audio(audio_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read duration and codec of a recording without decoding it
+
+    Uses ffprobe (container headers only), falling back to parsing the
+    header of WAV files when ffprobe is missing or fails.
+
+    Returns:
+        {"duration_seconds", "codec", "sample_rate", "channels", "bit_rate",
+        "source"} or None if the duration can't be determined
+    """
+    try:
+        info = await _ffprobe(audio_path)
+        if info:
+            return info
+    except Exception as e:
+        logger.warning("ffprobe_failed", audio_path=audio_path, error=str(e))
+
+    try:
+        return await asyncio.to_thread(_parse_wav_header, audio_path)
+    except Exception as e:
+        logger.warning("audio_header_parse_failed", audio_path=audio_path, error=str(e))
+        return None
+
+async def _ffprobe(audio_path: str) -> Optional[Dict[str, Any]]:
+    code, stdout, stderr = await _run(
+        "ffprobe", "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "format=duration,bit_rate:stream=codec_name,sample_rate,channels,duration",
+        "-of", "json",
+        audio_path,
+    )
+    if code != 0:
+        raise RuntimeError(f"ffprobe failed: {stderr.decode(errors='ignore')[-500:]}")
+
+    data = json.loads(stdout or b"{}")
+    container = data.get("format") or {}
+    stream = (data.get("streams") or [{}])[0]
+
+    duration = _number(container.get("duration")) or _number(stream.get("duration"))
+    bit_rate = _number(container.get("bit_rate"))
+    if not duration and bit_rate:
+        # Headerless streams: ffprobe knows the bitrate but not the length
+        duration = os.path.getsize(audio_path) * 8 / bit_rate
+    if not duration:
+        return None
+
+    return {
+        "duration_seconds": duration,
+        "codec": stream.get("codec_name"),
+        "sample_rate": int(_number(stream.get("sample_rate")) or 0) or None,
+        "channels": stream.get("channels"),
+        "bit_rate": int(bit_rate) if bit_rate else None,
+        "source": "ffprobe"
+    }
+
+def _parse_wav_header(audio_path: str) -> Optional[Dict[str, Any]]:
+    """Duration of a RIFF/WAVE file from its fmt and data chunk headers"""
+    file_size = os.path.getsize(audio_path)
+    with open(audio_path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = header[:4], struct.unpack("<I", header[4:])[0]
+
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                if len(body) < 16:
+                    return None
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                # Streamed writers leave the size at 0 or 0xFFFFFFFF
+                available = file_size - f.tell()
+                data_size = chunk_size if 0 < chunk_size <= available else available
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    audio_format, channels, sample_rate, byte_rate, _block_align, _bits = fmt
+    if not byte_rate:
+        return None
+
+    return {
+        "duration_seconds": data_size / byte_rate,
+        "codec": WAV_CODECS.get(audio_format, f"wav_{audio_format}"),
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "bit_rate": byte_rate * 8,
+        "source": "wav_header"
+    }
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
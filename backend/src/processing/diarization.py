@@ -0,0 +1,414 @@
+import abc
+import asyncio
+import multiprocessing
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Dict, Optional
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 400      # 25 ms
+FRAME_HOP = 160         # 10 ms
+FFT_SIZE = 512
+MEL_BANDS = 40
+MFCC_COUNT = 20
+BLOCK_SECONDS = 30      # PCM is decoded and featurized in blocks of this length
+
+class DiarizationCancelled(Exception):
+    """Raised inside a diarizer once its job has been cancelled"""
+
+class SpeakerDiarizer(abc.ABC):
+    """
+    Answers "who spoke when" as a list of {"start", "end", "speaker"} turns
+
+    `cancelled` is an Event-like object (anything with is_set()); diarizers
+    check it between steps and raise DiarizationCancelled once it is set.
+    """
+
+    @abc.abstractmethod
+    def diarize(self, audio_path: str, cancelled: Any = None) -> List[Dict]:
+        ...
+
+def _check_cancelled(cancelled: Any):
+    if cancelled is not None and cancelled.is_set():
+        raise DiarizationCancelled()
+
+class ReferenceDiarizer(SpeakerDiarizer):
+    """
+    CPU-only reference diarization in NumPy
+
+    - ffmpeg decodes to 16 kHz mono PCM, featurized block by block
+      (memory stays flat for multi-hour recordings)
+    - Energy VAD with an adaptive noise floor
+    - Window embeddings: mean/std of mean-normalized MFCCs over 1.5 s
+    - Average-linkage agglomerative clustering on cosine distance over
+      a sample of windows; all windows join the nearest cluster
+    """
+
+    def __init__(
+        self,
+        max_speakers: int = 8,
+        threshold: float = 0.3,
+        window_seconds: float = 1.5,
+        hop_seconds: float = 0.75,
+        max_cluster_windows: int = 1500,
+        min_pause_seconds: float = 0.5,
+    ):
+        self.max_speakers = max_speakers
+        self.threshold = threshold
+        self.window_frames = int(window_seconds * SAMPLE_RATE / FRAME_HOP)
+        self.hop_frames = int(hop_seconds * SAMPLE_RATE / FRAME_HOP)
+        self.max_cluster_windows = max_cluster_windows
+        self.min_pause_seconds = min_pause_seconds
+
+        self._mel = _mel_filterbank()
+        self._dct = _dct_matrix(MEL_BANDS, MFCC_COUNT + 1)
+        self._window = np.hamming(FRAME_LENGTH).astype(np.float32)
+
+    def diarize(self, audio_path: str, cancelled: Any = None) -> List[Dict]:
+        mfcc, log_energy = self._features(audio_path, cancelled)
+        if not len(log_energy):
+            return []
+
+        _check_cancelled(cancelled)
+        speech = self._vad(log_energy)
+        starts, embeddings = self._embed_windows(mfcc, speech)
+        if not len(starts):
+            return []
+
+        _check_cancelled(cancelled)
+        labels = self._cluster(embeddings)
+        return self._turns(starts, labels, speech)
+
+    def _features(self, audio_path: str, cancelled: Any = None):
+        """Stream PCM from ffmpeg and compute per-frame MFCCs and log energy"""
+        process = subprocess.Popen(
+            [
+                "ffmpeg", "-v", "error", "-i", audio_path,
+                "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+        mfccs, energies = [], []
+        block_bytes = BLOCK_SECONDS * SAMPLE_RATE * 2
+        carry = np.zeros(0, dtype=np.float32)
+
+        try:
+            while True:
+                _check_cancelled(cancelled)
+                data = process.stdout.read(block_bytes)
+                if not data:
+                    break
+                pcm = np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+                samples = np.concatenate([carry, pcm])
+                if len(samples) < FRAME_LENGTH:
+                    carry = samples
+                    continue
+
+                frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_LENGTH)[::FRAME_HOP]
+                # Keep the tail that has not started a frame yet
+                carry = samples[len(frames) * FRAME_HOP:]
+
+                power = np.abs(np.fft.rfft(frames * self._window, FFT_SIZE)) ** 2
+                energies.append(np.log(power.sum(axis=1) + 1e-10))
+                log_mel = np.log(power @ self._mel.T + 1e-10)
+                mfccs.append((log_mel @ self._dct.T)[:, 1:])  # Drop c0 (loudness)
+        except BaseException:
+            process.kill()  # Don't wait for ffmpeg to decode the rest
+            raise
+        finally:
+            process.stdout.close()
+            process.wait()
+
+        # A partial decode is still a failure; don't diarize a truncated recording
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg could not decode {audio_path} (exit code {process.returncode})")
+
+        if not energies:
+            return np.zeros((0, MFCC_COUNT), dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+        mfcc = np.concatenate(mfccs).astype(np.float32)
+        mfcc -= mfcc.mean(axis=0)  # Cepstral mean normalization
+        return mfcc, np.concatenate(energies).astype(np.float32)
+
+    def _vad(self, log_energy: np.ndarray) -> np.ndarray:
+        """Speech mask per frame, smoothed over 300 ms"""
+        floor = np.percentile(log_energy, 10)
+        peak = np.percentile(log_energy, 99)
+        raw = log_energy > floor + 0.25 * (peak - floor)
+
+        kernel = np.ones(30, dtype=np.float32) / 30
+        return np.convolve(raw.astype(np.float32), kernel, mode="same") > 0.5
+
+    def _embed_windows(self, mfcc: np.ndarray, speech: np.ndarray):
+        """Mean+std embeddings of windows that are mostly speech"""
+        n = len(mfcc) - self.window_frames + 1
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 2 * MFCC_COUNT), dtype=np.float32)
+
+        starts = np.arange(0, n, self.hop_frames)
+        speech_sum = np.concatenate([[0], np.cumsum(speech)])
+        speech_ratio = (speech_sum[starts + self.window_frames] - speech_sum[starts]) / self.window_frames
+        starts = starts[speech_ratio >= 0.5]
+        if not len(starts):
+            return starts, np.zeros((0, 2 * MFCC_COUNT), dtype=np.float32)
+
+        # Cumulative sums give every window's mean and variance in O(frames)
+        csum = np.vstack([np.zeros((1, MFCC_COUNT)), np.cumsum(mfcc, axis=0, dtype=np.float64)])
+        csq = np.vstack([np.zeros((1, MFCC_COUNT)), np.cumsum(mfcc.astype(np.float64) ** 2, axis=0)])
+        ends = starts + self.window_frames
+        mean = (csum[ends] - csum[starts]) / self.window_frames
+        std = np.sqrt(np.maximum((csq[ends] - csq[starts]) / self.window_frames - mean ** 2, 1e-8))
+
+        embeddings = np.hstack([mean, std])
+        embeddings -= embeddings.mean(axis=0)  # Cosine then compares deviations from the average voice
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8
+        return starts, embeddings.astype(np.float32)
+
+    def _cluster(self, embeddings: np.ndarray) -> np.ndarray:
+        """Cluster labels per window"""
+        n = len(embeddings)
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(n, size=min(n, self.max_cluster_windows), replace=False))
+        clusters = _agglomerate(embeddings[sample], self.threshold, self.max_speakers)
+
+        # Tiny clusters are usually windows straddling a speaker change; fold them into their neighbours
+        min_size = max(3, int(0.02 * len(sample)))
+        clusters = [members for members in clusters if len(members) >= min_size] or clusters
+
+        centroids = np.stack([embeddings[sample][members].mean(axis=0) for members in clusters])
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-8
+        labels = np.argmax(embeddings @ centroids.T, axis=1)
+
+        # Majority vote over neighbouring windows removes single-window flips
+        if n >= 3:
+            padded = np.concatenate([labels[:1], labels, labels[-1:]])
+            neighbours = np.stack([padded[:-2], padded[1:-1], padded[2:]])
+            agree = neighbours[0] == neighbours[2]
+            labels = np.where(agree, neighbours[0], labels)
+        return labels
+
+    def _turns(self, starts: np.ndarray, labels: np.ndarray, speech: np.ndarray) -> List[Dict]:
+        """Merge labelled windows into speaker turns, trimmed to speech"""
+        frame_seconds = FRAME_HOP / SAMPLE_RATE
+        half_hop = self.hop_frames // 2
+        centers = starts + self.window_frames // 2
+
+        # Speaker names in order of first appearance
+        names: Dict[int, str] = {}
+        for label in labels:
+            names.setdefault(int(label), f"Speaker {len(names) + 1}")
+
+        frame_labels = np.full(len(speech), -1, dtype=np.int64)
+        for center, label in zip(centers, labels):
+            frame_labels[max(center - half_hop, 0):center + half_hop + 1] = label
+
+        # Speech frames no window covered take the nearest labelled frame
+        labelled = np.flatnonzero(frame_labels >= 0)
+        if len(labelled) > 1:
+            frames = np.arange(len(speech))
+            after = np.clip(np.searchsorted(labelled, frames), 1, len(labelled) - 1)
+            left, right = labelled[after - 1], labelled[after]
+            frame_labels = frame_labels[np.where(frames - left <= right - frames, left, right)]
+        frame_labels[~speech] = -1
+
+        turns = []
+        changes = np.flatnonzero(np.diff(frame_labels, prepend=-2, append=-2))
+        for begin, end in zip(changes[:-1], changes[1:]):
+            label = frame_labels[begin]
+            if label < 0:
+                continue
+
+            start, end = float(begin * frame_seconds), float(end * frame_seconds)
+            speaker = names[int(label)]
+            # Bridge short pauses within one speaker's turn
+            if turns and turns[-1]["speaker"] == speaker and start - turns[-1]["end"] < self.min_pause_seconds:
+                turns[-1]["end"] = round(end, 2)
+            else:
+                turns.append({"start": round(start, 2), "end": round(end, 2), "speaker": speaker})
+        return turns
+
+class PyannoteDiarizer(SpeakerDiarizer):
+    """pyannote.audio pipeline (optional dependency, GPU if available)"""
+
+    def __init__(self, auth_token: str = None, max_speakers: int = 8):
+        try:
+            from pyannote.audio import Pipeline
+        except ImportError as e:
+            raise RuntimeError("DIARIZATION_BACKEND=pyannote requires pyannote.audio") from e
+
+        self.pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", use_auth_token=auth_token)
+        self.max_speakers = max_speakers
+
+    def diarize(self, audio_path: str, cancelled: Any = None) -> List[Dict]:
+        # The pipeline reports progress through `hook`; raising there aborts it
+        hook = lambda *args, **kwargs: _check_cancelled(cancelled)
+        annotation = self.pipeline(audio_path, max_speakers=self.max_speakers, hook=hook)
+        names: Dict[str, str] = {}
+        turns = []
+        for segment, _, label in annotation.itertracks(yield_label=True):
+            names.setdefault(label, f"Speaker {len(names) + 1}")
+            turns.append({"start": segment.start, "end": segment.end, "speaker": names[label]})
+        return turns
+
+def create_diarizer(backend: str, **options) -> SpeakerDiarizer:
+    """Diarizer for the configured backend"""
+    if backend == "reference":
+        return ReferenceDiarizer(
+            max_speakers=options.get("max_speakers", 8),
+            threshold=options.get("threshold", 0.3)
+        )
+    if backend == "pyannote":
+        return PyannoteDiarizer(options.get("auth_token"), max_speakers=options.get("max_speakers", 8))
+    raise ValueError(f"Unknown diarization backend: {backend}")
+
+# One diarizer per pool process, built on first use (models load once)
+_process_diarizers: Dict[str, SpeakerDiarizer] = {}
+
+def _diarize_in_process(backend: str, options: Dict, audio_path: str, cancelled: Any) -> List[Dict]:
+    diarizer = _process_diarizers.get(backend)
+    if diarizer is None:
+        diarizer = _process_diarizers[backend] = create_diarizer(backend, **options)
+    try:
+        return diarizer.diarize(audio_path, cancelled)
+    except DiarizationCancelled:
+        return []  # Nobody is waiting for the result
+
+class DiarizationPool:
+    """
+    Runs a diarization backend in worker processes
+
+    Keeps CPU-bound clustering off the event loop and out of the GIL so
+    it can overlap with the Whisper requests.
+
+    Cancelling diarize() sets a per-call Event shared with the pool
+    process; the diarizer stops at its next check (at most one decoded
+    block or one stage later) and frees the slot.
+    """
+
+    def __init__(self, backend: str, max_workers: int = 2, **options):
+        self.backend = backend
+        self.max_workers = max_workers
+        self.options = options
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+
+    async def diarize(self, audio_path: str) -> List[Dict]:
+        if self._executor is None:
+            # spawn: forking a process with a running event loop and threads is unsafe
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            # Manager events can be passed to pool processes with each call
+            self._manager = context.Manager()
+
+        cancelled = self._manager.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, _diarize_in_process, self.backend, self.options, audio_path, cancelled
+            )
+        except asyncio.CancelledError:
+            # Queued calls are dropped by the executor; a running one stops at its next check
+            cancelled.set()
+            raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+def assign_speakers(segments: List[Dict], turns: List[Dict]) -> List[Dict]:
+    """
+    Label each transcript segment with the speaker overlapping it most
+
+    Segments without any overlapping turn take the nearest turn's speaker.
+    """
+    if not turns:
+        return [{**seg, "speaker": "Speaker 1"} for seg in segments]
+
+    turns = sorted(turns, key=lambda t: t["start"])
+    turn_starts = np.array([t["start"] for t in turns])
+    turn_ends = np.array([t["end"] for t in turns])
+
+    labelled = []
+    for seg in segments:
+        start, end = seg.get("start", 0.0), seg.get("end", 0.0)
+        overlap = np.minimum(turn_ends, end) - np.maximum(turn_starts, start)
+
+        totals: Dict[str, float] = {}
+        for i in np.flatnonzero(overlap > 0):
+            speaker = turns[i]["speaker"]
+            totals[speaker] = totals.get(speaker, 0.0) + overlap[i]
+
+        if totals:
+            speaker = max(totals, key=totals.get)
+        else:
+            gap = np.maximum(turn_starts - end, start - turn_ends)
+            speaker = turns[int(np.argmin(gap))]["speaker"]
+
+        labelled.append({**seg, "speaker": speaker})
+    return labelled
+
+def _mel_filterbank() -> np.ndarray:
+    """Triangular mel filters over the rfft bins"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(20.0), hz_to_mel(SAMPLE_RATE / 2), MEL_BANDS + 2)
+    bins = np.floor((FFT_SIZE + 1) * mel_to_hz(mel_points) / SAMPLE_RATE).astype(int)
+
+    filters = np.zeros((MEL_BANDS, FFT_SIZE // 2 + 1), dtype=np.float32)
+    for m in range(1, MEL_BANDS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+def _dct_matrix(n_input: int, n_output: int) -> np.ndarray:
+    """Orthonormal DCT-II basis"""
+    k = np.arange(n_output)[:, None]
+    n = np.arange(n_input)[None, :]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_input)) * np.sqrt(2.0 / n_input)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+def _agglomerate(embeddings: np.ndarray, threshold: float, max_clusters: int) -> List[np.ndarray]:
+    """
+    Average-linkage clustering on cosine distance
+
+    Merges until the closest pair is farther than `threshold` and at most
+    `max_clusters` remain.
+    """
+    n = len(embeddings)
+    distance = 1.0 - embeddings @ embeddings.T
+    np.fill_diagonal(distance, np.inf)
+    sizes = np.ones(n)
+    members = {i: [i] for i in range(n)}
+
+    while len(members) > 1:
+        flat = np.argmin(distance)
+        a, b = divmod(int(flat), n)
+        if distance[a, b] > threshold and len(members) <= max_clusters:
+            break
+
+        # Lance-Williams update for average linkage
+        merged = (sizes[a] * distance[a] + sizes[b] * distance[b]) / (sizes[a] + sizes[b])
+        distance[a] = merged
+        distance[:, a] = merged
+        distance[a, a] = np.inf
+        distance[b] = np.inf
+        distance[:, b] = np.inf
+        sizes[a] += sizes[b]
+        members[a].extend(members.pop(b))
+
+    return [np.array(m) for m in members.values()]
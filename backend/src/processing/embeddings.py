@@ -0,0 +1,82 @@
+import abc
+import re
+import zlib
+from typing import List
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by do did does for from had has have he her his i if in into
+is it its just me my no not of on or our she so that the their them then there these
+they this to too um uh us was we were what when which who will with would yeah you your
+""".split())
+
+class Embedder(abc.ABC):
+    """Maps text to L2-normalized float32 vectors of a fixed dimension"""
+
+    name: str = "base"
+    dim: int = 0
+
+    @abc.abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        ...
+
+class HashingEmbedder(Embedder):
+    """
+    Offline embedding with the hashing trick
+
+    - Unigrams and bigrams hashed into `dim` signed buckets
+    - Sublinear term frequency, L2 normalized
+    - No model download; good for paraphrase-free topical matches
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode())
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        return _normalize(vectors)
+
+class SentenceTransformerEmbedder(Embedder):
+    """Local transformer model via sentence-transformers (optional dependency)"""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError("EMBEDDING_BACKEND=sentence-transformers requires sentence-transformers") from e
+
+        self.model = SentenceTransformer(model_name)
+        self.name = f"sentence-transformers:{model_name}"
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=64, convert_to_numpy=True)
+        return _normalize(vectors.astype(np.float32))
+
+def create_embedder(backend: str, model_name: str = None, dim: int = 512) -> Embedder:
+    """Embedder for the configured backend"""
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbedder(model_name)
+    if backend == "hashing":
+        return HashingEmbedder(dim)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -1,52 +1,318 @@
 from anthropic import AsyncAnthropic
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
 import json
+import re
+import structlog
+
+from src.core.exceptions import AnalysisException
+from src.core.upstream import UpstreamLimiter
+from src.monitoring.instrumentation import record_token_usage
+from src.monitoring.tracing import tracer
+from src.processing.stream_parser import IncrementalSectionParser
+
+logger = structlog.get_logger()
+
+# Receives {"section", "value"} or {"section", "index", "item"} events while streaming
+PartialCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Extra attempts for a chunk whose answer is not valid JSON
+CHUNK_PARSE_RETRIES = 1
+
+# Rough token estimate for English prose
+CHARS_PER_TOKEN = 4
+
+# Bump when prompts change so cached analyses are not reused
+PROMPT_VERSION = "1"
+
+ANALYSIS_SCHEMA = """{
+  "summary": "2-3 sentence overview",
+  "action_items": [
+    {"task": "...", "owner": "...", "deadline": "..."}
+  ],
+  "key_decisions": ["decision 1", "decision 2"],
+  "topics_discussed": ["topic 1", "topic 2"],
+  "next_steps": ["step 1", "step 2"]
+}"""
 
 class MeetingAnalyzer:
     """
     Analyze meeting transcript with Claude
-    
+
     Extracts:
     - Summary
     - Action items
     - Key decisions
     - Attendees mentioned
+
+    Transcripts above `single_shot_max_tokens` are analyzed map-reduce:
+    speaker-turn chunks are extracted concurrently, then merged in a
+    small reduce call over the extracted items only. A chunk whose answer
+    cannot be parsed is retried, then left out of the reduce.
+
+    With `on_partial`, the final call is streamed and each section is
+    reported as soon as it has been generated.
+
+    With a `limiter`, every Claude call goes through the shared upstream
+    limits and retries (the SDK's own retries are turned off).
+
+    Each response's `usage` is recorded against the job being processed.
     """
-    
-    def __init__(self):
-        self.client = AsyncAnthropic()
+
+    def __init__(
+        self,
+        single_shot_max_tokens: int = 30000,
+        chunk_tokens: int = 8000,
+        max_concurrency: int = 4,
+        limiter: Optional[UpstreamLimiter] = None,
+    ):
+        self.client = AsyncAnthropic(max_retries=0) if limiter else AsyncAnthropic()
+        self.limiter = limiter
         self.model = "claude-sonnet-4-20250514"
-    
-    async def analyze(self, transcript: str) -> Dict:
+        self.single_shot_max_tokens = single_shot_max_tokens
+        self.chunk_tokens = chunk_tokens
+        self.max_concurrency = max_concurrency
+
+    async def analyze(
+        self,
+        transcript: str,
+        segments: Optional[List[Dict]] = None,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Dict:
         """Analyze meeting transcript"""
-        
+
+        if self._estimate_tokens(transcript) > self.single_shot_max_tokens:
+            return await self._analyze_map_reduce(transcript, segments, on_partial)
+
         prompt = f"""Analyze this meeting transcript.
 
 TRANSCRIPT:
 {transcript}
 
 Extract the following (JSON format):
+{ANALYSIS_SCHEMA}
+"""
+
+        return await self._complete_json(prompt, max_tokens=2000, on_partial=on_partial)
+
+    async def _analyze_map_reduce(
+        self,
+        transcript: str,
+        segments: Optional[List[Dict]],
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Dict:
+        """Extract from chunks concurrently, then merge"""
+        chunks = self._split_transcript(transcript, segments)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def extract(index: int, chunk: str) -> Optional[Dict]:
+            async with semaphore:
+                for attempt in range(CHUNK_PARSE_RETRIES + 1):
+                    try:
+                        return await self._extract_chunk(chunk, index, len(chunks))
+                    except (json.JSONDecodeError, IndexError) as e:
+                        logger.warning(
+                            "analysis_chunk_unparseable",
+                            chunk=index,
+                            chunks=len(chunks),
+                            attempt=attempt + 1,
+                            error=str(e)
+                        )
+                return None
+
+        results = await asyncio.gather(*(extract(i, chunk) for i, chunk in enumerate(chunks)))
+        partials = [partial for partial in results if partial is not None]
+        if not partials:
+            raise AnalysisException("No part of the transcript could be analyzed")
+        if len(partials) < len(chunks):
+            logger.error("analysis_chunks_skipped", skipped=len(chunks) - len(partials), chunks=len(chunks))
+
+        merged = self._merge_partials(partials)
+
+        return await self._reduce(merged, on_partial)
+
+    async def _extract_chunk(self, chunk: str, index: int, total: int) -> Dict:
+        """Map step: extract items from one part of the meeting"""
+        prompt = f"""This is part {index + 1} of {total} of a meeting transcript.
+
+TRANSCRIPT PART:
+{chunk}
+
+Extract only what is stated in this part (JSON format):
 {{
-  "summary": "2-3 sentence overview",
+  "summary": "1-2 sentences about this part",
   "action_items": [
     {{"task": "...", "owner": "...", "deadline": "..."}}
   ],
-  "key_decisions": ["decision 1", "decision 2"],
-  "topics_discussed": ["topic 1", "topic 2"],
-  "next_steps": ["step 1", "step 2"]
+  "key_decisions": ["decision 1"],
+  "topics_discussed": ["topic 1"],
+  "next_steps": ["step 1"]
 }}
 """
-        
-        response = await self.client.messages.create(
-            model=self.model,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        
+        return await self._complete_json(prompt, max_tokens=1500)
+
+    async def _reduce(self, merged: Dict, on_partial: Optional[PartialCallback] = None) -> Dict:
+        """Reduce step: consolidate chunk extractions into the final schema"""
+        prompt = f"""These items were extracted from consecutive parts of one meeting.
+
+EXTRACTED ITEMS:
+{json.dumps(merged, indent=1)}
+
+Merge them into a single analysis. Combine items that describe the same
+thing, keep the most specific owner and deadline, and write the summary
+for the whole meeting (JSON format):
+{ANALYSIS_SCHEMA}
+"""
+        try:
+            return await self._complete_json(prompt, max_tokens=2000, on_partial=on_partial)
+        except (json.JSONDecodeError, IndexError):
+            # Deterministic merge is still a valid result
+            result = {key: value for key, value in merged.items() if key != "part_summaries"}
+            result["summary"] = " ".join(merged["part_summaries"])
+            return result
+
+    async def _complete_json(
+        self,
+        prompt: str,
+        max_tokens: int,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Dict:
+        """Run a prompt and parse the JSON answer"""
+        if on_partial:
+            # A retried stream starts over; report each section and item only once
+            reported = set()
+
+            async def report_once(event: Dict[str, Any]):
+                key = (event["section"], event.get("index"))
+                if key not in reported:
+                    reported.add(key)
+                    await on_partial(event)
+
+            message = await self._call(
+                lambda: self._stream_message(prompt, max_tokens, report_once),
+                prompt,
+                max_tokens
+            )
+        else:
+            message = await self._call(
+                lambda: self.client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": "user", "content": prompt}],
+                ),
+                prompt,
+                max_tokens
+            )
+        text = message.content[0].text
+
         # Parse JSON
-        text = response.content[0].text
         if "```json" in text:
             json_str = text.split("```json")[1].split("```")[0]
         else:
             json_str = text
-        
+
         return json.loads(json_str)
+
+    async def _call(self, request: Callable[[], Awaitable[Any]], prompt: str, max_tokens: int) -> Any:
+        """Send one request, through the upstream limiter if there is one"""
+
+        async def attempt() -> Any:
+            with tracer.start_as_current_span("anthropic.messages"):
+                return await request()
+
+        # Covers limiter waits and retries; each request is a child span
+        with tracer.start_as_current_span(
+            "claude.complete",
+            attributes={"model": self.model, "max_tokens": max_tokens}
+        ) as span:
+            if not self.limiter:
+                message = await attempt()
+            else:
+                # Reserve the worst case; the limiter settles against actual usage
+                message = await self.limiter.call(
+                    attempt,
+                    tokens={"input": self._estimate_tokens(prompt), "output": max_tokens},
+                    usage=lambda message: {
+                        "input": message.usage.input_tokens,
+                        "output": message.usage.output_tokens,
+                    },
+                )
+            span.set_attribute("usage.input_tokens", message.usage.input_tokens)
+            span.set_attribute("usage.output_tokens", message.usage.output_tokens)
+
+        record_token_usage(self.model, message.usage)
+        return message
+
+    async def _stream_message(self, prompt: str, max_tokens: int, on_partial: PartialCallback) -> Any:
+        """Stream a completion, reporting sections as they close"""
+        parser = IncrementalSectionParser()
+
+        async with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+        ) as stream:
+            async for delta in stream.text_stream:
+                for event in parser.feed(delta):
+                    await on_partial(event)
+            return await stream.get_final_message()
+
+    def _split_transcript(self, transcript: str, segments: Optional[List[Dict]]) -> List[str]:
+        """Split into token-budgeted chunks on speaker-turn boundaries"""
+        if segments:
+            # Collapse consecutive segments of the same speaker into turns
+            turns = []
+            for seg in segments:
+                speaker = seg.get("speaker", "Speaker")
+                text = seg.get("text", "").strip()
+                if turns and turns[-1][0] == speaker:
+                    turns[-1][1].append(text)
+                else:
+                    turns.append((speaker, [text]))
+            units = [f"{speaker}: {' '.join(texts)}" for speaker, texts in turns]
+        else:
+            units = [s for s in re.split(r"(?<=[.!?])\s+", transcript) if s]
+
+        budget = self.chunk_tokens * CHARS_PER_TOKEN
+        chunks, current, size = [], [], 0
+        for unit in units:
+            # Very long turns are hard-split so no chunk exceeds the budget
+            for start in range(0, len(unit), budget):
+                piece = unit[start:start + budget]
+                if current and size + len(piece) > budget:
+                    chunks.append("\n".join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece) + 1
+        if current:
+            chunks.append("\n".join(current))
+
+        return chunks
+
+    def _merge_partials(self, partials: List[Dict]) -> Dict:
+        """Concatenate chunk extractions, dropping exact duplicates"""
+        merged = {
+            "part_summaries": [],
+            "action_items": [],
+            "key_decisions": [],
+            "topics_discussed": [],
+            "next_steps": [],
+        }
+        seen = {key: set() for key in merged}
+
+        for partial in partials:
+            if partial.get("summary"):
+                merged["part_summaries"].append(partial["summary"])
+            for key in ("action_items", "key_decisions", "topics_discussed", "next_steps"):
+                for item in partial.get(key) or []:
+                    text = item.get("task", "") if isinstance(item, dict) else str(item)
+                    normalized = re.sub(r"\W+", " ", text.lower()).strip()
+                    if normalized and normalized not in seen[key]:
+                        seen[key].add(normalized)
+                        merged[key].append(item)
+
+        return merged
+
+    def _estimate_tokens(self, text: str) -> int:
+        """Estimate token count without a tokenizer round trip"""
+        return len(text) // CHARS_PER_TOKEN
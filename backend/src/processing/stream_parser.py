@@ -0,0 +1,120 @@
+import json
+from typing import Dict, List, Any, Optional
+
+class IncrementalSectionParser:
+    """
+    Incrementally parse a streamed JSON object
+
+    Emits an event as soon as a top-level member is complete, and for
+    top-level arrays also as soon as each element is complete:
+
+        {"section": "summary", "value": "..."}
+        {"section": "action_items", "index": 0, "item": {...}}
+
+    Text before the first "{" (e.g. a ```json fence) and after the
+    closing "}" is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.started = False
+        self.finished = False
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.expect_key = True
+        self.key: Optional[str] = None
+        self.value_start = 0
+        self.element_start = 0
+        self.element_index = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of streamed text and return completed sections"""
+        self.text += chunk
+        events = []
+
+        while self.pos < len(self.text) and not self.finished:
+            char = self.text[self.pos]
+            event = self._step(char, self.pos)
+            if event:
+                events.append(event)
+            self.pos += 1
+
+        return events
+
+    def _step(self, char: str, i: int) -> Optional[Dict[str, Any]]:
+        if not self.started:
+            if char == "{":
+                self.started = True
+                self.stack.append("{")
+            return None
+
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif char == "\\":
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+                if len(self.stack) == 1 and self.expect_key:
+                    self.key = json.loads(self.text[self.string_start:i + 1])
+            return None
+
+        depth = len(self.stack)
+
+        if char == '"':
+            self.in_string = True
+            self.string_start = i
+        elif char == ":" and depth == 1:
+            self.expect_key = False
+            self.value_start = i + 1
+        elif char in "{[":
+            self.stack.append(char)
+            if depth == 1 and char == "[":
+                self.element_start = i + 1
+                self.element_index = 0
+        elif char in "}]":
+            if depth == 2 and self.stack[-1] == "[":
+                event = self._element_event(i)
+                self.stack.pop()
+                return event
+            self.stack.pop()
+            if depth == 1:
+                self.finished = True
+                return self._section_event(i)
+        elif char == ",":
+            if depth == 1:
+                return self._section_event(i)
+            if depth == 2 and self.stack[-1] == "[":
+                return self._element_event(i)
+
+        return None
+
+    def _section_event(self, end: int) -> Optional[Dict[str, Any]]:
+        """Top-level member finished at `end`"""
+        raw = self.text[self.value_start:end].strip()
+        key = self.key
+        self.expect_key = True
+        self.key = None
+        if key is None or not raw:
+            return None
+        try:
+            return {"section": key, "value": json.loads(raw)}
+        except json.JSONDecodeError:
+            return None
+
+    def _element_event(self, end: int) -> Optional[Dict[str, Any]]:
+        """Element of a top-level array finished at `end`"""
+        raw = self.text[self.element_start:end].strip()
+        self.element_start = end + 1
+        if not raw:
+            return None
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        event = {"section": self.key, "index": self.element_index, "item": item}
+        self.element_index += 1
+        return event
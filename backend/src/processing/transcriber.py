@@ -1,20 +1,58 @@
-import httpx
+import asyncio
+import os
+import shutil
 from typing import List, Dict
+import structlog
+
+from src.core.http import get_http_client
+from src.core.upstream import UpstreamLimiter
+from src.processing.audio_chunker import AudioChunker, stitch_segments
+from src.processing.audio_preprocessor import AudioPreprocessor
+from src.processing.diarization import DiarizationPool, assign_speakers
+from src.monitoring.tracing import tracer
+
+logger = structlog.get_logger()
+
+WHISPER_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+# Bump when chunking/stitching/diarization changes so cached transcripts are not reused
+TRANSCRIPT_VERSION = "3"
 
 class MeetingTranscriber:
     """
     Transcribe audio with speaker diarization
-    
-    Uses OpenAI Whisper + pyannote for speakers
+
+    Uses OpenAI Whisper for text and a DiarizationPool for speakers,
+    running both at the same time on a preprocessed (mono 16 kHz Opus,
+    edge silence trimmed) copy of the recording
+
+    Long recordings are split at silences into overlapping windows that
+    are transcribed concurrently and stitched back together.
     """
-    
-    def __init__(self, openai_api_key: str):
+
+    def __init__(
+        self,
+        openai_api_key: str,
+        chunk_seconds: float = 600,
+        overlap_seconds: float = 2.0,
+        max_concurrency: int = 4,
+        diarization: DiarizationPool = None,
+        preprocessor: AudioPreprocessor = None,
+        limiter: UpstreamLimiter = None,
+    ):
         self.api_key = openai_api_key
-    
+        self.model = "whisper-1"
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_concurrency = max_concurrency
+        self.diarization = diarization
+        self.preprocessor = preprocessor
+        self.limiter = limiter
+
     async def transcribe(self, audio_path: str) -> Dict:
         """
         Transcribe meeting audio
-        
+
         Returns:
             {
                 "transcript": "full text",
@@ -23,34 +61,107 @@ class MeetingTranscriber:
                 ]
             }
         """
-        # 1. Transcribe with Whisper
-        async with httpx.AsyncClient() as client:
-            with open(audio_path, "rb") as f:
-                response = await client.post(
-                    "https://api.openai.com/v1/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    files={"file": f},
-                    data={"model": "whisper-1", "response_format": "verbose_json"},
-                )
-        
-        data = response.json()
-        
-        # 2. Add speaker labels (simplified - use pyannote in production)
-        segments = self._add_speakers(data["segments"])
-        
+        # 1. Downmix, resample, trim and Opus-encode to cut upload size
+        if self.preprocessor:
+            prepared = await self.preprocessor.prepare(audio_path)
+        else:
+            prepared = {"path": audio_path, "offset": 0.0, "workdir": None}
+        audio_path = prepared["path"]
+
+        try:
+            # 2. Diarize in a worker process while Whisper transcribes
+            diarization = asyncio.create_task(self._diarize(audio_path))
+
+            try:
+                chunker = AudioChunker(self.chunk_seconds, self.overlap_seconds)
+                duration = await chunker.probe_duration(audio_path)
+                file_size = os.path.getsize(audio_path)
+
+                if duration <= self.chunk_seconds and file_size < WHISPER_MAX_UPLOAD_BYTES:
+                    data = await self._transcribe_file(audio_path)
+                else:
+                    data = await self._transcribe_chunked(audio_path, chunker, duration, file_size)
+            except BaseException:
+                diarization.cancel()
+                raise
+
+            # 3. Label each segment with the speaker who overlaps it most
+            segments = assign_speakers(data["segments"], await diarization)
+        finally:
+            AudioPreprocessor.cleanup(prepared)
+
+        # Timestamps refer to the trimmed copy; shift them back onto the original
+        if prepared["offset"]:
+            segments = [
+                {**seg, "start": seg["start"] + prepared["offset"], "end": seg["end"] + prepared["offset"]}
+                for seg in segments
+            ]
+
         return {
             "transcript": data["text"],
             "segments": segments,
         }
-    
-    def _add_speakers(self, segments: List[Dict]) -> List[Dict]:
-        """Add speaker labels to segments"""
-        # In production, use pyannote.audio for diarization
-        # This is simplified for demo
-        return [
-            {
-                **seg,
-                "speaker": f"Speaker {(i % 3) + 1}",
-            }
-            for i, seg in enumerate(segments)
-        ]
+
+    async def _transcribe_chunked(
+        self,
+        audio_path: str,
+        chunker: AudioChunker,
+        duration: float,
+        file_size: int,
+    ) -> Dict:
+        """Transcribe overlapping windows concurrently and stitch the results"""
+        # Keep every window under the upload cap, with headroom for bitrate variance
+        max_seconds_by_size = duration * (WHISPER_MAX_UPLOAD_BYTES * 0.8) / file_size
+        chunker.chunk_seconds = max(30.0, min(self.chunk_seconds, max_seconds_by_size))
+
+        windows, workdir = await chunker.split(audio_path, duration)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def transcribe_window(window: Dict) -> Dict:
+            async with semaphore:
+                return await self._transcribe_file(window["path"])
+
+        try:
+            results = await asyncio.gather(*(transcribe_window(window) for window in windows))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        return stitch_segments(windows, results)
+
+    async def _transcribe_file(self, audio_path: str) -> Dict:
+        """Send one file to the Whisper endpoint (through the upstream limiter if set)"""
+
+        async def attempt() -> Dict:
+            client = get_http_client("openai")
+            with tracer.start_as_current_span("openai.audio.transcriptions") as span:
+                with open(audio_path, "rb") as f:
+                    response = await client.post(
+                        "/v1/audio/transcriptions",
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                        files={"file": f},
+                        data={"model": self.model, "response_format": "verbose_json"},
+                    )
+                span.set_attribute("http.status_code", response.status_code)
+                # 429/5xx become retryable errors for the limiter
+                response.raise_for_status()
+                return response.json()
+
+        # Covers limiter waits and retries; each POST is a child span
+        with tracer.start_as_current_span(
+            "whisper.transcribe",
+            attributes={"model": self.model, "audio.bytes": os.path.getsize(audio_path)}
+        ):
+            if self.limiter:
+                return await self.limiter.call(attempt)
+            return await attempt()
+
+    async def _diarize(self, audio_path: str) -> List[Dict]:
+        """Speaker turns, or none (single speaker) if diarization fails"""
+        if not self.diarization:
+            return []
+
+        try:
+            return await self.diarization.diarize(audio_path)
+        except Exception as e:
+            logger.error("diarization_failed", audio_path=audio_path, error=str(e))
+            return []
@@ -1,15 +1,31 @@
 import asyncio
+import json
 import uuid
 from typing import Dict, List, Any, Optional
 import redis.asyncio as redis
+from redis.exceptions import ResponseError
 import structlog
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
-from src.processing.transcriber import MeetingTranscriber
-from src.processing.meeting_analyzer import MeetingAnalyzer
+from src.processing.transcriber import MeetingTranscriber, TRANSCRIPT_VERSION
+from src.processing.meeting_analyzer import MeetingAnalyzer, PROMPT_VERSION
+from src.processing.audio_preprocessor import AudioPreprocessor
+from src.processing.audio_probe import probe_audio
+from src.processing.diarization import DiarizationPool
+from src.services.eta import ProcessingTimeEstimator, StageClock
+from src.services.job_queue import JobQueue
+from src.services.result_cache import ResultCache
+from src.services.result_store import ResultStore, ALL_PARTS
+from src.services.search_index import MeetingSearchIndex
+from src.services.uploads import remove_upload
+from src.services.vector_index import MeetingVectorIndex
 from src.core.config import get_settings
+from src.core.hashing import generate_file_hash
+from src.core.upstream import create_upstream_limiters
 from src.core.exceptions import TranscriptionException, AnalysisException
+from src.monitoring.instrumentation import PipelineInstrumentation, JobInstrumentation
+from src.monitoring.tracing import tracer, inject_context, extract_context, mark_error
 
 logger = structlog.get_logger()
 settings = get_settings()
@@ -22,103 +38,415 @@ class ProcessingStage(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+TERMINAL_STAGES = [ProcessingStage.COMPLETED.value, ProcessingStage.FAILED.value]
+
+JOB_TTL_SECONDS = 86400 * 7  # Keep for 7 days
+UPDATES_CHANNEL = "meeting_updates"
+CANCEL_CHANNEL = "job_cancellations"
+
+# Sorted-set indexes of job IDs scored by started_at (epoch milliseconds)
+JOBS_INDEX = "jobs:index"
+USER_JOBS_INDEX = "jobs:user:{user_id}"
+CLEANUP_BATCH_SIZE = 500
+EPOCH = datetime(1970, 1, 1)
+
+# Atomically set job hash fields, refresh the TTL and publish the delta.
+# KEYS[1] = job hash
+# ARGV[1] = ttl, ARGV[2] = channel ("" to skip), ARGV[3] = message,
+# ARGV[4] = "1" to skip the write when the job is missing or terminal,
+# ARGV[5..] = field/value pairs (JSON-encoded values)
+UPDATE_JOB_SCRIPT = """
+if ARGV[4] == '1' then
+    local stage = redis.call('HGET', KEYS[1], 'stage')
+    if not stage then
+        return 0
+    end
+    for _, terminal in ipairs(cjson.decode(ARGV[5])) do
+        if stage == terminal then
+            return 0
+        end
+    end
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 6))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+if ARGV[2] ~= '' then
+    redis.call('PUBLISH', ARGV[2], ARGV[3])
+end
+return 1
+"""
+
 class AsyncMeetingProcessor:
     """
     Enterprise multi-stage async meeting processor
     
     - Preserves existing transcription and analysis logic
+    - Queues jobs on a Redis Stream consumed by MeetingWorker processes
     - Adds real-time status updates via Redis
-    - Implements proper error handling and timeouts
+    - Stores job status as a Redis hash updated by one atomic script call
+    - Indexes jobs per user and globally for paginated listing and cleanup
+    - Implements proper error handling and per-stage timeouts
+    - Cancels in-flight jobs in any worker process via a Redis channel
     - Provides detailed progress tracking
+    - Estimates processing time from the probed audio duration and measured
+      per-stage throughput, and refreshes the ETA while the job runs
+    - Times every stage and records Claude token usage per model and tier
+    - Worker-side spans join the upload request's trace through the
+      trace context stored in the job record
     """
     
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
-        self.transcriber = MeetingTranscriber(settings.OPENAI_API_KEY)
-        self.analyzer = MeetingAnalyzer()
-        self.active_jobs = {}
+        # Upstream quotas are shared by every worker process through Redis
+        self.upstreams = create_upstream_limiters(redis_client)
+        self.transcriber = MeetingTranscriber(
+            settings.OPENAI_API_KEY,
+            chunk_seconds=settings.TRANSCRIPTION_CHUNK_SECONDS,
+            overlap_seconds=settings.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+            max_concurrency=settings.TRANSCRIPTION_MAX_CONCURRENCY,
+            diarization=DiarizationPool(
+                settings.DIARIZATION_BACKEND,
+                max_workers=settings.DIARIZATION_WORKERS,
+                max_speakers=settings.DIARIZATION_MAX_SPEAKERS,
+                threshold=settings.DIARIZATION_THRESHOLD,
+                auth_token=settings.PYANNOTE_AUTH_TOKEN
+            ),
+            preprocessor=AudioPreprocessor(
+                bitrate=settings.PREPROCESS_BITRATE,
+                max_concurrency=settings.PREPROCESS_MAX_CONCURRENCY,
+                silence_threshold_db=settings.PREPROCESS_SILENCE_THRESHOLD_DB
+            ) if settings.PREPROCESS_ENABLED else None,
+            limiter=self.upstreams["openai"]
+        )
+        self.analyzer = MeetingAnalyzer(
+            single_shot_max_tokens=settings.ANALYSIS_SINGLE_SHOT_MAX_TOKENS,
+            chunk_tokens=settings.ANALYSIS_CHUNK_TOKENS,
+            max_concurrency=settings.ANALYSIS_MAX_CONCURRENCY,
+            limiter=self.upstreams["anthropic"]
+        )
+        self.queue = JobQueue(redis_client)
+        self.cache = ResultCache(redis_client)
+        self.results = ResultStore(redis_client)
+        self.search_index = MeetingSearchIndex()
+        self.vector_index = MeetingVectorIndex(redis_client)
+        self.eta = ProcessingTimeEstimator(redis_client)
+        self.instrumentation = PipelineInstrumentation(redis_client)
+        self.active_jobs: Dict[str, asyncio.Task] = {}  # In-flight jobs in this process
+        self._update_job_script = redis_client.register_script(UPDATE_JOB_SCRIPT)
     
-    async def start_processing(self, audio_path: str, meeting_title: str = None) -> str:
+    async def start_processing(
+        self,
+        audio_path: str,
+        meeting_title: str = None,
+        audio_hash: str = None,
+        user_id: str = None,
+        tier: str = None
+    ) -> str:
         """
         Start async meeting processing
         
         Args:
             audio_path: Path to audio file
             meeting_title: Optional meeting title
+            audio_hash: SHA-256 of the audio if already known (computed by the worker otherwise)
+            user_id: Owner of the meeting, used for per-user listing and fair share
+            tier: Owner's subscription tier, used for scheduling priority
             
         Returns:
             Job ID for tracking
         """
         job_id = str(uuid.uuid4())
+        started_at = datetime.utcnow()
+        audio_info = await probe_audio(audio_path)
+        estimated_duration = await self._estimate_processing_duration(audio_path, audio_info)
         
         # Initialize job status
         job_status = {
             "job_id": job_id,
+            "user_id": user_id,
             "stage": ProcessingStage.UPLOADED.value,
             "progress": 0,
-            "started_at": datetime.utcnow().isoformat(),
+            "started_at": started_at.isoformat(),
             "meeting_title": meeting_title or f"Meeting {job_id[:8]}",
             "audio_path": audio_path,
             "error": None,
             "result": None,
-            "estimated_duration": self._estimate_processing_duration(audio_path)
+            "audio_hash": audio_hash,
+            "tier": tier,
+            "audio_seconds": audio_info["duration_seconds"] if audio_info else None,
+            "audio_codec": audio_info["codec"] if audio_info else None,
+            "estimated_duration": estimated_duration,
+            "eta_seconds": estimated_duration,
+            "trace_context": inject_context()
         }
         
         # Store job status
-        await self._update_job_status(job_id, job_status)
+        await self._set_job_fields(job_id, job_status, guard=False, publish=False)
         
-        # Start async processing
-        asyncio.create_task(self._process_meeting(job_id, audio_path))
+        # Index for listing and cleanup
+        score = self._to_epoch_ms(started_at)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(JOBS_INDEX, {job_id: score})
+        if user_id:
+            pipe.zadd(USER_JOBS_INDEX.format(user_id=user_id), {job_id: score})
+        await pipe.execute()
         
-        logger.info("meeting_processing_started", job_id=job_id, audio_path=audio_path)
+        # Hand off to the worker pool; the stream entry survives API restarts
+        await self.queue.enqueue(
+            job_id,
+            {"audio_path": audio_path, "audio_hash": audio_hash},
+            user_id=user_id,
+            tier=tier,
+            estimated_seconds=estimated_duration
+        )
+        
+        logger.info("meeting_processing_queued", job_id=job_id, audio_path=audio_path)
         
         return job_id
     
+    async def run_job(self, job_id: str, audio_path: str, audio_hash: str = None):
+        """
+        Run a queued job to completion (called by MeetingWorker)
+        
+        Jobs that already reached a terminal stage (e.g. cancelled while
+        queued) are skipped so redelivered entries are not processed twice.
+        """
+        current_status = await self.get_job_status(job_id)
+        if not current_status:
+            logger.warning("queued_job_missing", job_id=job_id)
+            return
+        
+        if current_status["stage"] in TERMINAL_STAGES:
+            logger.info("queued_job_skipped", job_id=job_id, stage=current_status["stage"])
+            await remove_upload(audio_path)
+            return
+        
+        logger.info("meeting_processing_started", job_id=job_id, audio_path=audio_path)
+        
+        # Run as a separate task so cancel_job can stop it without stopping the worker
+        task = asyncio.create_task(self._process_meeting(job_id, audio_path, audio_hash))
+        self.active_jobs[job_id] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                task.cancel()  # Worker itself is shutting down
+                raise
+            logger.info("meeting_processing_cancelled", job_id=job_id)
+            await remove_upload(audio_path)
+        finally:
+            self.active_jobs.pop(job_id, None)
+    
+    async def listen_for_cancellations(self):
+        """Cancel local in-flight jobs when any process calls cancel_job"""
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(CANCEL_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                job_id = message["data"]
+                self._cancel_local_job(job_id.decode() if isinstance(job_id, bytes) else job_id)
+        finally:
+            await pubsub.unsubscribe(CANCEL_CHANNEL)
+            await pubsub.close()
+    
+    def _cancel_local_job(self, job_id: str) -> bool:
+        """Cancel a job running in this process"""
+        task = self.active_jobs.get(job_id)
+        if not task or task.done():
+            return False
+        
+        task.cancel()
+        logger.info("in_flight_job_cancelled", job_id=job_id)
+        return True
+    
+    async def fail_job(self, job_id: str, error: str):
+        """Mark a job as failed outside the normal pipeline"""
+        await self._update_stage(job_id, ProcessingStage.FAILED, 0, error)
+        status = await self.get_job_status(job_id) or {}
+        await remove_upload(status.get("audio_path"))
+    
     async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get current job status"""
         try:
-            status_data = await self.redis.get(f"job:{job_id}")
+            try:
+                status_data = await self.redis.hgetall(f"job:{job_id}")
+            except ResponseError:
+                # Jobs written before the hash layout are plain JSON strings
+                legacy_data = await self.redis.get(f"job:{job_id}")
+                return json.loads(legacy_data) if legacy_data else None
+            
             if status_data:
-                import json
-                return json.loads(status_data)
+                return self._decode_job_fields(status_data)
             return None
         except Exception as e:
             logger.error("job_status_retrieval_failed", job_id=job_id, error=str(e))
             return None
     
-    async def get_all_jobs(self) -> List[Dict[str, Any]]:
-        """Get all job statuses"""
-        try:
-            job_keys = await self.redis.keys("job:*")
-            jobs = []
-            
-            for key in job_keys:
-                job_id = key.decode().split(":")[1]
-                status = await self.get_job_status(job_id)
-                if status:
-                    jobs.append(status)
+    async def get_all_jobs(self, user_id: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the most recent job statuses (newest first)"""
+        page = await self.list_jobs(user_id=user_id, limit=limit)
+        return page["jobs"]
+    
+    async def list_jobs(
+        self,
+        user_id: str = None,
+        limit: int = 50,
+        cursor: str = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of job statuses, newest first
+        
+        Args:
+            user_id: Only list this user's jobs (all jobs if omitted)
+            limit: Page size
+            cursor: next_cursor from the previous page
             
-            # Sort by started_at (newest first)
-            jobs.sort(key=lambda x: x.get("started_at", ""), reverse=True)
-            return jobs
+        Returns:
+            {"jobs": [...], "next_cursor": "1718000000000:<job_id>" or None}
+        """
+        try:
+            index = USER_JOBS_INDEX.format(user_id=user_id) if user_id else JOBS_INDEX
+            
+            # Index entries older than the job TTL point at expired hashes. Only the
+            # per-user index is pruned here: cleanup_old_jobs walks JOBS_INDEX to
+            # delete results, so its entries must stay until that runs
+            cutoff = self._to_epoch_ms(datetime.utcnow()) - JOB_TTL_SECONDS * 1000
+            if user_id:
+                await self.redis.zremrangebyscore(index, "-inf", f"({cutoff}")
+            
+            max_score, after_score, after_id = "+inf", None, None
+            if cursor:
+                after_score, after_id = cursor.split(":", 1)
+                after_score = int(after_score)
+                max_score = after_score
+            
+            # Ties on started_at are ordered by job ID descending; skip the ones already served
+            entries, offset = [], 0
+            while True:
+                batch = await self.redis.zrevrangebyscore(
+                    index, max_score, cutoff, start=offset, num=limit + 1, withscores=True
+                )
+                offset += len(batch)
+                for member, score in batch:
+                    job_id = member.decode() if isinstance(member, bytes) else member
+                    if after_id and int(score) == after_score and job_id >= after_id:
+                        continue
+                    entries.append((job_id, int(score)))
+                if len(entries) > limit or len(batch) < limit + 1:
+                    break
+            
+            page = entries[:limit]
+            next_cursor = f"{page[-1][1]}:{page[-1][0]}" if len(entries) > limit else None
+            
+            jobs = await self._fetch_jobs([job_id for job_id, _score in page], index)
+            return {"jobs": jobs, "next_cursor": next_cursor}
             
         except Exception as e:
-            logger.error("all_jobs_retrieval_failed", error=str(e))
-            return []
+            logger.error("job_listing_failed", user_id=user_id, error=str(e))
+            return {"jobs": [], "next_cursor": None}
     
-    async def _process_meeting(self, job_id: str, audio_path: str):
-        """Process meeting through all stages"""
+    async def _fetch_jobs(self, job_ids: List[str], index: str) -> List[Dict[str, Any]]:
+        """Fetch job hashes in one pipeline, dropping per-user index entries of expired jobs"""
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(f"job:{job_id}")
+        responses = await pipe.execute(raise_on_error=False)
+        
+        jobs, expired = [], []
+        for job_id, data in zip(job_ids, responses):
+            if isinstance(data, ResponseError):
+                status = await self.get_job_status(job_id)  # Legacy JSON record
+            else:
+                status = self._decode_job_fields(data) if data else None
+            
+            if status:
+                jobs.append(status)
+            else:
+                expired.append(job_id)
+        
+        # JOBS_INDEX entries are left for cleanup_old_jobs, which deletes their results
+        if expired and index != JOBS_INDEX:
+            await self.redis.zrem(index, *expired)
+        
+        return jobs
+    
+    async def _process_meeting(self, job_id: str, audio_path: str, audio_hash: str = None):
+        """Process meeting through all stages (as part of the upload's trace)"""
+        status = await self.get_job_status(job_id) or {}
+        with tracer.start_as_current_span(
+            "meeting.process",
+            context=extract_context(status.get("trace_context")),
+            attributes={"job.id": job_id, "job.tier": status.get("tier") or "unknown"}
+        ):
+            await self._run_pipeline(job_id, audio_path, audio_hash, status)
+    
+    async def _run_pipeline(
+        self,
+        job_id: str,
+        audio_path: str,
+        audio_hash: Optional[str],
+        status: Dict[str, Any]
+    ):
+        metrics = self.instrumentation.job(job_id, status.get("tier"))
+        metrics_token = metrics.bind()
+        eta_task = None
+        audio_seconds = None
         try:
+            if status.get("started_at"):
+                queued_for = datetime.utcnow() - datetime.fromisoformat(status["started_at"])
+                await metrics.record_stage("queue_wait", queued_for.total_seconds())
+            
+            # Content address of the recording, used as the result cache key
+            if not audio_hash:
+                audio_hash = await asyncio.to_thread(generate_file_hash, audio_path)
+            
+            audio_seconds = await self._audio_seconds(status, audio_path)
+            clock = StageClock(await self.eta.estimate(audio_seconds or 0))
+            if audio_seconds:
+                eta_task = asyncio.create_task(self._refresh_eta(job_id, clock, audio_seconds))
+            
             # Stage 1: Transcription
-            await self._update_stage(job_id, ProcessingStage.TRANSCRIBING, 10)
-            transcript_result = await self._transcribe_audio(job_id, audio_path)
+            clock.start("transcribing")
+            await self._update_stage(
+                job_id, ProcessingStage.TRANSCRIBING, 10,
+                audio_hash=audio_hash, **self._eta_fields(clock, audio_seconds)
+            )
+            transcript_result, cached = await self.cache.get_or_compute(
+                ResultCache.key("transcript", audio_hash, self.transcriber.model, TRANSCRIPT_VERSION),
+                lambda: self._transcribe_audio(job_id, audio_path, metrics),
+                lock_ttl=settings.TRANSCRIPTION_TIMEOUT
+            )
+            if cached:
+                await self._update_progress(job_id, 50, "Transcript served from cache")
+            else:
+                await self.eta.record("transcribing", audio_seconds, clock.elapsed())
+                metrics.record_audio(audio_seconds)
             
             # Stage 2: Analysis
-            await self._update_stage(job_id, ProcessingStage.ANALYZING, 60)
-            analysis_result = await self._analyze_transcript(job_id, transcript_result)
-            
-            # Stage 3: Completion
-            await self._update_stage(job_id, ProcessingStage.COMPLETED, 100)
+            clock.start("analyzing")
+            await self._update_stage(
+                job_id, ProcessingStage.ANALYZING, 60, **self._eta_fields(clock, audio_seconds)
+            )
+            analysis_result, cached = await self.cache.get_or_compute(
+                ResultCache.key(
+                    "analysis", audio_hash, self.transcriber.model, TRANSCRIPT_VERSION,
+                    self.analyzer.model, PROMPT_VERSION
+                ),
+                lambda: self._analyze_transcript(job_id, transcript_result, metrics),
+                lock_ttl=settings.ANALYSIS_TIMEOUT
+            )
+            if cached:
+                await self._update_progress(job_id, 90, "Analysis served from cache")
+            else:
+                await self.eta.record("analyzing", audio_seconds, clock.elapsed())
+            
+            # Stage 3: Search indexing (a failure here must not fail the job)
+            clock.start("indexing")
+            async with metrics.stage("indexing"):
+                indexed = await self._index_meeting(job_id, transcript_result, analysis_result)
+            if indexed:
+                await self.eta.record("indexing", audio_seconds, clock.elapsed())
             
             # Store final result
             final_result = {
@@ -126,157 +454,365 @@ class AsyncMeetingProcessor:
                 "segments": transcript_result["segments"],
                 "analysis": analysis_result,
                 "processed_at": datetime.utcnow().isoformat(),
-                "processing_time": self._calculate_processing_time(job_id)
+                "processing_time": await self._calculate_processing_time(job_id)
             }
             
-            await self._store_final_result(job_id, final_result)
+            async with metrics.stage("storage"):
+                await self._store_final_result(job_id, final_result)
+            await remove_upload(audio_path)
+            
+            # Stage 4: Completion (result is readable before clients see COMPLETED)
+            totals = await metrics.finish(True, audio_seconds)
+            await self._update_stage(
+                job_id,
+                ProcessingStage.COMPLETED,
+                100,
+                result=f"result:{job_id}",
+                completed_at=datetime.utcnow().isoformat(),
+                eta_seconds=0,
+                **totals
+            )
             
             logger.info("meeting_processing_completed", job_id=job_id)
             
         except Exception as e:
             logger.error("meeting_processing_failed", job_id=job_id, error=str(e))
+            mark_error(e)
+            await metrics.finish(False, audio_seconds)
             await self._update_stage(job_id, ProcessingStage.FAILED, 0, str(e))
+            await remove_upload(audio_path)  # FAILED is terminal; redeliveries skip the job
+        finally:
+            if eta_task:
+                eta_task.cancel()
+            JobInstrumentation.unbind(metrics_token)
+    
+    async def _audio_seconds(self, status: Dict[str, Any], audio_path: str) -> Optional[float]:
+        """Recording length probed at upload (probed now for older jobs)"""
+        if status.get("audio_seconds"):
+            return status["audio_seconds"]
+        audio_info = await probe_audio(audio_path)
+        return audio_info["duration_seconds"] if audio_info else None
+    
+    def _eta_fields(self, clock: StageClock, audio_seconds: Optional[float]) -> Dict[str, Any]:
+        """Status fields with the remaining processing time"""
+        if not audio_seconds:
+            return {}
+        remaining = clock.remaining()
+        return {
+            "eta_seconds": int(round(remaining)),
+            "estimated_completion": (datetime.utcnow() + timedelta(seconds=remaining)).isoformat()
+        }
+    
+    async def _refresh_eta(self, job_id: str, clock: StageClock, audio_seconds: float):
+        """Publish the remaining time periodically between stage updates"""
+        while True:
+            await asyncio.sleep(settings.ETA_UPDATE_INTERVAL_SECONDS)
+            try:
+                if not await self._set_job_fields(job_id, self._eta_fields(clock, audio_seconds)):
+                    return  # Job finished, failed or was cancelled
+            except Exception as e:
+                logger.error("eta_refresh_failed", job_id=job_id, error=str(e))
     
-    async def _transcribe_audio(self, job_id: str, audio_path: str) -> Dict[str, Any]:
+    async def _transcribe_audio(
+        self,
+        job_id: str,
+        audio_path: str,
+        metrics: JobInstrumentation
+    ) -> Dict[str, Any]:
         """Transcribe audio with progress updates"""
         try:
             # Update progress during transcription
             await self._update_progress(job_id, 20, "Starting transcription...")
             
             # Perform transcription (preserving existing logic)
-            result = await self.transcriber.transcribe(audio_path)
+            async with metrics.stage("transcription", model=self.transcriber.model):
+                result = await asyncio.wait_for(
+                    self.transcriber.transcribe(audio_path),
+                    timeout=settings.TRANSCRIPTION_TIMEOUT
+                )
             
             await self._update_progress(job_id, 50, "Transcription completed")
             
             return result
             
+        except asyncio.TimeoutError:
+            raise TranscriptionException(f"Transcription timed out after {settings.TRANSCRIPTION_TIMEOUT}s")
         except Exception as e:
             raise TranscriptionException(f"Transcription failed: {str(e)}")
     
-    async def _analyze_transcript(self, job_id: str, transcript_result: Dict[str, Any]) -> Dict[str, Any]:
+    async def _analyze_transcript(
+        self,
+        job_id: str,
+        transcript_result: Dict[str, Any],
+        metrics: JobInstrumentation
+    ) -> Dict[str, Any]:
         """Analyze transcript with progress updates"""
         try:
             # Update progress during analysis
             await self._update_progress(job_id, 70, "Starting analysis...")
             
+            # Sections are pushed to clients as soon as Claude finishes them
+            sections_done = set()
+            
+            async def on_partial(event: Dict[str, Any]):
+                await self._broadcast_partial_result(job_id, event)
+                if "value" in event and event["section"] not in sections_done:
+                    sections_done.add(event["section"])
+                    await self._update_progress(
+                        job_id,
+                        min(89, 70 + 4 * len(sections_done)),
+                        f"Analyzed {event['section'].replace('_', ' ')}"
+                    )
+            
             # Perform analysis (preserving existing logic)
-            result = await self.analyzer.analyze(transcript_result["transcript"])
+            async with metrics.stage("analysis", model=self.analyzer.model):
+                result = await asyncio.wait_for(
+                    self.analyzer.analyze(
+                        transcript_result["transcript"],
+                        transcript_result.get("segments"),
+                        on_partial=on_partial
+                    ),
+                    timeout=settings.ANALYSIS_TIMEOUT
+                )
             
             await self._update_progress(job_id, 90, "Analysis completed")
             
             return result
             
+        except asyncio.TimeoutError:
+            raise AnalysisException(f"Analysis timed out after {settings.ANALYSIS_TIMEOUT}s")
         except Exception as e:
             raise AnalysisException(f"Analysis failed: {str(e)}")
     
-    async def _update_stage(self, job_id: str, stage: ProcessingStage, progress: int, error: str = None):
-        """Update job stage"""
+    async def _index_meeting(
+        self,
+        job_id: str,
+        transcript_result: Dict[str, Any],
+        analysis_result: Dict[str, Any]
+    ):
+        """
+        Add the meeting to its owner's full-text and semantic indexes
+        
+        Returns:
+            False if the job has no owner and nothing was indexed
+        """
+        status = await self.get_job_status(job_id) or {}
+        if not status.get("user_id"):
+            return False
+        
+        await self._update_progress(job_id, 95, "Indexing for search...")
+        segments = transcript_result.get("segments") or []
+        
         try:
-            current_status = await self.get_job_status(job_id) or {}
-            
-            current_status.update({
+            await self.search_index.index_meeting(
+                job_id,
+                status["user_id"],
+                status.get("meeting_title"),
+                segments,
+                analysis_result
+            )
+        except Exception as e:
+            logger.error("meeting_indexing_failed", job_id=job_id, error=str(e))
+        
+        try:
+            await self.vector_index.index_meeting(
+                job_id,
+                status["user_id"],
+                status.get("meeting_title"),
+                segments
+            )
+        except Exception as e:
+            logger.error("meeting_vector_indexing_failed", job_id=job_id, error=str(e))
+        
+        return True
+    
+    async def _update_stage(
+        self,
+        job_id: str,
+        stage: ProcessingStage,
+        progress: int,
+        error: str = None,
+        **fields
+    ) -> bool:
+        """
+        Update job stage (plus any extra status fields)
+        
+        Returns:
+            False if the job is missing or already completed/failed
+        """
+        try:
+            update = {
                 "stage": stage.value,
                 "progress": progress,
                 "updated_at": datetime.utcnow().isoformat(),
-                "error": error
-            })
+                "error": error,
+                **fields
+            }
             
             if error:
-                current_status["failed_at"] = datetime.utcnow().isoformat()
-            
-            await self._update_job_status(job_id, current_status)
+                update["failed_at"] = datetime.utcnow().isoformat()
             
-            # Broadcast update via pub/sub
-            await self._broadcast_status_update(job_id, current_status)
+            return await self._set_job_fields(job_id, update)
             
         except Exception as e:
             logger.error("stage_update_failed", job_id=job_id, error=str(e))
+            return False
     
     async def _update_progress(self, job_id: str, progress: int, message: str):
         """Update progress within current stage"""
         try:
-            current_status = await self.get_job_status(job_id) or {}
-            
-            current_status.update({
+            await self._set_job_fields(job_id, {
                 "progress": progress,
                 "status_message": message,
                 "updated_at": datetime.utcnow().isoformat()
             })
             
-            await self._update_job_status(job_id, current_status)
-            
-            # Broadcast update via pub/sub
-            await self._broadcast_status_update(job_id, current_status)
-            
         except Exception as e:
             logger.error("progress_update_failed", job_id=job_id, error=str(e))
     
-    async def _update_job_status(self, job_id: str, status: Dict[str, Any]):
-        """Store job status in Redis"""
-        try:
-            import json
-            await self.redis.setex(
-                f"job:{job_id}",
-                86400 * 7,  # Keep for 7 days
-                json.dumps(status)
-            )
-        except Exception as e:
-            logger.error("job_status_update_failed", job_id=job_id, error=str(e))
-    
-    async def _store_final_result(self, job_id: str, result: Dict[str, Any]):
-        """Store final processing result"""
-        try:
-            import json
-            await self.redis.setex(
-                f"result:{job_id}",
-                86400 * 30,  # Keep for 30 days
-                json.dumps(result)
-            )
-            
-            # Update job status with result reference
-            current_status = await self.get_job_status(job_id) or {}
-            current_status["result"] = f"result:{job_id}"
-            current_status["completed_at"] = datetime.utcnow().isoformat()
-            await self._update_job_status(job_id, current_status)
+    async def _set_job_fields(
+        self,
+        job_id: str,
+        fields: Dict[str, Any],
+        guard: bool = True,
+        publish: bool = True
+    ) -> bool:
+        """
+        Set job status fields, refresh the TTL and broadcast the delta in one call
+        
+        Args:
+            job_id: Job ID
+            fields: Changed status fields
+            guard: Skip the write if the job is missing or already terminal,
+                so late pipeline updates cannot overwrite a cancellation
+            publish: Broadcast the delta on the meeting_updates channel
             
-        except Exception as e:
-            logger.error("final_result_storage_failed", job_id=job_id, error=str(e))
+        Returns:
+            True if the fields were written
+        """
+        message = ""
+        if publish:
+            message = json.dumps({
+                "type": "status_update",
+                "job_id": job_id,
+                "status": fields,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        
+        args = [
+            JOB_TTL_SECONDS,
+            UPDATES_CHANNEL if publish else "",
+            message,
+            "1" if guard else "0",
+            json.dumps([json.dumps(stage) for stage in TERMINAL_STAGES])
+        ]
+        for field, value in fields.items():
+            args.extend([field, json.dumps(value)])
+        
+        with tracer.start_as_current_span(
+            "redis.update_job",
+            attributes={"job.id": job_id, "fields": list(fields)}
+        ) as span:
+            written = await self._update_job_script(keys=[f"job:{job_id}"], args=args)
+            span.set_attribute("written", bool(written))
+        return bool(written)
     
-    async def _broadcast_status_update(self, job_id: str, status: Dict[str, Any]):
-        """Broadcast status update via Redis pub/sub"""
+    async def _broadcast_partial_result(self, job_id: str, event: Dict[str, Any]):
+        """Broadcast a finished analysis section via Redis pub/sub"""
         try:
-            import json
             message = {
-                "type": "status_update",
+                "type": "partial_result",
                 "job_id": job_id,
-                "status": status,
+                **event,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
-            await self.redis.publish("meeting_updates", json.dumps(message))
+            await self.redis.publish(UPDATES_CHANNEL, json.dumps(message))
+            
+        except Exception as e:
+            logger.error("partial_result_broadcast_failed", job_id=job_id, error=str(e))
+    
+    def _decode_job_fields(self, data: Dict[Any, Any]) -> Dict[str, Any]:
+        """Decode a job hash into a status dict"""
+        return {
+            (field.decode() if isinstance(field, bytes) else field): json.loads(value)
+            for field, value in data.items()
+        }
+    
+    async def _store_final_result(self, job_id: str, result: Dict[str, Any]):
+        """Store final processing result (raises so the job fails rather than completing without one)"""
+        try:
+            await self.results.put(job_id, result)
             
         except Exception as e:
-            logger.error("status_broadcast_failed", job_id=job_id, error=str(e))
+            logger.error("final_result_storage_failed", job_id=job_id, error=str(e))
+            raise
     
-    async def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get final processing result"""
+    async def get_result(self, job_id: str, parts: List[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get final processing result
+        
+        Args:
+            job_id: Job ID
+            parts: Subset of "transcript", "segments", "analysis" (all if omitted)
+        """
         try:
-            result_data = await self.redis.get(f"result:{job_id}")
-            if result_data:
-                import json
-                return json.loads(result_data)
-            return None
+            return await self.results.get(job_id, parts or ALL_PARTS)
         except Exception as e:
             logger.error("result_retrieval_failed", job_id=job_id, error=str(e))
             return None
     
-    def _estimate_processing_duration(self, audio_path: str) -> int:
-        """Estimate processing duration in seconds"""
+    async def migrate_cold_results(self) -> int:
+        """Move results past the hot window out of Redis"""
+        try:
+            return await self.results.migrate_cold()
+        except Exception as e:
+            logger.error("result_migration_failed", error=str(e))
+            return 0
+    
+    async def purge_expired_results(self) -> int:
+        """Delete blob-stored results whose Redis record has expired"""
+        try:
+            return await self.results.purge_expired_blobs()
+        except Exception as e:
+            logger.error("result_purge_failed", error=str(e))
+            return 0
+    
+    async def retrain_result_dictionary(self, sample_size: int = 200) -> Optional[int]:
+        """Retrain the result compression dictionary on recent jobs"""
+        try:
+            job_ids = await self.redis.zrevrange(JOBS_INDEX, 0, sample_size - 1)
+            return await self.results.train_dictionary(
+                job_id.decode() if isinstance(job_id, bytes) else job_id for job_id in job_ids
+            )
+        except Exception as e:
+            logger.error("result_dictionary_training_failed", error=str(e))
+            return None
+    
+    async def _estimate_processing_duration(
+        self,
+        audio_path: str,
+        audio_info: Dict[str, Any] = None
+    ) -> int:
+        """
+        Estimate processing duration in seconds
+        
+        Args:
+            audio_path: Path to audio file
+            audio_info: probe_audio() result if already probed
+        """
+        if audio_info is None:
+            audio_info = await probe_audio(audio_path)
+        
+        if audio_info:
+            stages = await self.eta.estimate(audio_info["duration_seconds"])
+            return int(round(sum(stages.values())))
+        
         try:
             import os
             file_size = os.path.getsize(audio_path)
             
-            # Rough estimation: 1MB = ~2 minutes of processing
+            # Unreadable headers: fall back to 1MB = ~2 minutes of processing
             estimated_seconds = (file_size / (1024 * 1024)) * 120
             
             # Add buffer time
@@ -285,10 +821,10 @@ class AsyncMeetingProcessor:
         except Exception:
             return 300  # Default 5 minutes
     
-    def _calculate_processing_time(self, job_id: str) -> float:
+    async def _calculate_processing_time(self, job_id: str) -> float:
         """Calculate total processing time"""
         try:
-            status = self.active_jobs.get(job_id, {})
+            status = await self.get_job_status(job_id) or {}
             if "started_at" in status:
                 start_time = datetime.fromisoformat(status["started_at"])
                 end_time = datetime.utcnow()
@@ -300,15 +836,14 @@ class AsyncMeetingProcessor:
     async def cancel_job(self, job_id: str) -> bool:
         """Cancel a processing job"""
         try:
-            current_status = await self.get_job_status(job_id)
-            if not current_status:
+            # Update status to cancelled; the guarded write refuses completed/failed jobs
+            cancelled = await self._update_stage(job_id, ProcessingStage.FAILED, 0, "Job cancelled by user")
+            if not cancelled:
                 return False
             
-            if current_status["stage"] in [ProcessingStage.COMPLETED.value, ProcessingStage.FAILED.value]:
-                return False  # Cannot cancel completed/failed jobs
-            
-            # Update status to cancelled
-            await self._update_stage(job_id, ProcessingStage.FAILED, 0, "Job cancelled by user")
+            # Stop the pipeline wherever it is running
+            if not self._cancel_local_job(job_id):
+                await self.redis.publish(CANCEL_CHANNEL, job_id)
             
             logger.info("job_cancelled", job_id=job_id)
             return True
@@ -320,24 +855,51 @@ class AsyncMeetingProcessor:
     async def cleanup_old_jobs(self, days: int = 7):
         """Clean up old job data"""
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            
-            # Get all jobs
-            jobs = await self.get_all_jobs()
+            cutoff = self._to_epoch_ms(datetime.utcnow() - timedelta(days=days))
             
             cleaned_count = 0
-            for job in jobs:
-                try:
-                    started_at = datetime.fromisoformat(job.get("started_at", ""))
-                    if started_at < cutoff_date:
-                        # Delete job status and result
-                        await self.redis.delete(f"job:{job['job_id']}")
-                        await self.redis.delete(f"result:{job['job_id']}")
-                        cleaned_count += 1
-                except Exception:
-                    continue
+            while True:
+                job_ids = await self.redis.zrangebyscore(
+                    JOBS_INDEX, "-inf", cutoff, start=0, num=CLEANUP_BATCH_SIZE
+                )
+                if not job_ids:
+                    break
+                job_ids = [job_id.decode() if isinstance(job_id, bytes) else job_id for job_id in job_ids]
+                
+                # Owners are needed to drop per-user index entries; audio paths
+                # catch uploads left behind by abandoned jobs
+                pipe = self.redis.pipeline(transaction=False)
+                for job_id in job_ids:
+                    pipe.hmget(f"job:{job_id}", ["user_id", "audio_path"])
+                records = await pipe.execute(raise_on_error=False)
+                owners, audio_paths = [], []
+                for record in records:
+                    user_id, audio_path = record if isinstance(record, list) else (None, None)
+                    owners.append(user_id)
+                    audio_paths.append(json.loads(audio_path) if audio_path else None)
+                
+                # Delete results (Redis and blob store), then job status
+                await self.results.delete_many(job_ids)
+                
+                pipe = self.redis.pipeline(transaction=False)
+                for job_id, owner in zip(job_ids, owners):
+                    pipe.delete(f"job:{job_id}")
+                    user_id = json.loads(owner) if isinstance(owner, (bytes, str)) else None
+                    if user_id:
+                        pipe.zrem(USER_JOBS_INDEX.format(user_id=user_id), job_id)
+                pipe.zrem(JOBS_INDEX, *job_ids)
+                await pipe.execute()
+                
+                for audio_path in audio_paths:
+                    await remove_upload(audio_path)
+                
+                cleaned_count += len(job_ids)
             
             logger.info("old_jobs_cleaned", count=cleaned_count, days=days)
             
         except Exception as e:
             logger.error("job_cleanup_failed", error=str(e))
+    
+    def _to_epoch_ms(self, timestamp: datetime) -> int:
+        """Convert a naive UTC datetime to epoch milliseconds"""
+        return int((timestamp - EPOCH).total_seconds() * 1000)
@@ -1,12 +1,12 @@
 from typing import Optional, Dict, Any
-import httpx
 import jwt
 from datetime import datetime, timedelta
 import secrets
 import structlog
-from supabase import create_client, Client
 
 from src.core.config import get_settings
+from src.core.http import get_http_client
+from src.services.user_repository import UserRepository
 
 logger = structlog.get_logger()
 settings = get_settings()
@@ -18,13 +18,13 @@ class GitHubAuthService:
     - Handles GitHub OAuth flow
     - Creates JWT tokens for authenticated users
     - Manages user sessions
-    - Integrates with Supabase for user data
+    - Stores users in Postgres through the async UserRepository
     """
     
     def __init__(self):
         self.client_id = settings.GITHUB_CLIENT_ID
         self.client_secret = settings.GITHUB_CLIENT_SECRET
-        self.supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        self.users = UserRepository()
         self.jwt_secret = settings.JWT_SECRET
         
     def get_auth_url(self, redirect_uri: str) -> str:
@@ -43,16 +43,16 @@ class GitHubAuthService:
     async def exchange_code_for_token(self, code: str) -> Optional[Dict[str, Any]]:
         """Exchange OAuth code for access token"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    'https://github.com/login/oauth/access_token',
-                    data={
-                        'client_id': self.client_id,
-                        'client_secret': self.client_secret,
-                        'code': code
-                    },
-                    headers={'Accept': 'application/json'}
-                )
+            client = get_http_client('github')
+            response = await client.post(
+                'https://github.com/login/oauth/access_token',
+                data={
+                    'client_id': self.client_id,
+                    'client_secret': self.client_secret,
+                    'code': code
+                },
+                headers={'Accept': 'application/json'}
+            )
             
             if response.status_code != 200:
                 logger.error("github_token_exchange_failed", status=response.status_code)
@@ -67,14 +67,11 @@ class GitHubAuthService:
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get user information from GitHub"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    'https://api.github.com/user',
-                    headers={
-                        'Authorization': f'token {access_token}',
-                        'User-Agent': 'MeetingGPT'
-                    }
-                )
+            client = get_http_client('github')
+            response = await client.get(
+                'https://api.github.com/user',
+                headers={'Authorization': f'token {access_token}'}
+            )
             
             if response.status_code != 200:
                 logger.error("github_user_info_failed", status=response.status_code)
@@ -89,14 +86,11 @@ class GitHubAuthService:
     async def get_user_emails(self, access_token: str) -> Optional[list]:
         """Get user emails from GitHub"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    'https://api.github.com/user/emails',
-                    headers={
-                        'Authorization': f'token {access_token}',
-                        'User-Agent': 'MeetingGPT'
-                    }
-                )
+            client = get_http_client('github')
+            response = await client.get(
+                'https://api.github.com/user/emails',
+                headers={'Authorization': f'token {access_token}'}
+            )
             
             if response.status_code != 200:
                 logger.error("github_emails_failed", status=response.status_code)
@@ -133,44 +127,30 @@ class GitHubAuthService:
         
         primary_email = emails[0]
         
-        # 4. Create or update user in Supabase
+        # 4. Create or update user (one upsert on github_id)
         user_data = {
             'github_id': user_info['id'],
             'username': user_info['login'],
             'name': user_info.get('name', ''),
             'email': primary_email,
             'avatar_url': user_info.get('avatar_url', ''),
-            'github_access_token': access_token,
-            'last_login': datetime.utcnow().isoformat()
+            'github_access_token': access_token
         }
         
         try:
-            # Check if user exists
-            existing_user = self.supabase.table('users').select('*').eq('github_id', user_info['id']).execute()
-            
-            if existing_user.data:
-                # Update existing user
-                self.supabase.table('users').update(user_data).eq('github_id', user_info['id']).execute()
-                user_id = existing_user.data[0]['id']
-            else:
-                # Create new user
-                user_data['created_at'] = datetime.utcnow().isoformat()
-                user_data['subscription_tier'] = 'free'
-                user_data['meetings_processed'] = 0
-                result = self.supabase.table('users').insert(user_data).execute()
-                user_id = result.data[0]['id']
+            user = await self.users.upsert_github_user(user_data)
             
             # 5. Create JWT token
-            jwt_token = self.create_jwt_token(user_id, user_info['login'])
+            jwt_token = self.create_jwt_token(user['id'], user_info['login'])
             
             return {
                 'user': {
-                    'id': user_id,
+                    'id': user['id'],
                     'username': user_info['login'],
                     'name': user_info.get('name', ''),
                     'email': primary_email,
                     'avatar_url': user_info.get('avatar_url', ''),
-                    'subscription_tier': user_data.get('subscription_tier', 'free')
+                    'subscription_tier': user['subscription_tier']
                 },
                 'token': jwt_token,
                 'expires_in': 3600  # 1 hour
@@ -201,13 +181,16 @@ class GitHubAuthService:
         except jwt.InvalidTokenError:
             return None
     
+    async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get stored user info (None if the user does not exist)"""
+        return await self.users.get_user(user_id)
+    
     async def get_user_subscription(self, user_id: str) -> Dict[str, Any]:
         """Get user subscription info"""
         try:
-            result = self.supabase.table('users').select('subscription_tier, meetings_processed').eq('id', user_id).execute()
+            user = await self.users.get_subscription(user_id)
             
-            if result.data:
-                user = result.data[0]
+            if user:
                 return {
                     'tier': user['subscription_tier'],
                     'meetings_processed': user['meetings_processed'],
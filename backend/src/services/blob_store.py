@@ -0,0 +1,110 @@
+import abc
+import asyncio
+import os
+from typing import Optional
+import structlog
+
+from src.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+class BlobStore(abc.ABC):
+    """Cold storage for finished results"""
+
+    @abc.abstractmethod
+    async def put(self, key: str, data: bytes):
+        ...
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """The blob's bytes, or None if it does not exist"""
+
+    @abc.abstractmethod
+    async def delete(self, key: str):
+        """Delete a blob (missing blobs are ignored)"""
+
+class FilesystemBlobStore(BlobStore):
+    """Blob store on a local or mounted filesystem"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self._write, self._path(key), data)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await asyncio.to_thread(self._read, self._path(key))
+        except FileNotFoundError:
+            return None
+
+    async def delete(self, key: str):
+        try:
+            await asyncio.to_thread(os.remove, self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        # Write then rename so readers never see a partial blob
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+class S3BlobStore(BlobStore):
+    """Blob store on S3 or an S3-compatible service (MinIO, R2)"""
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: str = None,
+        access_key_id: str = None,
+        secret_access_key: str = None
+    ):
+        import boto3
+
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self.client.put_object, Bucket=self.bucket, Key=key, Body=data)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            response = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return await asyncio.to_thread(response["Body"].read)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+def create_blob_store() -> BlobStore:
+    """Blob store configured by RESULT_BLOB_BACKEND"""
+    if settings.RESULT_BLOB_BACKEND == "s3":
+        return S3BlobStore(
+            settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY
+        )
+    return FilesystemBlobStore(settings.RESULT_BLOB_DIR)
@@ -0,0 +1,127 @@
+import time
+from typing import Dict, List, Optional, Tuple
+import redis.asyncio as redis
+import structlog
+
+from src.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+# Pipeline stages in execution order
+STAGES = ("transcribing", "analyzing", "indexing")
+
+# (fixed seconds, seconds per audio second) used until enough jobs completed
+DEFAULT_RATES: Dict[str, Tuple[float, float]] = {
+    "transcribing": (15.0, 0.15),
+    "analyzing": (10.0, 0.03),
+    "indexing": (2.0, 0.005),
+}
+
+SAMPLES_KEY = "eta:samples:{stage}"
+
+class ProcessingTimeEstimator:
+    """
+    Processing-time estimates from audio duration and measured throughput
+
+    - Every completed stage records (audio seconds, stage seconds) in a
+      capped Redis list shared by all workers
+    - Each stage is modelled as fixed overhead + a rate per audio second,
+      fitted by least squares over the recent samples
+    - Stages served from the result cache are not recorded
+    - Fitted models are reused for ETA_MODEL_TTL_SECONDS per process
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+        self._models: Dict[str, Tuple[float, Tuple[float, float]]] = {}
+
+    async def estimate(self, audio_seconds: float) -> Dict[str, float]:
+        """Expected seconds per stage for a recording of this length"""
+        estimates = {}
+        for stage in STAGES:
+            overhead, rate = await self._model(stage)
+            estimates[stage] = overhead + rate * audio_seconds
+        return estimates
+
+    async def record(self, stage: str, audio_seconds: float, stage_seconds: float):
+        """Add a completed stage to the throughput samples"""
+        if not audio_seconds or stage_seconds <= 0:
+            return
+        try:
+            key = SAMPLES_KEY.format(stage=stage)
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.lpush(key, f"{audio_seconds:.3f}:{stage_seconds:.3f}")
+            pipe.ltrim(key, 0, settings.ETA_SAMPLE_SIZE - 1)
+            await pipe.execute()
+        except Exception as e:
+            logger.error("eta_sample_record_failed", stage=stage, error=str(e))
+
+    async def _model(self, stage: str) -> Tuple[float, float]:
+        cached = self._models.get(stage)
+        if cached and time.monotonic() - cached[0] < settings.ETA_MODEL_TTL_SECONDS:
+            return cached[1]
+
+        model = DEFAULT_RATES[stage]
+        try:
+            raw = await self.redis.lrange(SAMPLES_KEY.format(stage=stage), 0, -1)
+            samples = []
+            for item in raw:
+                audio, seconds = (item.decode() if isinstance(item, bytes) else item).split(":")
+                samples.append((float(audio), float(seconds)))
+            if len(samples) >= settings.ETA_MIN_SAMPLES:
+                model = _fit(samples)
+        except Exception as e:
+            logger.error("eta_model_load_failed", stage=stage, error=str(e))
+
+        self._models[stage] = (time.monotonic(), model)
+        return model
+
+class StageClock:
+    """Tracks the running stage of one job to compute its remaining time"""
+
+    def __init__(self, estimates: Dict[str, float]):
+        self.estimates = estimates
+        self.stage: Optional[str] = None
+        self.started = time.monotonic()
+
+    def start(self, stage: str):
+        self.stage = stage
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Seconds spent in the current stage"""
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        """Expected seconds until the job completes"""
+        index = STAGES.index(self.stage) if self.stage else 0
+        later = sum(self.estimates[stage] for stage in STAGES[index + 1:])
+        if not self.stage:
+            return later + self.estimates[STAGES[0]]
+
+        expected, elapsed = self.estimates[self.stage], self.elapsed()
+        # An overrunning stage is assumed to be nearly, never entirely, done
+        return later + max(expected - elapsed, 0.1 * max(expected, elapsed))
+
+def _fit(samples: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """Least-squares (overhead, rate) with both kept non-negative"""
+    n = len(samples)
+    mean_x = sum(x for x, _ in samples) / n
+    mean_y = sum(y for _, y in samples) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in samples)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in samples)
+
+    if var_x > 0:
+        if cov <= 0:
+            return mean_y, 0.0  # No dependence on length in the window
+        rate = cov / var_x
+        overhead = mean_y - rate * mean_x
+        if overhead >= 0:
+            return overhead, rate
+
+    # All samples the same length, or a negative intercept: fit through the origin
+    sum_xx = sum(x * x for x, _ in samples)
+    if sum_xx > 0:
+        return 0.0, sum(x * y for x, y in samples) / sum_xx
+    return mean_y, 0.0
@@ -0,0 +1,138 @@
+import asyncio
+import json
+from collections import defaultdict, deque
+from typing import Dict, List, Any, Set
+import redis.asyncio as redis
+import structlog
+
+from src.services.async_processor import UPDATES_CHANNEL
+
+logger = structlog.get_logger()
+
+class JobSubscription:
+    """
+    One client's pending updates for one job
+
+    Status deltas are merged into a single pending delta, so a slow
+    client receives the latest state instead of a growing backlog.
+    Other messages (partial results) are kept in a bounded buffer.
+    """
+
+    def __init__(self, job_id: str, max_events: int = 100):
+        self.job_id = job_id
+        self.max_events = max_events
+        self.dropped = 0
+        self._status: Dict[str, Any] = {}
+        self._events = deque(maxlen=max_events)
+        self._ready = asyncio.Event()
+
+    def push(self, message: Dict[str, Any]):
+        """Queue a message for this client"""
+        if message.get("type") == "status_update":
+            self._status.update(message.get("status") or {})
+        else:
+            if len(self._events) == self.max_events:
+                self.dropped += 1
+            self._events.append(message)
+        self._ready.set()
+
+    async def next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for and take everything pending"""
+        await self._ready.wait()
+        self._ready.clear()
+
+        batch = list(self._events)
+        self._events.clear()
+
+        if self._status:
+            batch.append({"type": "status_update", "job_id": self.job_id, "status": self._status})
+            self._status = {}
+
+        return batch
+
+class UpdateFanout:
+    """
+    Per-process gateway from the meeting_updates channel to clients
+
+    - One Redis subscription per API process, however many clients are connected
+    - In-memory registry of subscriptions per job
+    - Each message is delivered only to subscribers of its job
+    """
+
+    def __init__(self, redis_client: redis.Redis, channel: str = UPDATES_CHANNEL):
+        self.redis = redis_client
+        self.channel = channel
+        self._subscribers: Dict[str, Set[JobSubscription]] = defaultdict(set)
+        self._task = None
+
+    async def start(self):
+        """Start the shared subscription"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the shared subscription"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, job_id: str) -> JobSubscription:
+        """Register a client for one job's updates"""
+        subscription = JobSubscription(job_id)
+        self._subscribers[job_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: JobSubscription):
+        """Remove a client"""
+        subscribers = self._subscribers.get(subscription.job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.job_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def _run(self):
+        """Consume the channel, reconnecting with backoff"""
+        backoff = 1.0
+
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                logger.info("update_fanout_subscribed", channel=self.channel)
+                backoff = 1.0
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message" or not self._subscribers:
+                        continue
+                    self._dispatch(message["data"])
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("update_fanout_failed", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    def _dispatch(self, data: Any):
+        """Deliver one channel message to the job's subscribers"""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+
+        for subscription in self._subscribers.get(message.get("job_id"), ()):
+            subscription.push(message)
@@ -0,0 +1,375 @@
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+import structlog
+
+from src.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+# Reads the first available entry from the lanes in the given order, in one
+# round trip. When all lanes are empty it returns each lane's last entry ID so
+# the caller can block on exactly the entries that arrive after this scan.
+READ_LANES_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    local entries = redis.call('XREADGROUP', 'GROUP', ARGV[1], ARGV[2], 'COUNT', 1, 'STREAMS', key, '>')
+    if entries then
+        return {1, entries}
+    end
+end
+
+local tails = {}
+for i, key in ipairs(KEYS) do
+    local last = redis.call('XREVRANGE', key, '+', '-', 'COUNT', 1)
+    tails[i] = last[1] and last[1][1] or '0-0'
+end
+return {0, tails}
+"""
+
+# Takes (or renews) one of a user's concurrent job slots. Slots are leases that
+# lapse on their own if the worker holding them dies.
+ACQUIRE_SLOT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+    redis.call('PEXPIRE', KEYS[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+USER_SLOTS_KEY = "jobs:running:{user_id}"
+
+def _decode(value: Any) -> Any:
+    """Decode Redis bytes responses"""
+    return value.decode() if isinstance(value, bytes) else value
+
+class JobQueue:
+    """
+    Durable meeting job queue backed by Redis Streams
+
+    - Jobs are appended to a stream and consumed through a consumer group
+    - One stream ("lane") per subscription tier and job size class; lanes
+      are read in smooth weighted round-robin order, so Pro jobs and short
+      jobs go first without starving anyone (approximate shortest-job-first)
+    - Each user holds at most JOB_USER_CONCURRENCY[tier] running jobs;
+      entries over the limit are deferred to the back of their lane
+    - Entries stay pending until the worker acknowledges them
+    - Entries idle longer than JOB_CLAIM_IDLE_MS are re-claimed by live workers
+    - Entries delivered more than JOB_MAX_DELIVERIES times are dead-lettered
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        stream: str = None,
+        group: str = None
+    ):
+        self.redis = redis_client
+        self.stream = stream or settings.JOB_STREAM_KEY
+        self.group = group or settings.JOB_CONSUMER_GROUP
+        self.dead_letter_stream = f"{self.stream}:dead"
+        self._group_ready = False
+
+        # Lane stream -> weight; the bare stream holds entries from before lanes existed
+        self.lanes: Dict[str, int] = {}
+        for tier, tier_weight in settings.JOB_TIER_WEIGHTS.items():
+            for size_class, size_weight in enumerate(settings.JOB_SIZE_CLASS_WEIGHTS):
+                self.lanes[self.lane(tier, size_class)] = tier_weight * size_weight
+        self.lanes[self.stream] = 1
+
+        self._lane_credit = {lane: 0 for lane in self.lanes}
+        self._read_script = redis_client.register_script(READ_LANES_SCRIPT)
+        self._acquire_slot_script = redis_client.register_script(ACQUIRE_SLOT_SCRIPT)
+
+    def lane(self, tier: str, size_class: int) -> str:
+        """Stream key of a lane, e.g. meeting_jobs:pro:0"""
+        return f"{self.stream}:{tier}:{size_class}"
+
+    @staticmethod
+    def size_class(estimated_seconds: Optional[int]) -> int:
+        """Index of the size class an estimated processing time falls in"""
+        if estimated_seconds is None:
+            return len(settings.JOB_SIZE_CLASS_SECONDS)  # Unknown size: treat as long
+        for index, limit in enumerate(settings.JOB_SIZE_CLASS_SECONDS):
+            if estimated_seconds <= limit:
+                return index
+        return len(settings.JOB_SIZE_CLASS_SECONDS)
+
+    @staticmethod
+    def tier_of(tier: Optional[str]) -> str:
+        """Known tier name; anything unknown is scheduled as the lowest tier"""
+        if tier in settings.JOB_TIER_WEIGHTS:
+            return tier
+        return min(settings.JOB_TIER_WEIGHTS, key=settings.JOB_TIER_WEIGHTS.get)
+
+    async def ensure_group(self):
+        """Create the consumer group (and stream) of every lane if missing"""
+        if self._group_ready:
+            return
+
+        for lane in self.lanes:
+            try:
+                await self.redis.xgroup_create(lane, self.group, id="0", mkstream=True)
+                logger.info("job_queue_group_created", stream=lane, group=self.group)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+        self._group_ready = True
+
+    async def enqueue(
+        self,
+        job_id: str,
+        payload: Dict[str, Any],
+        user_id: str = None,
+        tier: str = None,
+        estimated_seconds: int = None
+    ) -> str:
+        """
+        Append a job to its lane
+
+        Args:
+            job_id: Job ID the entry belongs to
+            payload: JSON-serializable job arguments
+            user_id: Owner, for the per-user concurrency limit
+            tier: Subscription tier of the owner
+            estimated_seconds: Expected processing time, for the size class
+
+        Returns:
+            Stream entry ID
+        """
+        await self.ensure_group()
+        tier = self.tier_of(tier)
+        entry_id = await self.redis.xadd(
+            self.lane(tier, self.size_class(estimated_seconds)),
+            {
+                "job_id": job_id,
+                "payload": json.dumps(payload),
+                "user_id": user_id or "",
+                "tier": tier,
+                "estimated_seconds": estimated_seconds if estimated_seconds is not None else "",
+                "enqueued_at": int(time.time() * 1000)
+            }
+        )
+        return _decode(entry_id)
+
+    async def read(self, consumer: str, block_ms: int = None) -> List[Dict[str, Any]]:
+        """
+        Take the next entry by lane priority
+
+        If every lane is empty, blocks up to block_ms for a new entry and
+        returns [] so the caller reads again (another worker may win it).
+        """
+        await self.ensure_group()
+        lanes = self._lane_order()
+
+        found, data = await self._read_script(keys=lanes, args=[self.group, consumer])
+        if found:
+            stream, messages = data[0]
+            entry_id, fields = messages[0]
+            return [self._parse_entry(entry_id, self._pairs(fields), deliveries=1, stream=_decode(stream))]
+
+        await self.redis.xread(
+            {lane: _decode(tail) for lane, tail in zip(lanes, data)},
+            count=1,
+            block=settings.JOB_BLOCK_MS if block_ms is None else block_ms
+        )
+        return []
+
+    async def ack(self, entry: Dict[str, Any]):
+        """Acknowledge and drop a finished entry"""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xack(entry["stream"], self.group, entry["entry_id"])
+        pipe.xdel(entry["stream"], entry["entry_id"])
+        await pipe.execute()
+
+    async def defer(self, entry: Dict[str, Any]):
+        """Move an entry to the back of its lane (owner is at their concurrency limit)"""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xadd(entry["stream"], entry["fields"])
+        pipe.xack(entry["stream"], self.group, entry["entry_id"])
+        pipe.xdel(entry["stream"], entry["entry_id"])
+        await pipe.execute()
+
+    async def acquire_user_slot(self, entry: Dict[str, Any]) -> bool:
+        """Take one of the owner's concurrent slots (or renew it); True if granted"""
+        if not entry["user_id"]:
+            return True
+
+        granted = await self._acquire_slot_script(
+            keys=[USER_SLOTS_KEY.format(user_id=entry["user_id"])],
+            args=[entry["job_id"], self._user_limit(entry["tier"]), settings.JOB_CLAIM_IDLE_MS]
+        )
+        return bool(granted)
+
+    async def release_user_slot(self, entry: Dict[str, Any]):
+        """Give a user slot back"""
+        if entry["user_id"]:
+            await self.redis.zrem(USER_SLOTS_KEY.format(user_id=entry["user_id"]), entry["job_id"])
+
+    async def heartbeat(self, consumer: str, entries: List[Dict[str, Any]]):
+        """Reset idle time of in-flight entries and renew their user slots"""
+        if not entries:
+            return
+
+        by_stream = defaultdict(list)
+        for entry in entries:
+            by_stream[entry["stream"]].append(entry["entry_id"])
+
+        for stream, entry_ids in by_stream.items():
+            await self.redis.xclaim(
+                stream,
+                self.group,
+                consumer,
+                min_idle_time=0,
+                message_ids=entry_ids,
+                justid=True
+            )
+
+        for entry in entries:
+            await self.acquire_user_slot(entry)
+
+    async def claim_stale(self, consumer: str, count: int = 1) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Claim entries whose worker stopped heartbeating
+
+        Entries that exceeded JOB_MAX_DELIVERIES are moved to the dead-letter
+        stream instead of being handed out again.
+
+        Returns:
+            (claimed entries, dead-lettered entries)
+        """
+        await self.ensure_group()
+
+        claimed, dead = [], []
+        for stream in sorted(self.lanes, key=self.lanes.get, reverse=True):
+            if len(claimed) >= count:
+                break
+
+            pending = await self.redis.xpending_range(
+                stream,
+                self.group,
+                min="-",
+                max="+",
+                count=count - len(claimed),
+                idle=settings.JOB_CLAIM_IDLE_MS
+            )
+
+            for item in pending:
+                entry_id = _decode(item["message_id"])
+                deliveries = item["times_delivered"]
+
+                messages = await self.redis.xclaim(
+                    stream,
+                    self.group,
+                    consumer,
+                    min_idle_time=settings.JOB_CLAIM_IDLE_MS,
+                    message_ids=[entry_id]
+                )
+                if not messages:
+                    continue  # Another worker claimed it first
+
+                _entry_id, fields = messages[0]
+                if fields is None:
+                    # Entry was deleted from the stream
+                    await self.ack({"stream": stream, "entry_id": entry_id})
+                    continue
+
+                entry = self._parse_entry(entry_id, fields, deliveries=deliveries + 1, stream=stream)
+
+                if deliveries >= settings.JOB_MAX_DELIVERIES:
+                    await self._dead_letter(entry)
+                    dead.append(entry)
+                    continue
+
+                logger.warning(
+                    "job_entry_reclaimed",
+                    entry_id=entry_id,
+                    job_id=entry["job_id"],
+                    deliveries=entry["deliveries"]
+                )
+                claimed.append(entry)
+
+        return claimed, dead
+
+    async def depth(self) -> Dict[str, Any]:
+        """Get queued and in-flight entry counts, overall and per lane"""
+        await self.ensure_group()
+
+        lanes = {}
+        for lane in self.lanes:
+            pending = await self.redis.xpending(lane, self.group)
+            lanes[lane] = {
+                "queued": await self.redis.xlen(lane) - pending["pending"],
+                "in_flight": pending["pending"]
+            }
+
+        return {
+            "queued": sum(lane["queued"] for lane in lanes.values()),
+            "in_flight": sum(lane["in_flight"] for lane in lanes.values()),
+            "lanes": lanes
+        }
+
+    def _lane_order(self) -> List[str]:
+        """
+        Lanes in the order to try them
+
+        Smooth weighted round-robin picks the lane to try first, so every
+        lane gets its weight's share of picks; the rest follow by weight.
+        """
+        total = sum(self.lanes.values())
+        for lane, weight in self.lanes.items():
+            self._lane_credit[lane] += weight
+
+        first = max(self._lane_credit, key=self._lane_credit.get)
+        self._lane_credit[first] -= total
+
+        rest = sorted((lane for lane in self.lanes if lane != first), key=self.lanes.get, reverse=True)
+        return [first] + rest
+
+    @staticmethod
+    def _user_limit(tier: str) -> int:
+        limits = settings.JOB_USER_CONCURRENCY
+        return limits.get(tier, min(limits.values()))
+
+    async def _dead_letter(self, entry: Dict[str, Any]):
+        """Move an entry that keeps failing to the dead-letter stream"""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xadd(self.dead_letter_stream, {**entry["fields"], "deliveries": entry["deliveries"]})
+        pipe.xack(entry["stream"], self.group, entry["entry_id"])
+        pipe.xdel(entry["stream"], entry["entry_id"])
+        await pipe.execute()
+
+        logger.error(
+            "job_entry_dead_lettered",
+            entry_id=entry["entry_id"],
+            job_id=entry["job_id"],
+            deliveries=entry["deliveries"]
+        )
+
+    @staticmethod
+    def _pairs(flat: List[Any]) -> Dict[Any, Any]:
+        """Field list from a script reply ([k1, v1, k2, v2]) as a dict"""
+        return dict(zip(flat[::2], flat[1::2]))
+
+    def _parse_entry(self, entry_id: Any, fields: Dict[Any, Any], deliveries: int, stream: str) -> Dict[str, Any]:
+        """Convert a raw stream entry into a job dict"""
+        fields = {_decode(k): _decode(v) for k, v in fields.items()}
+        return {
+            "entry_id": _decode(entry_id),
+            "stream": stream,
+            "job_id": fields.get("job_id"),
+            "payload": json.loads(fields.get("payload") or "{}"),
+            "user_id": fields.get("user_id") or None,
+            "tier": self.tier_of(fields.get("tier")),
+            "deliveries": deliveries,
+            "fields": fields
+        }
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+import redis.asyncio as redis
+from redis.exceptions import LockError
+import structlog
+
+from src.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+class ResultCache:
+    """
+    Content-addressed cache for transcripts and analyses
+
+    - Keys combine the audio SHA-256 with model and prompt version
+    - Concurrent requests for the same key share one computation:
+      within a process through an asyncio.Event, across processes
+      through a Redis lock that followers poll behind
+    """
+
+    def __init__(self, redis_client: redis.Redis, ttl: int = None):
+        self.redis = redis_client
+        self.ttl = ttl or settings.RESULT_CACHE_TTL
+        self._inflight: Dict[str, asyncio.Event] = {}
+
+    @staticmethod
+    def key(kind: str, audio_hash: str, *parts: str) -> str:
+        """Build a cache key, e.g. cache:transcript:<sha256>:whisper-1:1"""
+        return ":".join(["cache", kind, audio_hash, *parts])
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached value"""
+        try:
+            data = await self.redis.get(key)
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.error("result_cache_get_failed", key=key, error=str(e))
+            return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a value"""
+        try:
+            await self.redis.setex(key, self.ttl, json.dumps(value))
+        except Exception as e:
+            logger.error("result_cache_set_failed", key=key, error=str(e))
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        lock_ttl: int = 600
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Serve a cached value or compute it exactly once
+
+        Args:
+            key: Cache key from ResultCache.key
+            compute: Coroutine factory producing the value on a miss
+            lock_ttl: Seconds before a crashed leader's lock expires
+
+        Returns:
+            (value, served_from_cache)
+        """
+        poll_delay = 0.25
+
+        while True:
+            cached = await self.get(key)
+            if cached is not None:
+                return cached, True
+
+            # Same key already computing in this process
+            local = self._inflight.get(key)
+            if local:
+                await local.wait()
+                continue
+
+            lock = self.redis.lock(f"inflight:{key}", timeout=lock_ttl)
+            if not await lock.acquire(blocking=False):
+                # Another process is computing; wait for its result or its lock to lapse
+                await asyncio.sleep(poll_delay)
+                poll_delay = min(poll_delay * 2, 2.0)
+                continue
+
+            event = asyncio.Event()
+            self._inflight[key] = event
+            try:
+                # The previous leader may have finished between our GET and the lock
+                cached = await self.get(key)
+                if cached is not None:
+                    return cached, True
+
+                value = await compute()
+                await self.set(key, value)
+                return value, False
+            finally:
+                self._inflight.pop(key, None)
+                event.set()
+                try:
+                    await lock.release()
+                except LockError:
+                    pass  # Lock already expired
@@ -0,0 +1,437 @@
+import asyncio
+import json
+import sys
+import time
+from array import array
+from typing import Dict, List, Any, Iterable, Optional
+import msgpack
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+import structlog
+import zstandard as zstd
+
+from src.core.config import get_settings
+from src.services.blob_store import BlobStore, create_blob_store
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+RESULT_TTL_SECONDS = 86400 * 30  # Keep for 30 days
+
+# Results still holding their data in Redis, scored by last write/promotion (epoch seconds)
+HOT_INDEX = "results:hot"
+# Results with a blob, scored by when their Redis pointer expires (epoch seconds);
+# only purge_expired_blobs and delete_many remove entries
+COLD_INDEX = "results:cold"
+BLOB_KEY = "results/{job_id}.mgr"
+
+FORMAT_VERSION = 2  # 1 = single JSON string
+
+CURRENT_DICT_KEY = "result_codec:dict:current"
+DICT_KEY = "result_codec:dict:{dict_id}"
+DICT_CHECK_SECONDS = 60  # How long a process trusts its view of the current dictionary
+DICT_SIZE_BYTES = 64 * 1024
+MIN_TRAINING_SAMPLES = 20
+COMPRESSION_LEVEL = 6
+
+# Hash fields needed for each requestable part
+PART_FIELDS = {
+    "analysis": ["meta"],
+    "transcript": ["transcript"],
+    "segments": ["seg_text", "seg_num", "seg_speaker"],
+}
+ALL_PARTS = tuple(PART_FIELDS)
+
+# Numeric segment columns stored as fixed-width little-endian arrays
+INT_COLUMNS = ("start_ms", "end_ms")
+FLOAT_COLUMNS = ("avg_logprob", "no_speech_prob")
+
+# Segment keys restored on read; ones some segments lack get a presence mask
+SEGMENT_FIELDS = ("id", "start", "end", "text", "speaker") + FLOAT_COLUMNS
+
+def _pack_array(typecode: str, values: Iterable) -> bytes:
+    data = array(typecode, values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+def _unpack_array(typecode: str, raw: bytes) -> array:
+    data = array(typecode)
+    data.frombytes(raw)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data
+
+class ResultCodec:
+    """
+    Compact binary encoding for processing results
+
+    - Segments are split into columns: text, numeric (int32 IDs and
+      milliseconds, float32 confidences) and a speaker table with uint8 codes
+    - Keys missing from some segments get a uint8 presence mask, so they
+      stay missing on read instead of coming back as zeros
+    - Raw Whisper fields not used downstream (tokens, seek, temperature) are dropped
+    - Every field is msgpack + zstd, optionally with a trained dictionary
+    """
+
+    def __init__(self, dictionary: Optional[zstd.ZstdCompressionDict] = None):
+        self.dictionary = dictionary
+        self.dict_id = dictionary.dict_id() if dictionary else 0
+
+    def encode(self, result: Dict[str, Any]) -> Dict[str, bytes]:
+        """Encode a result into hash fields"""
+        segments = result.get("segments") or []
+        speakers = sorted({seg.get("speaker") or "" for seg in segments})
+        speaker_codes = {speaker: code for code, speaker in enumerate(speakers)}
+
+        numeric = {
+            "id": _pack_array("i", (seg.get("id") or 0 for seg in segments)),
+            "start_ms": _pack_array("i", (round((seg.get("start") or 0) * 1000) for seg in segments)),
+            "end_ms": _pack_array("i", (round((seg.get("end") or 0) * 1000) for seg in segments)),
+        }
+        for column in FLOAT_COLUMNS:
+            numeric[column] = _pack_array("f", (seg.get(column) or 0.0 for seg in segments))
+
+        present = {}
+        for field in SEGMENT_FIELDS:
+            mask = [seg.get(field) is not None for seg in segments]
+            if not all(mask):
+                present[field] = _pack_array("B", mask)
+        if present:
+            numeric["present"] = present
+
+        compressor = self._compressor()
+        pack = lambda value: compressor.compress(msgpack.packb(value, use_bin_type=True))
+
+        return {
+            "v": str(FORMAT_VERSION).encode(),
+            "dict": str(self.dict_id).encode(),
+            "meta": pack({
+                "analysis": result.get("analysis"),
+                "processed_at": result.get("processed_at"),
+                "processing_time": result.get("processing_time"),
+            }),
+            "transcript": pack(result.get("transcript", "")),
+            "seg_text": pack([seg.get("text") or "" for seg in segments]),
+            "seg_num": pack(numeric),
+            "seg_speaker": pack({
+                "labels": speakers,
+                "codes": _pack_array("B", (speaker_codes[seg.get("speaker") or ""] for seg in segments)),
+            }),
+        }
+
+    def decode(self, fields: Dict[str, bytes], parts: Iterable[str] = ALL_PARTS) -> Dict[str, Any]:
+        """Decode the requested parts from hash fields"""
+        decompressor = self._decompressor()
+        unpack = lambda raw: msgpack.unpackb(decompressor.decompress(raw), raw=False)
+
+        result: Dict[str, Any] = {}
+        if fields.get("meta"):
+            meta = unpack(fields["meta"])
+            result["processed_at"] = meta.get("processed_at")
+            result["processing_time"] = meta.get("processing_time")
+            if "analysis" in parts:
+                result["analysis"] = meta.get("analysis")
+
+        if "transcript" in parts:
+            result["transcript"] = unpack(fields["transcript"])
+
+        if "segments" in parts:
+            texts = unpack(fields["seg_text"])
+            numeric = unpack(fields["seg_num"])
+            speaker_table = unpack(fields["seg_speaker"])
+
+            starts = _unpack_array("i", numeric["start_ms"])
+            ends = _unpack_array("i", numeric["end_ms"])
+            floats = {column: _unpack_array("f", numeric[column]) for column in FLOAT_COLUMNS}
+            codes = _unpack_array("B", speaker_table["codes"])
+            labels = speaker_table["labels"]
+            # Entries written before IDs and masks were stored have every key, numbered by position
+            ids = _unpack_array("i", numeric["id"]) if "id" in numeric else range(len(texts))
+            present = {field: _unpack_array("B", mask) for field, mask in numeric.get("present", {}).items()}
+
+            segments = []
+            for i, text in enumerate(texts):
+                segment = {
+                    "id": ids[i],
+                    "start": starts[i] / 1000,
+                    "end": ends[i] / 1000,
+                    "text": text,
+                    "speaker": labels[codes[i]],
+                    **{column: round(floats[column][i], 4) for column in FLOAT_COLUMNS},
+                }
+                for field, mask in present.items():
+                    if not mask[i]:
+                        del segment[field]
+                segments.append(segment)
+            result["segments"] = segments
+
+        return result
+
+    def _compressor(self) -> zstd.ZstdCompressor:
+        if self.dictionary:
+            return zstd.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=self.dictionary)
+        return zstd.ZstdCompressor(level=COMPRESSION_LEVEL)
+
+    def _decompressor(self) -> zstd.ZstdDecompressor:
+        if self.dictionary:
+            return zstd.ZstdDecompressor(dict_data=self.dictionary)
+        return zstd.ZstdDecompressor()
+
+    @staticmethod
+    def training_samples(result: Dict[str, Any]) -> List[bytes]:
+        """Uncompressed field payloads of one result, used to train a dictionary"""
+        segments = result.get("segments") or []
+        return [
+            msgpack.packb({
+                "analysis": result.get("analysis"),
+                "processed_at": result.get("processed_at"),
+                "processing_time": result.get("processing_time"),
+            }, use_bin_type=True),
+            msgpack.packb([seg.get("text", "") for seg in segments[:200]], use_bin_type=True),
+        ]
+
+class ResultStore:
+    """
+    Stores processing results as compressed Redis hashes
+
+    - result:{job_id} holds one field per part, so partial reads fetch only what is asked for
+    - Entries record the zstd dictionary they were written with; old dictionaries stay readable
+    - Results written as a single JSON string (format 1) are still readable
+    - After RESULT_HOT_SECONDS the data moves to a blob store and Redis keeps a
+      small pointer record; reading a cold result promotes it back for a hot window
+    - Blobs are deleted once their pointer record has expired (purge_expired_blobs)
+    """
+
+    def __init__(self, redis_client: redis.Redis, blob_store: BlobStore = None):
+        self.redis = redis_client
+        self.blobs = blob_store or create_blob_store()
+        self._dictionaries: Dict[int, Optional[zstd.ZstdCompressionDict]] = {0: None}
+        self._current_dict_id: Optional[int] = None
+        self._current_dict_checked = 0.0
+
+    async def put(self, job_id: str, result: Dict[str, Any], ttl: int = RESULT_TTL_SECONDS):
+        """Encode and store a result"""
+        codec = await self._current_codec()
+        fields = await asyncio.to_thread(codec.encode, result)
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(f"result:{job_id}")
+        pipe.hset(f"result:{job_id}", mapping=fields)
+        pipe.expire(f"result:{job_id}", ttl)
+        pipe.zadd(HOT_INDEX, {job_id: time.time()})
+        await pipe.execute()
+
+    async def get(self, job_id: str, parts: Iterable[str] = ALL_PARTS) -> Optional[Dict[str, Any]]:
+        """Fetch and decode the requested parts of a result"""
+        parts = [part for part in parts if part in PART_FIELDS]
+        names = ["v", "dict", "meta", "location"] + [
+            field for part in parts for field in PART_FIELDS[part] if field != "meta"
+        ]
+
+        try:
+            values = await self.redis.hmget(f"result:{job_id}", names)
+        except ResponseError:
+            return await self._get_legacy(job_id, parts)
+
+        fields = {name: value for name, value in zip(names, values) if value is not None}
+        if "v" not in fields:
+            if "location" not in fields:
+                return None
+            fields = await self._promote(job_id, fields["location"].decode())
+            if fields is None:
+                return None
+
+        codec = ResultCodec(await self._dictionary(int(fields["dict"])))
+        return await asyncio.to_thread(codec.decode, fields, parts)
+
+    async def migrate_cold(self, batch_size: int = 100) -> int:
+        """
+        Move results older than RESULT_HOT_SECONDS to the blob store
+
+        Returns:
+            Number of results migrated
+        """
+        cutoff = time.time() - settings.RESULT_HOT_SECONDS
+        job_ids = await self.redis.zrangebyscore(HOT_INDEX, "-inf", cutoff, start=0, num=batch_size)
+
+        migrated = 0
+        for job_id in job_ids:
+            job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+            key = f"result:{job_id}"
+
+            try:
+                fields = await self.redis.hgetall(key)
+                ttl = await self.redis.ttl(key)
+            except ResponseError:
+                fields, ttl = {}, -2  # Legacy JSON result; left to expire in Redis
+
+            if not fields or ttl == -2:
+                await self.redis.zrem(HOT_INDEX, job_id)
+                continue
+
+            fields = {name.decode(): value for name, value in fields.items()}
+            location = fields.pop("location", b"").decode()
+
+            # Promoted results are already in the blob store
+            if not location:
+                location = BLOB_KEY.format(job_id=job_id)
+                await self.blobs.put(location, msgpack.packb(fields, use_bin_type=True))
+
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.hset(key, mapping={"location": location})
+            if ttl > 0:
+                pipe.expire(key, ttl)
+                pipe.zadd(COLD_INDEX, {job_id: time.time() + ttl})
+            pipe.zrem(HOT_INDEX, job_id)
+            await pipe.execute()
+            migrated += 1
+
+        if migrated:
+            logger.info("results_migrated_to_blob_store", count=migrated)
+        return migrated
+
+    async def delete_many(self, job_ids: List[str]):
+        """Delete results from Redis and the blob store"""
+        if not job_ids:
+            return
+
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hget(f"result:{job_id}", "location")
+        locations = await pipe.execute(raise_on_error=False)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(*[f"result:{job_id}" for job_id in job_ids])
+        pipe.zrem(HOT_INDEX, *job_ids)
+        pipe.zrem(COLD_INDEX, *job_ids)
+        await pipe.execute()
+
+        for location in locations:
+            if isinstance(location, bytes):
+                await self.blobs.delete(location.decode())
+
+    async def purge_expired_blobs(self, batch_size: int = 100) -> int:
+        """
+        Delete blobs whose Redis pointer record has expired
+
+        Returns:
+            Number of blobs deleted
+        """
+        job_ids = await self.redis.zrangebyscore(COLD_INDEX, "-inf", time.time(), start=0, num=batch_size)
+
+        purged = 0
+        for job_id in job_ids:
+            job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+
+            # The pointer's expiry can move (e.g. the result was stored again)
+            ttl = await self.redis.ttl(f"result:{job_id}")
+            if ttl > 0:
+                await self.redis.zadd(COLD_INDEX, {job_id: time.time() + ttl})
+                continue
+
+            if ttl == -2:
+                await self.blobs.delete(BLOB_KEY.format(job_id=job_id))
+                purged += 1
+            await self.redis.zrem(COLD_INDEX, job_id)
+
+        if purged:
+            logger.info("expired_result_blobs_deleted", count=purged)
+        return purged
+
+    async def _promote(self, job_id: str, location: str) -> Optional[Dict[str, bytes]]:
+        """Read-through: load a cold result and keep it in Redis for a hot window"""
+        data = await self.blobs.get(location)
+        if data is None:
+            logger.error("result_blob_missing", job_id=job_id, location=location)
+            return None
+
+        fields = msgpack.unpackb(data, raw=False)
+
+        key = f"result:{job_id}"
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=fields)
+        pipe.zadd(HOT_INDEX, {job_id: time.time()})
+        await pipe.execute()
+
+        logger.info("result_promoted_from_blob_store", job_id=job_id)
+        return fields
+
+    async def train_dictionary(self, job_ids: Iterable[str]) -> Optional[int]:
+        """
+        Train a new zstd dictionary from stored results and make it current
+
+        Returns:
+            The new dictionary ID, or None if there were too few samples
+        """
+        samples = []
+        for job_id in job_ids:
+            result = await self._peek(job_id)
+            if result:
+                samples.extend(ResultCodec.training_samples(result))
+
+        if len(samples) < MIN_TRAINING_SAMPLES:
+            logger.info("result_dictionary_training_skipped", samples=len(samples))
+            return None
+
+        dictionary = await asyncio.to_thread(zstd.train_dictionary, DICT_SIZE_BYTES, samples)
+        dict_id = dictionary.dict_id()
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(DICT_KEY.format(dict_id=dict_id), dictionary.as_bytes())
+        pipe.set(CURRENT_DICT_KEY, dict_id)
+        await pipe.execute()
+
+        self._dictionaries[dict_id] = dictionary
+        self._current_dict_id = dict_id
+        self._current_dict_checked = time.monotonic()
+
+        logger.info("result_dictionary_trained", dict_id=dict_id, samples=len(samples))
+        return dict_id
+
+    async def _current_codec(self) -> ResultCodec:
+        """Codec with the current dictionary (re-read every DICT_CHECK_SECONDS)"""
+        if self._current_dict_id is None or time.monotonic() - self._current_dict_checked > DICT_CHECK_SECONDS:
+            current = await self.redis.get(CURRENT_DICT_KEY)
+            self._current_dict_id = int(current) if current else 0
+            self._current_dict_checked = time.monotonic()
+        return ResultCodec(await self._dictionary(self._current_dict_id))
+
+    async def _dictionary(self, dict_id: int) -> Optional[zstd.ZstdCompressionDict]:
+        """Load a dictionary by ID (cached; dictionaries are immutable)"""
+        if dict_id not in self._dictionaries:
+            data = await self.redis.get(DICT_KEY.format(dict_id=dict_id))
+            if data is None:
+                raise ValueError(f"Unknown result dictionary {dict_id}")
+            self._dictionaries[dict_id] = zstd.ZstdCompressionDict(data)
+        return self._dictionaries[dict_id]
+
+    async def _peek(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Read a full result without promoting it (for sampling)"""
+        try:
+            fields = await self.redis.hgetall(f"result:{job_id}")
+        except ResponseError:
+            return await self._get_legacy(job_id, list(ALL_PARTS))
+
+        fields = {name.decode(): value for name, value in fields.items()}
+        if "v" not in fields:
+            if "location" not in fields:
+                return None
+            data = await self.blobs.get(fields["location"].decode())
+            if data is None:
+                return None
+            fields = msgpack.unpackb(data, raw=False)
+
+        codec = ResultCodec(await self._dictionary(int(fields["dict"])))
+        return await asyncio.to_thread(codec.decode, fields)
+
+    async def _get_legacy(self, job_id: str, parts: List[str]) -> Optional[Dict[str, Any]]:
+        """Read a format 1 (plain JSON) result"""
+        data = await self.redis.get(f"result:{job_id}")
+        if not data:
+            return None
+
+        result = json.loads(data)
+        wanted = set(parts) | {"processed_at", "processing_time"}
+        return {key: value for key, value in result.items() if key in wanted}
@@ -0,0 +1,150 @@
+from typing import Dict, List, Any
+import structlog
+
+from src.core.database import get_db_pool
+
+logger = structlog.get_logger()
+
+SCHEMA = """
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+CREATE TABLE IF NOT EXISTS meeting_search_entries (
+    id BIGSERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    meeting_title TEXT,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    speaker TEXT,
+    start_ms INTEGER,
+    end_ms INTEGER,
+    content TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', content)) STORED
+);
+
+CREATE INDEX IF NOT EXISTS meeting_search_entries_user_tsv_idx
+    ON meeting_search_entries USING GIN (user_id, tsv);
+
+CREATE INDEX IF NOT EXISTS meeting_search_entries_job_idx
+    ON meeting_search_entries (job_id);
+"""
+
+ENTRY_COLUMNS = (
+    "user_id", "job_id", "meeting_title", "kind", "position",
+    "speaker", "start_ms", "end_ms", "content"
+)
+
+# Rank with the GIN index first, build snippets only for the returned page
+SEARCH_QUERY = """
+SELECT job_id, meeting_title, kind, speaker, start_ms, end_ms, rank,
+       ts_headline('english', content, query, 'MaxFragments=1, MaxWords=30, MinWords=10') AS snippet
+FROM (
+    SELECT e.job_id, e.meeting_title, e.kind, e.speaker, e.start_ms, e.end_ms,
+           e.content, e.created_at, q.query, ts_rank_cd(e.tsv, q.query) AS rank
+    FROM meeting_search_entries e,
+         websearch_to_tsquery('english', $2) AS q(query)
+    WHERE e.user_id = $1 AND e.tsv @@ q.query
+    ORDER BY rank DESC, e.created_at DESC
+    LIMIT $3
+) hits
+ORDER BY rank DESC, created_at DESC
+"""
+
+class MeetingSearchIndex:
+    """
+    Full-text archive of processed meetings in Postgres
+
+    - One row per transcript segment, action item and decision
+    - Stemmed tsvector column with a (user_id, tsv) GIN index, so every
+      query is scoped to one user's meetings
+    - Hits are ranked with ts_rank_cd and carry millisecond timestamps
+    - ensure_schema() is run once at API and worker startup, never per
+      request (it creates an extension, which takes locks and privileges)
+    """
+
+    def __init__(self):
+        self._schema_ready = False
+
+    async def ensure_schema(self):
+        """Create the table and indexes if missing (called at process startup)"""
+        if self._schema_ready:
+            return
+
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(SCHEMA)
+        self._schema_ready = True
+
+    async def index_meeting(
+        self,
+        job_id: str,
+        user_id: str,
+        meeting_title: str,
+        segments: List[Dict[str, Any]],
+        analysis: Dict[str, Any]
+    ) -> int:
+        """
+        Replace the index entries of one meeting
+
+        Returns:
+            Number of entries indexed
+        """
+        records = []
+        for position, seg in enumerate(segments):
+            text = (seg.get("text") or "").strip()
+            if text:
+                records.append((
+                    user_id, job_id, meeting_title, "segment", position, seg.get("speaker"),
+                    round(seg.get("start", 0) * 1000), round(seg.get("end", 0) * 1000), text
+                ))
+
+        for position, item in enumerate(analysis.get("action_items") or []):
+            if isinstance(item, dict):
+                text = " ".join(str(item.get(key) or "") for key in ("task", "owner", "deadline")).strip()
+            else:
+                text = str(item)
+            if text:
+                records.append((user_id, job_id, meeting_title, "action_item", position, None, None, None, text))
+
+        for position, decision in enumerate(analysis.get("key_decisions") or []):
+            if decision:
+                records.append((user_id, job_id, meeting_title, "decision", position, None, None, None, str(decision)))
+
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("DELETE FROM meeting_search_entries WHERE job_id = $1", job_id)
+                if records:
+                    await conn.copy_records_to_table(
+                        "meeting_search_entries",
+                        records=records,
+                        columns=ENTRY_COLUMNS
+                    )
+
+        logger.info("meeting_indexed", job_id=job_id, entries=len(records))
+        return len(records)
+
+    async def search(self, user_id: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Ranked hits across one user's meetings"""
+        pool = await get_db_pool()
+        rows = await pool.fetch(SEARCH_QUERY, user_id, query, limit)
+
+        return [
+            {
+                "job_id": row["job_id"],
+                "meeting_title": row["meeting_title"],
+                "kind": row["kind"],
+                "speaker": row["speaker"],
+                "start_ms": row["start_ms"],
+                "end_ms": row["end_ms"],
+                "snippet": row["snippet"],
+                "rank": row["rank"],
+            }
+            for row in rows
+        ]
+
+    async def delete_meeting(self, job_id: str):
+        """Remove a meeting from the archive"""
+        pool = await get_db_pool()
+        await pool.execute("DELETE FROM meeting_search_entries WHERE job_id = $1", job_id)
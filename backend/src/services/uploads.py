@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Dict, Any, AsyncIterator, Mapping, Optional
+from multipart.multipart import MultipartParser, parse_options_header
+import structlog
+
+from src.core.config import get_settings
+from src.core.exceptions import (
+    ValidationException,
+    UploadTooLargeException,
+    UnsupportedAudioException
+)
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+# Bytes of file data inspected before accepting the upload
+SNIFF_BYTES = 4096
+
+# Multipart field names accepted for the recording
+FILE_FIELDS = {"audio", "file"}
+
+MAX_FORM_FIELD_BYTES = 1024
+
+FORMAT_EXTENSIONS = {
+    "wav": ".wav",
+    "aiff": ".aiff",
+    "mp3": ".mp3",
+    "aac": ".aac",
+    "ogg": ".ogg",
+    "flac": ".flac",
+    "mp4": ".mp4",
+    "webm": ".webm",
+    "amr": ".amr",
+}
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """Identify an audio/video container from its leading bytes"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"FORM" and header[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if header[:3] == b"ID3":
+        return "mp3"
+    if len(header) >= 2 and header[0] == 0xFF:
+        if header[1] & 0xF6 == 0xF0:
+            return "aac"  # ADTS
+        if header[1] & 0xE0 == 0xE0:
+            return "mp3"  # MPEG frame sync
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[4:8] == b"ftyp":
+        return "mp4"  # mp4/m4a/mov
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"  # webm/mkv
+    if header[:6] == b"#!AMR\n":
+        return "amr"
+    return None
+
+async def remove_upload(path: Optional[str]):
+    """Delete a spool file once nothing will read it (missing files are ignored)"""
+    if not path:
+        return
+    try:
+        await asyncio.to_thread(os.remove, path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.error("upload_removal_failed", path=path, error=str(e))
+
+class StreamingUploadReceiver:
+    """
+    Stream a multipart upload to a spool file with constant memory
+
+    - Rejects on Content-Length before reading when it is already too large
+    - Sniffs the first SNIFF_BYTES of the file part and rejects non-audio early
+    - Hashes and counts bytes as they arrive, aborting once MAX_FILE_SIZE_MB is passed
+    - Writes in UPLOAD_CHUNK_SIZE blocks off the event loop
+    - The caller owns the spool file once receive() returns (see remove_upload)
+    """
+
+    def __init__(self, upload_dir: str = None, max_bytes: int = None, chunk_size: int = None):
+        self.upload_dir = upload_dir or settings.UPLOAD_DIR
+        self.max_bytes = max_bytes or settings.MAX_FILE_SIZE_MB * 1024 * 1024
+        self.chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    async def receive(self, headers: Mapping[str, str], body: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """
+        Consume the request body
+
+        Args:
+            headers: Request headers
+            body: Request body stream (e.g. Request.stream())
+
+        Returns:
+            {"path", "size_bytes", "sha256", "format", "filename", "fields"}
+        """
+        content_length = headers.get("content-length")
+        if content_length and int(content_length) > self.max_bytes + 64 * 1024:
+            raise UploadTooLargeException(
+                f"Upload exceeds {settings.MAX_FILE_SIZE_MB} MB",
+                {"content_length": int(content_length)}
+            )
+
+        content_type, options = parse_options_header(headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise ValidationException("Expected a multipart/form-data upload")
+
+        state = _ParserState()
+        parser = MultipartParser(options[b"boundary"], state.callbacks())
+
+        os.makedirs(self.upload_dir, exist_ok=True)
+        upload = _SpoolFile(self.upload_dir, self.chunk_size)
+
+        try:
+            async for chunk in body:
+                parser.write(chunk)
+                await self._consume(state, upload)
+            parser.finalize()
+            await self._consume(state, upload)
+
+            if not upload.started:
+                raise ValidationException("No audio file in upload")
+            if upload.format is None:
+                await self._sniff(upload)
+
+            await upload.close()
+
+        except BaseException:
+            await upload.discard()
+            raise
+
+        logger.info(
+            "upload_spooled",
+            path=upload.path,
+            size_bytes=upload.size,
+            format=upload.format
+        )
+
+        return {
+            "path": upload.path,
+            "size_bytes": upload.size,
+            "sha256": upload.digest.hexdigest(),
+            "format": upload.format,
+            "filename": state.filename,
+            "fields": state.fields,
+        }
+
+    async def _consume(self, state: "_ParserState", upload: "_SpoolFile"):
+        """Move parsed file bytes from the parser into the spool file"""
+        if not state.file_data:
+            return
+
+        data = b"".join(state.file_data)
+        state.file_data.clear()
+
+        upload.started = True
+        upload.size += len(data)
+        if upload.size > self.max_bytes:
+            raise UploadTooLargeException(f"Upload exceeds {settings.MAX_FILE_SIZE_MB} MB")
+
+        upload.digest.update(data)
+        upload.buffer.extend(data)
+
+        if upload.format is None and len(upload.buffer) >= SNIFF_BYTES:
+            await self._sniff(upload)
+
+        if upload.format is not None:
+            await upload.flush(full_blocks_only=True)
+
+    async def _sniff(self, upload: "_SpoolFile"):
+        """Validate the leading bytes and open the spool file"""
+        upload.format = sniff_audio_format(bytes(upload.buffer[:SNIFF_BYTES]))
+        if upload.format is None:
+            raise UnsupportedAudioException("Upload is not a supported audio or video file")
+        await upload.open(FORMAT_EXTENSIONS[upload.format])
+
+class _ParserState:
+    """Multipart parser callbacks collecting the file part and small form fields"""
+
+    def __init__(self):
+        self.header_field = b""
+        self.header_value = b""
+        self.headers: Dict[bytes, bytes] = {}
+        self.part_name: Optional[str] = None
+        self.is_file = False
+        self.filename: Optional[str] = None
+        self.file_data = []
+        self.field_value = bytearray()
+        self.fields: Dict[str, str] = {}
+        self._file_seen = False
+
+    def callbacks(self) -> Dict[str, Any]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self.headers = {}
+        self.part_name = None
+        self.is_file = False
+        self.field_value = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_headers_finished(self):
+        _disposition, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        self.part_name = options.get(b"name", b"").decode("latin-1")
+        if self.part_name in FILE_FIELDS and not self._file_seen:
+            self.is_file = True
+            self._file_seen = True
+            self.filename = options.get(b"filename", b"").decode("utf-8", errors="replace") or None
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.is_file:
+            self.file_data.append(data[start:end])
+        elif self.part_name and len(self.field_value) < MAX_FORM_FIELD_BYTES:
+            self.field_value.extend(data[start:end][:MAX_FORM_FIELD_BYTES - len(self.field_value)])
+
+    def on_part_end(self):
+        if not self.is_file and self.part_name:
+            self.fields[self.part_name] = self.field_value.decode("utf-8", errors="replace")
+        self.is_file = False
+
+class _SpoolFile:
+    """Spool file written in fixed-size blocks"""
+
+    def __init__(self, upload_dir: str, chunk_size: int):
+        self.upload_dir = upload_dir
+        self.chunk_size = chunk_size
+        self.path: Optional[str] = None
+        self.file = None
+        self.buffer = bytearray()
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.format: Optional[str] = None
+        self.started = False
+
+    async def open(self, extension: str):
+        self.path = os.path.join(self.upload_dir, f"{uuid.uuid4()}{extension}")
+        self.file = await asyncio.to_thread(open, self.path, "wb")
+
+    async def flush(self, full_blocks_only: bool = False):
+        while len(self.buffer) >= self.chunk_size or (self.buffer and not full_blocks_only):
+            block = bytes(self.buffer[:self.chunk_size])
+            del self.buffer[:self.chunk_size]
+            await asyncio.to_thread(self.file.write, block)
+
+    async def close(self):
+        await self.flush()
+        await asyncio.to_thread(self.file.close)
+
+    async def discard(self):
+        if self.file is not None:
+            await asyncio.to_thread(self.file.close)
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,107 @@
+from typing import Any, Dict, Optional
+import structlog
+
+from src.core.database import get_db_pool
+
+logger = structlog.get_logger()
+
+# ON CONFLICT (github_id) needs a unique index; harmless if one already exists
+SCHEMA = """
+CREATE UNIQUE INDEX IF NOT EXISTS users_github_id_key ON users (github_id);
+"""
+
+USER_COLUMNS = """
+id, username, name, email, avatar_url, subscription_tier,
+meetings_processed, created_at, last_login
+"""
+
+# New users start on the free tier; returning users keep tier and usage
+UPSERT_GITHUB_USER = f"""
+INSERT INTO users (
+    github_id, username, name, email, avatar_url, github_access_token,
+    last_login, created_at, subscription_tier, meetings_processed
+)
+VALUES ($1, $2, $3, $4, $5, $6, now(), now(), 'free', 0)
+ON CONFLICT (github_id) DO UPDATE SET
+    username = EXCLUDED.username,
+    name = EXCLUDED.name,
+    email = EXCLUDED.email,
+    avatar_url = EXCLUDED.avatar_url,
+    github_access_token = EXCLUDED.github_access_token,
+    last_login = EXCLUDED.last_login
+RETURNING {USER_COLUMNS}
+"""
+
+GET_USER = f"SELECT {USER_COLUMNS} FROM users WHERE id = $1"
+
+GET_SUBSCRIPTION = "SELECT subscription_tier, meetings_processed FROM users WHERE id = $1"
+
+class UserRepository:
+    """
+    Async access to the users table over the shared asyncpg pool
+
+    - Queries are fixed strings, so asyncpg's per-connection statement
+      cache prepares each once and reuses it (DATABASE_URL must not go
+      through a transaction-mode pooler, which breaks prepared statements)
+    - Sign-in is one upsert on github_id instead of select-then-write
+    - users.id is a uuid (Supabase default); rows come back as dicts with
+      the id as a string
+    - ensure_schema() is run once at API startup, never per request
+    """
+
+    def __init__(self):
+        self._schema_ready = False
+
+    async def ensure_schema(self):
+        """Create the github_id unique index if missing (called from the API lifespan)"""
+        if self._schema_ready:
+            return
+
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(SCHEMA)
+        self._schema_ready = True
+
+    async def upsert_github_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create or update a user from their GitHub profile
+
+        Args:
+            user_data: github_id, username, name, email, avatar_url,
+                github_access_token
+
+        Returns:
+            The stored user
+        """
+        pool = await get_db_pool()
+        row = await pool.fetchrow(
+            UPSERT_GITHUB_USER,
+            user_data["github_id"],
+            user_data["username"],
+            user_data.get("name") or "",
+            user_data["email"],
+            user_data.get("avatar_url") or "",
+            user_data["github_access_token"]
+        )
+        return self._to_dict(row)
+
+    async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user by ID (None if missing)"""
+        pool = await get_db_pool()
+        row = await pool.fetchrow(GET_USER, user_id)
+        return self._to_dict(row) if row else None
+
+    async def get_subscription(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user's tier and usage (None if missing)"""
+        pool = await get_db_pool()
+        row = await pool.fetchrow(GET_SUBSCRIPTION, user_id)
+        return dict(row) if row else None
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        user = dict(row)
+        user["id"] = str(user["id"])
+        for field in ("created_at", "last_login"):
+            if user.get(field) is not None:
+                user[field] = user[field].isoformat()
+        return user
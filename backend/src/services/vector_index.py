@@ -0,0 +1,354 @@
+import asyncio
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+import numpy as np
+import redis.asyncio as redis
+from redis.exceptions import LockError
+import structlog
+
+from src.core.config import get_settings
+from src.processing.embeddings import Embedder, create_embedder
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+VECTORS_FILE = "vectors.i8"    # int8 rows, `dim` bytes each
+SCALES_FILE = "scales.f16"     # float16 dequantization scale per row
+META_FILE = "meta.jsonl"       # one JSON object per row; its line count is the row count
+IVF_FILE = "ivf.npz"           # k-means centroids and the row count they were trained on
+ASSIGN_FILE = "ivf_assign.i32" # centroid of every row, appended as rows are added
+
+SEARCH_BLOCK_ROWS = 65536
+KMEANS_ITERATIONS = 10
+
+def quantize(vectors: np.ndarray):
+    """Symmetric per-row int8 quantization -> (int8 rows, float16 scales)"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float16)
+
+class UserVectorIndex:
+    """
+    Append-only vector index of one user's meeting segments
+
+    - Vectors stored as int8 with a float16 scale per row (~4x smaller than float32)
+    - Exact, vectorized brute-force scan below `ivf_min_rows`
+    - IVF (spherical k-means lists, `nprobe` lists searched) above it,
+      retrained when the index has doubled since the last training
+    - Rows are appended as meetings complete; files are written before
+      the metadata line, so readers never see a row without its vector
+    """
+
+    def __init__(self, path: str, dim: int, ivf_min_rows: int = 20000, nprobe: int = 8):
+        self.path = path
+        self.dim = dim
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+
+        self.meta: List[Dict[str, Any]] = []
+        self.vectors: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_rows = 0
+        self.loaded_meta_size = 0
+        self._list_order: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.meta)
+
+    def meta_size(self) -> int:
+        """Byte size of the metadata file; changes whenever rows are added"""
+        try:
+            return os.path.getsize(self._file(META_FILE))
+        except FileNotFoundError:
+            return 0
+
+    def load(self) -> "UserVectorIndex":
+        """Load metadata and memory-map vectors"""
+        self.loaded_meta_size = self.meta_size()
+        self.meta = []
+        try:
+            with open(self._file(META_FILE)) as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        self.meta.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+        n = self.size
+        if n:
+            self.vectors = np.memmap(self._file(VECTORS_FILE), dtype=np.int8, mode="r").reshape(-1, self.dim)[:n]
+            self.scales = np.fromfile(self._file(SCALES_FILE), dtype=np.float16)[:n].astype(np.float32)
+
+        self.centroids = None
+        if os.path.exists(self._file(IVF_FILE)):
+            ivf = np.load(self._file(IVF_FILE))
+            self.centroids = ivf["centroids"]
+            self.trained_rows = int(ivf["trained_rows"])
+
+            assign = np.fromfile(self._file(ASSIGN_FILE), dtype=np.int32)[:n]
+            self._list_order = np.argsort(assign, kind="stable")
+            self._list_offsets = np.searchsorted(assign[self._list_order], np.arange(len(self.centroids) + 1))
+
+        return self
+
+    def job_ids(self) -> set:
+        return {row["job_id"] for row in self.meta}
+
+    def add(self, vectors: np.ndarray, metadata: List[Dict[str, Any]]):
+        """
+        Append rows; the caller must hold the user's write lock
+
+        Args:
+            vectors: L2-normalized float32 array, one row per metadata entry
+            metadata: Row payloads (job_id, text, timestamps, ...)
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self.load()
+        self._truncate_to(self.size)
+
+        quantized, scales = quantize(vectors)
+        with open(self._file(VECTORS_FILE), "ab") as f:
+            f.write(quantized.tobytes())
+        with open(self._file(SCALES_FILE), "ab") as f:
+            f.write(scales.tobytes())
+
+        if self.centroids is not None:
+            assign = self._assign(vectors)
+            with open(self._file(ASSIGN_FILE), "ab") as f:
+                f.write(assign.tobytes())
+
+        # Metadata last: this is what makes the rows visible
+        with open(self._file(META_FILE), "a") as f:
+            f.write("".join(json.dumps(row) + "\n" for row in metadata))
+
+        self.load()
+        if self.size >= self.ivf_min_rows and self.size >= 2 * self.trained_rows:
+            self._train_ivf()
+            self.load()
+
+    def search(self, query: np.ndarray, limit: int = 10) -> List[Dict[str, Any]]:
+        """Top `limit` rows by cosine similarity to a normalized query vector"""
+        if not self.size:
+            return []
+
+        if self.centroids is None:
+            candidates = None
+            scores = self._score_rows(query, np.arange(self.size))
+        else:
+            nprobe = min(self.nprobe, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.concatenate([
+                self._list_order[self._list_offsets[c]:self._list_offsets[c + 1]] for c in probe
+            ])
+            if not len(candidates):
+                return []
+            scores = self._score_rows(query, candidates)
+
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            row = int(candidates[i]) if candidates is not None else int(i)
+            results.append({**self.meta[row], "score": round(float(scores[i]), 4)})
+        return results
+
+    def _score_rows(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), SEARCH_BLOCK_ROWS):
+            block = rows[start:start + SEARCH_BLOCK_ROWS]
+            scores[start:start + len(block)] = (self.vectors[block].astype(np.float32) @ query) * self.scales[block]
+        return scores
+
+    def _dequantized(self, rows: np.ndarray) -> np.ndarray:
+        return self.vectors[rows].astype(np.float32) * self.scales[rows][:, None]
+
+    def _train_ivf(self):
+        """Spherical k-means over a sample, then assign every row"""
+        n = self.size
+        nlist = int(min(1024, max(16, np.sqrt(n))))
+        rng = np.random.default_rng(0)
+
+        sample_rows = np.sort(rng.choice(n, size=min(n, 64 * nlist), replace=False))
+        sample = self._dequantized(sample_rows)
+        sample /= np.maximum(np.linalg.norm(sample, axis=1, keepdims=True), 1e-12)
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            nonempty = norms > 0  # Empty lists keep their previous centroid
+            centroids[nonempty] = sums[nonempty] / norms[nonempty, None]
+
+        self.centroids = centroids
+        assign = np.concatenate([
+            self._assign(self._dequantized(np.arange(start, min(start + SEARCH_BLOCK_ROWS, n))))
+            for start in range(0, n, SEARCH_BLOCK_ROWS)
+        ])
+
+        # Replace both files atomically; rows appended later get assigned in add()
+        tmp_assign = self._file(ASSIGN_FILE) + ".tmp"
+        assign.tofile(tmp_assign)
+        tmp_ivf = self._file("ivf.tmp.npz")
+        np.savez(tmp_ivf, centroids=centroids, trained_rows=np.int64(n))
+        os.replace(tmp_assign, self._file(ASSIGN_FILE))
+        os.replace(tmp_ivf, self._file(IVF_FILE))
+
+        logger.info("vector_index_trained", path=self.path, rows=n, lists=nlist)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _truncate_to(self, rows: int):
+        """Drop vectors left behind by a writer that died before its metadata line"""
+        for name, row_bytes in ((VECTORS_FILE, self.dim), (SCALES_FILE, 2), (ASSIGN_FILE, 4)):
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) > rows * row_bytes:
+                os.truncate(path, rows * row_bytes)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+class MeetingVectorIndex:
+    """
+    Semantic search over meeting segments, one index per user
+
+    - Segments are merged into windows of ~VECTOR_WINDOW_WORDS words
+      before embedding, so short turns still carry context
+    - Embedding runs locally through a pluggable Embedder
+    - Writers serialize per user through a Redis lock; index files live
+      under VECTOR_INDEX_DIR, which must be shared by API and workers
+    """
+
+    def __init__(self, redis_client: redis.Redis, embedder: Embedder = None):
+        self.redis = redis_client
+        self._embedder = embedder
+        self._readers: "OrderedDict[str, UserVectorIndex]" = OrderedDict()
+
+    @property
+    def embedder(self) -> Embedder:
+        # Created lazily: transformer backends load a model on construction
+        if self._embedder is None:
+            self._embedder = create_embedder(
+                settings.EMBEDDING_BACKEND,
+                model_name=settings.EMBEDDING_MODEL,
+                dim=settings.EMBEDDING_DIM
+            )
+        return self._embedder
+
+    async def index_meeting(
+        self,
+        job_id: str,
+        user_id: str,
+        meeting_title: str,
+        segments: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Embed a meeting's segments into its owner's index
+
+        Returns:
+            Number of windows added (0 if the meeting was already indexed)
+        """
+        windows = self._windows(segments)
+        if not windows:
+            return 0
+
+        vectors = await asyncio.to_thread(self.embedder.embed, [w["text"] for w in windows])
+        metadata = [{"job_id": job_id, "meeting_title": meeting_title, **w} for w in windows]
+
+        lock = self.redis.lock(f"vectors:lock:{user_id}", timeout=300, blocking_timeout=60)
+        if not await lock.acquire():
+            raise TimeoutError(f"Vector index of user {user_id} is locked")
+
+        try:
+            index = self._index(user_id)
+            added = await asyncio.to_thread(self._add_if_new, index, job_id, vectors, metadata)
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                pass  # Lock already expired
+
+        logger.info("meeting_vectors_indexed", job_id=job_id, windows=added)
+        return added
+
+    async def search(self, user_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Segments most similar in meaning to the query"""
+        vector = (await asyncio.to_thread(self.embedder.embed, [query]))[0]
+        index = await asyncio.to_thread(self._reader, user_id)
+        return await asyncio.to_thread(index.search, vector, limit)
+
+    @staticmethod
+    def _add_if_new(index: UserVectorIndex, job_id: str, vectors: np.ndarray, metadata: List[Dict[str, Any]]) -> int:
+        # Retried jobs must not duplicate rows
+        if job_id in index.load().job_ids():
+            return 0
+        index.add(vectors, metadata)
+        return len(metadata)
+
+    def _reader(self, user_id: str) -> UserVectorIndex:
+        """Loaded index for queries, reloaded only when rows were added"""
+        index = self._readers.get(user_id)
+        if index is None or index.meta_size() != index.loaded_meta_size:
+            index = self._index(user_id).load()
+            self._readers[user_id] = index
+
+        self._readers.move_to_end(user_id)
+        while len(self._readers) > settings.VECTOR_INDEX_CACHED_USERS:
+            self._readers.popitem(last=False)
+        return index
+
+    def _index(self, user_id: str) -> UserVectorIndex:
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", user_id):
+            raise ValueError(f"Invalid user id: {user_id}")
+
+        # Vectors from different embedders are not comparable, so each gets its own tree
+        backend = re.sub(r"[^A-Za-z0-9_-]+", "_", self.embedder.name)
+        return UserVectorIndex(
+            os.path.join(settings.VECTOR_INDEX_DIR, f"{backend}-{self.embedder.dim}", user_id),
+            self.embedder.dim,
+            ivf_min_rows=settings.VECTOR_IVF_MIN_ROWS,
+            nprobe=settings.VECTOR_IVF_NPROBE
+        )
+
+    @staticmethod
+    def _windows(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge consecutive segments into windows of about VECTOR_WINDOW_WORDS words"""
+        windows = []
+        current = None
+
+        for seg in segments:
+            text = (seg.get("text") or "").strip()
+            if not text:
+                continue
+
+            if current is None:
+                current = {
+                    "speaker": seg.get("speaker"),
+                    "start_ms": round(seg.get("start", 0) * 1000),
+                    "end_ms": round(seg.get("end", 0) * 1000),
+                    "text": text,
+                }
+            else:
+                current["text"] += " " + text
+                current["end_ms"] = round(seg.get("end", 0) * 1000)
+                if current["speaker"] != seg.get("speaker"):
+                    current["speaker"] = None  # Mixed speakers
+
+            if len(current["text"].split()) >= settings.VECTOR_WINDOW_WORDS:
+                windows.append(current)
+                current = None
+
+        if current:
+            windows.append(current)
+        return windows
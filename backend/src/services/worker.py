@@ -0,0 +1,197 @@
+import asyncio
+import os
+import signal
+import socket
+import time
+from typing import Dict, Any
+import redis.asyncio as redis
+import structlog
+
+from src.services.async_processor import AsyncMeetingProcessor
+from src.core.config import get_settings
+from src.core.database import close_db_pool
+from src.core.http import http_clients
+from src.core.logging import setup_logging
+from src.monitoring.tracing import setup_tracing, shutdown_tracing
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+class MeetingWorker:
+    """
+    Worker pool consuming the meeting job stream
+
+    - Runs outside the API process (python -m src.services.worker)
+    - Processes at most `concurrency` jobs at once (ASYNC_WORKER_COUNT)
+    - Takes jobs by tier/size lane priority and per-user fair share (see JobQueue)
+    - Heartbeats in-flight entries and re-claims entries of dead workers
+    - Stops in-flight jobs cancelled from any API process
+    - Scale throughput by starting more worker processes
+    """
+
+    def __init__(self, redis_client: redis.Redis, concurrency: int = None, consumer_name: str = None):
+        self.redis = redis_client
+        self.processor = AsyncMeetingProcessor(redis_client)
+        self.queue = self.processor.queue
+        self.concurrency = concurrency or settings.ASYNC_WORKER_COUNT
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.in_flight: Dict[str, Dict[str, Any]] = {}  # entry_id -> entry
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        """Run worker slots until stop() is called"""
+        await self.queue.ensure_group()
+
+        # Workers write the search index, and may start before the API
+        try:
+            await self.processor.search_index.ensure_schema()
+        except Exception as e:
+            logger.error("search_schema_setup_failed", error=str(e))
+
+        logger.info(
+            "meeting_worker_started",
+            consumer=self.consumer_name,
+            concurrency=self.concurrency
+        )
+
+        slots = [asyncio.create_task(self._slot_loop(slot)) for slot in range(self.concurrency)]
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        cancellations = asyncio.create_task(self.processor.listen_for_cancellations())
+        maintenance = asyncio.create_task(self._maintenance_loop())
+
+        await self._stopping.wait()
+
+        # Let in-flight jobs finish; unacked entries are re-claimed otherwise
+        await asyncio.gather(*slots, return_exceptions=True)
+        heartbeat.cancel()
+        cancellations.cancel()
+        maintenance.cancel()
+
+        logger.info("meeting_worker_stopped", consumer=self.consumer_name)
+
+    def stop(self):
+        """Stop taking new jobs"""
+        self._stopping.set()
+
+    async def _slot_loop(self, slot: int):
+        """Take one job at a time until stopped"""
+        last_claim = 0.0
+
+        while not self._stopping.is_set():
+            try:
+                entries = []
+
+                if time.monotonic() - last_claim >= settings.JOB_CLAIM_INTERVAL_SECONDS:
+                    last_claim = time.monotonic()
+                    entries, dead = await self.queue.claim_stale(self.consumer_name, count=1)
+                    for entry in dead:
+                        await self.queue.release_user_slot(entry)
+                        await self.processor.fail_job(
+                            entry["job_id"],
+                            f"Job abandoned after {entry['deliveries'] - 1} delivery attempts"
+                        )
+
+                if not entries:
+                    entries = await self.queue.read(self.consumer_name)
+
+                for entry in entries:
+                    if not await self._handle_entry(entry):
+                        # Owner is at their limit; don't spin on their other entries
+                        await asyncio.sleep(settings.JOB_DEFER_BACKOFF_SECONDS)
+
+            except Exception as e:
+                logger.error("worker_slot_error", slot=slot, error=str(e))
+                await asyncio.sleep(1)
+
+    async def _handle_entry(self, entry: Dict[str, Any]) -> bool:
+        """
+        Process one stream entry and acknowledge it
+
+        Returns:
+            False if the entry was deferred because its owner is at their
+            concurrent job limit
+        """
+        entry_id = entry["entry_id"]
+        job_id = entry["job_id"]
+
+        if not await self.queue.acquire_user_slot(entry):
+            await self.queue.defer(entry)
+            logger.info("job_deferred_fair_share", job_id=job_id, user_id=entry["user_id"])
+            return False
+
+        self.in_flight[entry_id] = entry
+        try:
+            await self.processor.run_job(job_id, **entry["payload"])
+            await self.queue.ack(entry)
+        finally:
+            self.in_flight.pop(entry_id, None)
+            await self.queue.release_user_slot(entry)
+
+        return True
+
+    async def _heartbeat_loop(self):
+        """Keep in-flight entries from looking stale to other workers"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                await self.queue.heartbeat(self.consumer_name, list(self.in_flight.values()))
+            except Exception as e:
+                logger.error("worker_heartbeat_failed", error=str(e))
+
+    async def _maintenance_loop(self):
+        """Periodic housekeeping, run by whichever worker claims it first"""
+        while True:
+            await asyncio.sleep(settings.WORKER_MAINTENANCE_INTERVAL_SECONDS)
+            try:
+                # SET NX with a TTL makes each task run once per period fleet-wide
+                if await self.redis.set(
+                    "maintenance:result_dictionary", self.consumer_name,
+                    nx=True, ex=settings.RESULT_DICT_RETRAIN_SECONDS
+                ):
+                    await self.processor.retrain_result_dictionary()
+                
+                if await self.redis.set(
+                    "maintenance:result_migration", self.consumer_name,
+                    nx=True, ex=settings.WORKER_MAINTENANCE_INTERVAL_SECONDS
+                ):
+                    # Keep going while full batches come back
+                    while await self.processor.migrate_cold_results() >= 100:
+                        pass
+                
+                if await self.redis.set(
+                    "maintenance:job_cleanup", self.consumer_name,
+                    nx=True, ex=settings.JOB_CLEANUP_INTERVAL_SECONDS
+                ):
+                    await self.processor.cleanup_old_jobs()
+                
+                if await self.redis.set(
+                    "maintenance:result_purge", self.consumer_name,
+                    nx=True, ex=settings.JOB_CLEANUP_INTERVAL_SECONDS
+                ):
+                    while await self.processor.purge_expired_results() >= 100:
+                        pass
+            except Exception as e:
+                logger.error("worker_maintenance_failed", error=str(e))
+
+async def main():
+    """Worker process entrypoint"""
+    setup_logging(settings.LOG_LEVEL)
+    setup_tracing("meetinggpt-worker")
+
+    redis_client = redis.from_url(settings.REDIS_URL)
+    worker = MeetingWorker(redis_client)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await http_clients.aclose()
+        await close_db_pool()
+        await redis_client.close()
+        shutdown_tracing()
+
+if __name__ == "__main__":
+    asyncio.run(main())
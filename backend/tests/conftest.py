@@ -0,0 +1,29 @@
+import os
+
+# Required settings; tests never reach the services behind them
+for name in (
+    "ANTHROPIC_API_KEY", "OPENAI_API_KEY", "STRIPE_SECRET_KEY", "STRIPE_PRICE_ID",
+    "GITHUB_CLIENT_ID", "GITHUB_CLIENT_SECRET", "JWT_SECRET",
+):
+    os.environ.setdefault(name, "test")
+
+from fakeredis import aioredis as fakeredis
+import pytest
+
+from src.services.blob_store import FilesystemBlobStore
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def redis_client():
+    """In-memory Redis (with Lua scripting) private to the test"""
+    # RESP2, like the pinned redis client (newer clients default to RESP3)
+    client = fakeredis.FakeRedis(protocol=2)
+    yield client
+    await client.aclose()
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return FilesystemBlobStore(str(tmp_path / "blobs"))
@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+from src.services.async_processor import (
+    AsyncMeetingProcessor,
+    JOB_TTL_SECONDS,
+    JOBS_INDEX,
+    USER_JOBS_INDEX,
+    ProcessingStage,
+)
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def processor(redis_client):
+    return AsyncMeetingProcessor(redis_client)
+
+@pytest.fixture
+def create_job(processor, tmp_path):
+    """Queue a job for an uploaded (not actually decodable) recording"""
+    count = 0
+
+    async def create(user_id: str = "user-1") -> str:
+        nonlocal count
+        count += 1
+        path = tmp_path / f"upload-{count}.wav"
+        path.write_bytes(b"RIFF\x00\x00\x00\x00WAVE")
+        return await processor.start_processing(str(path), audio_hash=f"hash-{count}", user_id=user_id, tier="free")
+
+    return create
+
+async def set_started(redis_client, job_id: str, score: int, user_id: str = "user-1"):
+    """Move a job to a given index position (epoch ms)"""
+    await redis_client.zadd(JOBS_INDEX, {job_id: score})
+    await redis_client.zadd(USER_JOBS_INDEX.format(user_id=user_id), {job_id: score})
+
+async def list_all(processor, **kwargs):
+    """Job IDs of every page, and the number of pages"""
+    job_ids, pages, cursor = [], 0, None
+    while True:
+        page = await processor.list_jobs(cursor=cursor, **kwargs)
+        job_ids.extend(job["job_id"] for job in page["jobs"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            return job_ids, pages
+
+async def test_list_jobs_pages_newest_first(processor, redis_client, create_job):
+    now = int(time.time() * 1000)
+    job_ids = [await create_job() for _ in range(5)]
+    for offset, job_id in enumerate(job_ids):
+        await set_started(redis_client, job_id, now - 1000 * (5 - offset))
+
+    first = await processor.list_jobs(user_id="user-1", limit=2)
+    assert [job["job_id"] for job in first["jobs"]] == job_ids[:2:-1]
+    assert first["next_cursor"]
+
+    assert await list_all(processor, user_id="user-1", limit=2) == (job_ids[::-1], 3)
+
+async def test_list_jobs_pages_through_ties(processor, redis_client, create_job):
+    now = int(time.time() * 1000)
+    job_ids = [await create_job() for _ in range(3)]
+    for job_id in job_ids:
+        await set_started(redis_client, job_id, now)
+
+    listed, pages = await list_all(processor, user_id="user-1", limit=1)
+
+    assert listed == sorted(job_ids, reverse=True)
+    assert pages == 3
+
+async def test_list_jobs_by_user(processor, create_job):
+    mine = await create_job("user-1")
+    theirs = await create_job("user-2")
+
+    assert await list_all(processor, user_id="user-1") == ([mine], 1)
+    assert sorted((await list_all(processor))[0]) == sorted([mine, theirs])
+
+async def test_list_jobs_leaves_expired_entries_for_cleanup(processor, redis_client, create_job):
+    live = await create_job()
+    expired = await create_job()
+    await set_started(redis_client, expired, int(time.time() * 1000) - (JOB_TTL_SECONDS + 60) * 1000)
+    missing = await create_job()
+    await redis_client.delete(f"job:{missing}")
+
+    assert (await list_all(processor))[0] == [live]
+    assert (await list_all(processor, user_id="user-1"))[0] == [live]
+
+    # cleanup_old_jobs deletes results through JOBS_INDEX, so only the per-user index is pruned
+    assert await redis_client.zcard(JOBS_INDEX) == 3
+    assert await redis_client.zrange(USER_JOBS_INDEX.format(user_id="user-1"), 0, -1) == [live.encode()]
+
+async def test_cancel_queued_job(processor, create_job):
+    job_id = await create_job()
+
+    assert await processor.cancel_job(job_id)
+
+    status = await processor.get_job_status(job_id)
+    assert status["stage"] == "failed"
+    assert status["error"] == "Job cancelled by user"
+
+async def test_cancel_is_a_guarded_terminal_write(processor, create_job):
+    job_id = await create_job()
+    await processor.cancel_job(job_id)
+
+    # Neither a second cancel nor a late pipeline update overwrites it
+    assert not await processor.cancel_job(job_id)
+    assert not await processor._update_stage(job_id, ProcessingStage.ANALYZING, 60)
+    assert (await processor.get_job_status(job_id))["stage"] == "failed"
+
+async def test_cancel_completed_job(processor, create_job):
+    job_id = await create_job()
+    assert await processor._update_stage(job_id, ProcessingStage.COMPLETED, 100)
+
+    assert not await processor.cancel_job(job_id)
+
+    status = await processor.get_job_status(job_id)
+    assert status["stage"] == "completed"
+    assert status["error"] is None
+
+async def test_cancel_missing_job(processor, redis_client):
+    assert not await processor.cancel_job("missing")
+    assert not await redis_client.exists("job:missing")
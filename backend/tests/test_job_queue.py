@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from src.services import job_queue
+from src.services.job_queue import JobQueue
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def queue(redis_client):
+    return JobQueue(redis_client, stream="test_jobs", group="test_workers")
+
+async def test_read_returns_enqueued_entry(queue):
+    await queue.enqueue("job-1", {"audio_path": "/tmp/a.wav"}, user_id="user-1", tier="pro", estimated_seconds=60)
+
+    [entry] = await queue.read("worker-1", block_ms=1)
+
+    assert entry["job_id"] == "job-1"
+    assert entry["payload"] == {"audio_path": "/tmp/a.wav"}
+    assert entry["user_id"] == "user-1"
+    assert entry["tier"] == "pro"
+    assert entry["stream"] == queue.lane("pro", 0)
+    assert entry["deliveries"] == 1
+
+async def test_read_empty_queue(queue):
+    assert await queue.read("worker-1", block_ms=1) == []
+
+async def test_read_delivers_each_entry_once(queue):
+    await queue.enqueue("job-1", {}, tier="free")
+
+    assert len(await queue.read("worker-1", block_ms=1)) == 1
+    assert await queue.read("worker-2", block_ms=1) == []
+
+async def test_ack_drops_entry(queue, redis_client):
+    await queue.enqueue("job-1", {}, tier="free")
+    [entry] = await queue.read("worker-1", block_ms=1)
+
+    await queue.ack(entry)
+
+    assert await redis_client.xlen(entry["stream"]) == 0
+    assert (await queue.depth())["in_flight"] == 0
+
+async def test_defer_moves_entry_to_back_of_lane(queue):
+    for job_id in ("job-1", "job-2"):
+        await queue.enqueue(job_id, {}, user_id="user-1", tier="free", estimated_seconds=60)
+
+    [first] = await queue.read("worker-1", block_ms=1)
+    await queue.defer(first)
+
+    assert [entry["job_id"] for entry in await queue.read("worker-1", block_ms=1)] == ["job-2"]
+    assert [entry["job_id"] for entry in await queue.read("worker-1", block_ms=1)] == ["job-1"]
+
+async def test_claim_stale_takes_over_idle_entry(queue, monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "JOB_CLAIM_IDLE_MS", 0)
+    await queue.enqueue("job-1", {}, tier="free")
+    await queue.read("worker-1", block_ms=1)
+
+    claimed, dead = await queue.claim_stale("worker-2")
+
+    assert [entry["job_id"] for entry in claimed] == ["job-1"]
+    assert claimed[0]["deliveries"] == 2
+    assert dead == []
+
+async def test_claim_stale_ignores_busy_entries(queue, monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "JOB_CLAIM_IDLE_MS", 60000)
+    await queue.enqueue("job-1", {}, tier="free")
+    await queue.read("worker-1", block_ms=1)
+
+    assert await queue.claim_stale("worker-2") == ([], [])
+
+async def test_claim_stale_dead_letters_after_max_deliveries(queue, redis_client, monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "JOB_CLAIM_IDLE_MS", 0)
+    monkeypatch.setattr(job_queue.settings, "JOB_MAX_DELIVERIES", 1)
+    await queue.enqueue("job-1", {}, tier="free")
+    [entry] = await queue.read("worker-1", block_ms=1)
+
+    claimed, dead = await queue.claim_stale("worker-2")
+
+    assert claimed == []
+    assert [entry["job_id"] for entry in dead] == ["job-1"]
+    assert await redis_client.xlen(queue.dead_letter_stream) == 1
+    assert await redis_client.xlen(entry["stream"]) == 0
+
+async def test_pro_lanes_are_read_first(queue):
+    await queue.enqueue("free-job", {}, tier="free", estimated_seconds=60)
+    await queue.enqueue("pro-job", {}, tier="pro", estimated_seconds=60)
+
+    [entry] = await queue.read("worker-1", block_ms=1)
+    assert entry["job_id"] == "pro-job"
+
+async def test_lane_order_is_weighted_round_robin(queue):
+    firsts = [queue._lane_order()[0] for _ in range(sum(queue.lanes.values()))]
+
+    for lane, weight in queue.lanes.items():
+        assert firsts.count(lane) == weight
+
+def slot_entry(job_id, user_id="user-1", tier="free"):
+    return {"job_id": job_id, "user_id": user_id, "tier": tier}
+
+async def test_user_slot_limit(queue):
+    assert await queue.acquire_user_slot(slot_entry("job-1"))
+    assert not await queue.acquire_user_slot(slot_entry("job-2"))
+    assert await queue.acquire_user_slot(slot_entry("job-1"))  # Renewal by the holder
+
+    await queue.release_user_slot(slot_entry("job-1"))
+    assert await queue.acquire_user_slot(slot_entry("job-2"))
+
+async def test_user_slot_limit_by_tier(queue):
+    granted = [await queue.acquire_user_slot(slot_entry(f"job-{i}", tier="pro")) for i in range(4)]
+    assert granted == [True, True, True, False]
+
+async def test_user_slots_are_per_user(queue):
+    assert await queue.acquire_user_slot(slot_entry("job-1", user_id="user-1"))
+    assert await queue.acquire_user_slot(slot_entry("job-2", user_id="user-2"))
+
+async def test_anonymous_jobs_have_no_slot_limit(queue):
+    assert all([await queue.acquire_user_slot(slot_entry(f"job-{i}", user_id=None)) for i in range(3)])
+
+async def test_user_slot_lease_lapses(queue, monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "JOB_CLAIM_IDLE_MS", 20)
+    assert await queue.acquire_user_slot(slot_entry("job-1"))
+
+    await asyncio.sleep(0.05)
+
+    assert await queue.acquire_user_slot(slot_entry("job-2"))
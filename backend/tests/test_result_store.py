@@ -0,0 +1,167 @@
+import json
+import time
+
+import pytest
+
+from src.services import result_store
+from src.services.result_store import (
+    BLOB_KEY,
+    COLD_INDEX,
+    HOT_INDEX,
+    RESULT_TTL_SECONDS,
+    ResultCodec,
+    ResultStore,
+)
+
+pytestmark = pytest.mark.anyio
+
+RESULT = {
+    "transcript": "Hello there. Let's ship it.",
+    "segments": [
+        {"id": 0, "start": 0.0, "end": 1.5, "text": "Hello there.", "speaker": "Speaker 1",
+         "avg_logprob": -0.25, "no_speech_prob": 0.0625},
+        {"id": 1, "start": 1.5, "end": 3.25, "text": "Let's ship it.", "speaker": "Speaker 2",
+         "avg_logprob": -0.5, "no_speech_prob": 0.125},
+    ],
+    "analysis": {"summary": "Agreed to ship.", "action_items": [{"task": "Ship", "owner": "Ana"}]},
+    "processed_at": "2024-06-01T12:00:00",
+    "processing_time": 42.5,
+}
+
+def test_codec_round_trip():
+    codec = ResultCodec()
+    assert codec.decode(codec.encode(RESULT)) == RESULT
+
+def test_codec_round_trip_sparse_segments():
+    result = {
+        **RESULT,
+        "segments": [
+            {"start": 0.0, "end": 1.5, "text": "No id, speaker or scores."},
+            {"id": 7, "start": 1.5, "end": 2.0, "text": "Only one score.", "avg_logprob": -0.5},
+            {"id": 8, "start": 2.0, "end": 2.5, "text": "Complete.", "speaker": "Speaker 1",
+             "avg_logprob": -0.25, "no_speech_prob": 0.0},
+        ],
+    }
+    codec = ResultCodec()
+    assert codec.decode(codec.encode(result))["segments"] == result["segments"]
+
+def test_codec_drops_unused_whisper_fields():
+    result = {**RESULT, "segments": [{**RESULT["segments"][0], "tokens": [1, 2, 3], "seek": 0}]}
+    codec = ResultCodec()
+    assert codec.decode(codec.encode(result))["segments"] == RESULT["segments"][:1]
+
+async def test_put_get_all_parts(redis_client, blob_store):
+    store = ResultStore(redis_client, blob_store)
+    await store.put("job-1", RESULT)
+
+    assert await store.get("job-1") == RESULT
+
+async def test_get_requested_parts_only(redis_client, blob_store):
+    store = ResultStore(redis_client, blob_store)
+    await store.put("job-1", RESULT)
+
+    analysis = await store.get("job-1", ["analysis"])
+    assert analysis == {
+        "analysis": RESULT["analysis"],
+        "processed_at": RESULT["processed_at"],
+        "processing_time": RESULT["processing_time"],
+    }
+
+    segments = await store.get("job-1", ["segments"])
+    assert segments["segments"] == RESULT["segments"]
+    assert "transcript" not in segments and "analysis" not in segments
+
+async def test_get_missing_result(redis_client, blob_store):
+    store = ResultStore(redis_client, blob_store)
+    assert await store.get("missing") is None
+
+async def test_get_legacy_json_result(redis_client, blob_store):
+    await redis_client.set("result:job-1", json.dumps(RESULT))
+    store = ResultStore(redis_client, blob_store)
+
+    assert await store.get("job-1") == RESULT
+    assert await store.get("job-1", ["transcript"]) == {
+        "transcript": RESULT["transcript"],
+        "processed_at": RESULT["processed_at"],
+        "processing_time": RESULT["processing_time"],
+    }
+
+@pytest.fixture
+def no_hot_window(monkeypatch):
+    """Every stored result is past its hot window"""
+    monkeypatch.setattr(result_store.settings, "RESULT_HOT_SECONDS", -1)
+
+async def test_migrate_cold_moves_data_to_blob_store(redis_client, blob_store, no_hot_window):
+    store = ResultStore(redis_client, blob_store)
+    await store.put("job-1", RESULT)
+
+    assert await store.migrate_cold() == 1
+
+    assert await redis_client.hgetall("result:job-1") == {b"location": BLOB_KEY.format(job_id="job-1").encode()}
+    assert 0 < await redis_client.ttl("result:job-1") <= RESULT_TTL_SECONDS
+    assert await blob_store.get(BLOB_KEY.format(job_id="job-1")) is not None
+    assert await redis_client.zscore(HOT_INDEX, "job-1") is None
+    assert await redis_client.zscore(COLD_INDEX, "job-1") > time.time()
+
+async def test_get_promotes_cold_result(redis_client, blob_store, no_hot_window):
+    store = ResultStore(redis_client, blob_store)
+    await store.put("job-1", RESULT)
+    await store.migrate_cold()
+
+    assert await store.get("job-1") == RESULT
+    assert await redis_client.hexists("result:job-1", "v")
+    assert await redis_client.zscore(HOT_INDEX, "job-1") is not None
+
+    # Promoted results already have a blob; migrating again only drops the data from Redis
+    await blob_store.delete(BLOB_KEY.format(job_id="job-1"))
+    await blob_store.put(BLOB_KEY.format(job_id="job-1"), b"kept")
+    assert await store.migrate_cold() == 1
+    assert await blob_store.get(BLOB_KEY.format(job_id="job-1")) == b"kept"
+    assert not await redis_client.hexists("result:job-1", "v")
+
+async def test_promote_with_missing_blob(redis_client, blob_store, no_hot_window):
+    store = ResultStore(redis_client, blob_store)
+    await store.put("job-1", RESULT)
+    await store.migrate_cold()
+    await blob_store.delete(BLOB_KEY.format(job_id="job-1"))
+
+    assert await store.get("job-1") is None
+
+async def test_training_samples_do_not_promote(redis_client, blob_store, no_hot_window):
+    store = ResultStore(redis_client, blob_store)
+    await store.put("job-1", RESULT)
+    await store.migrate_cold()
+
+    assert await store._peek("job-1") == RESULT
+    assert not await redis_client.hexists("result:job-1", "v")
+    assert await redis_client.zscore(HOT_INDEX, "job-1") is None
+
+async def test_purge_deletes_blobs_of_expired_pointers(redis_client, blob_store, no_hot_window):
+    store = ResultStore(redis_client, blob_store)
+    for job_id in ("expired", "live"):
+        await store.put(job_id, RESULT)
+    await store.migrate_cold()
+
+    await redis_client.delete("result:expired")
+    await redis_client.zadd(COLD_INDEX, {"expired": 0, "live": 0})
+
+    assert await store.purge_expired_blobs() == 1
+    assert await blob_store.get(BLOB_KEY.format(job_id="expired")) is None
+    assert await redis_client.zscore(COLD_INDEX, "expired") is None
+
+    # A live pointer is rescheduled for when it expires
+    assert await blob_store.get(BLOB_KEY.format(job_id="live")) is not None
+    assert await redis_client.zscore(COLD_INDEX, "live") > time.time()
+
+async def test_delete_many_removes_redis_and_blob_data(redis_client, blob_store, no_hot_window):
+    store = ResultStore(redis_client, blob_store)
+    await store.put("cold", RESULT)
+    await store.migrate_cold()
+    await store.put("hot", RESULT)
+
+    await store.delete_many(["cold", "hot"])
+
+    assert await redis_client.exists("result:cold", "result:hot") == 0
+    assert await blob_store.get(BLOB_KEY.format(job_id="cold")) is None
+    assert await redis_client.zcard(HOT_INDEX) == 0
+    assert await redis_client.zcard(COLD_INDEX) == 0